@@ -0,0 +1,12 @@
+"""
+Celery application for AgriLink.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'agrilink.settings.development')
+
+app = Celery('agrilink')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -1,6 +1,7 @@
 """
 Base settings for AgriLink Django project.
 """
+import json
 import os
 from pathlib import Path
 from decouple import config
@@ -25,6 +26,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -51,6 +53,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -58,6 +61,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,6 +98,19 @@ DATABASES = {
     }
 }
 
+# Read replicas: aliases in DATABASES that serve safe-method reads
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+REPLICA_HEALTH_CHECK_INTERVAL = config('REPLICA_HEALTH_CHECK_INTERVAL', default=30, cast=int)
+
+# Request metrics
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=60, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Alert rules added to apps.dashboard.alerts.DEFAULT_RULES, as AlertRule keyword dicts
+SYSTEM_ALERT_RULES = []
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -184,6 +201,8 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Redis Configuration
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+# Holds the trending listing sorted sets
+TRENDING_REDIS_URL = config('TRENDING_REDIS_URL', default=REDIS_URL)
 
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
@@ -193,6 +212,77 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+CELERY_BEAT_SCHEDULE = {
+    'refresh-expert-match-features': {
+        'task': 'apps.experts.tasks.refresh_expert_match_features',
+        'schedule': 3600,
+    },
+    'reconcile-advice-post-counters': {
+        'task': 'apps.experts.tasks.reconcile_advice_post_counters',
+        'schedule': 6 * 3600,
+    },
+    'rebuild-advice-feed': {
+        'task': 'apps.experts.tasks.rebuild_advice_feed',
+        'schedule': 600,
+    },
+    'send-consultation-reminders': {
+        'task': 'apps.experts.tasks.send_consultation_reminders',
+        'schedule': 60,
+    },
+    'mark-past-due-consultations': {
+        'task': 'apps.experts.tasks.mark_past_due_consultations',
+        'schedule': 300,
+    },
+    'reconcile-expert-statistics': {
+        'task': 'apps.experts.tasks.reconcile_expert_statistics',
+        'schedule': 3600,
+    },
+    'send-supplier-reorder-digests': {
+        'task': 'apps.suppliers.tasks.send_supplier_reorder_digests',
+        'schedule': 3600,
+    },
+    'expire-produce-listings': {
+        'task': 'apps.marketplace.tasks.expire_produce_listings',
+        'schedule': 900,
+    },
+    'update-market-price-index': {
+        'task': 'apps.marketplace.tasks.update_market_price_index',
+        'schedule': 300,
+    },
+    'rebase-trending-listings': {
+        'task': 'apps.marketplace.tasks.rebase_trending_listings',
+        'schedule': 3600,
+    },
+    'resume-stalled-report-generation': {
+        'task': 'apps.dashboard.tasks.resume_stalled_report_generation',
+        'schedule': 600,
+    },
+    'refresh-dashboard-kpis': {
+        'task': 'apps.dashboard.tasks.refresh_dashboard_kpis',
+        'schedule': 300,
+    },
+    'evaluate-system-alerts': {
+        'task': 'apps.dashboard.tasks.evaluate_system_alerts',
+        'schedule': 60,
+    },
+}
+
+# Consultation scheduler
+CONSULTATION_REMINDER_LEAD_MINUTES = config('CONSULTATION_REMINDER_LEAD_MINUTES', default=60, cast=int)
+CONSULTATION_NO_SHOW_GRACE_MINUTES = config('CONSULTATION_NO_SHOW_GRACE_MINUTES', default=30, cast=int)
+
+# Supplier quotes: value of one unit of each currency in US dollars
+EXCHANGE_RATES = config('EXCHANGE_RATES', default='{"USD": 1.0}', cast=json.loads)
+
+# Expert matching: weights of the score components (summing to 1)
+EXPERT_MATCH_WEIGHTS = {
+    'specialization': 0.4,
+    'distance': 0.2,
+    'rating': 0.2,
+    'rate': 0.1,
+    'availability': 0.1,
+}
+
 # AWS S3 Configuration
 AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default='')
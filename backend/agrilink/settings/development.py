@@ -24,6 +24,16 @@ DATABASES = {
     }
 }
 
+# Optional local replica for exercising the read router, e.g. a second
+# Postgres instance on another port
+if config('DB_REPLICA_PORT', default=''):
+    DATABASES['replica_1'] = {
+        **DATABASES['default'],
+        'PORT': config('DB_REPLICA_PORT'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica_1']
+
 # Email backend for development (console)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
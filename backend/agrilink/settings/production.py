@@ -27,6 +27,18 @@ DATABASES = {
     )
 }
 
+# Read replicas, e.g. DATABASE_REPLICA_URLS=postgis://replica1/agrilink,postgis://replica2/agrilink
+for index, replica_url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])):
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES[alias].setdefault('OPTIONS', {})['connect_timeout'] = 3
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
 # Allowed hosts from environment
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=lambda v: [s.strip() for s in v.split(',')])
 
@@ -11,6 +11,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -28,6 +30,9 @@ urlpatterns = [
     path('api/suppliers/', include('apps.suppliers.urls')),
     path('api/notifications/', include('apps.notifications.urls')),
     path('api/dashboard/', include('apps.dashboard.urls')),
+
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
@@ -0,0 +1,451 @@
+"""
+SystemAlert rule engine for AgriLink.
+
+Rules are declarative: each names a ``SystemMetric`` type, a statistic
+computed over a window of hourly rows and either fixed thresholds or an
+anomaly test against a rolling baseline, with one bound per severity.
+An evaluation loads every metric the rules need in one query, lays the
+rows out as ``(group, hour)`` NumPy matrices and computes each rule's
+statistic for all groups and all window positions with cumulative sums,
+so a rule costs a few array operations no matter how many regions it
+covers.
+
+Breaches become ``SystemAlert`` rows keyed by rule and group. A breach
+with an open alert updates it instead of opening another, escalating it
+when the severity rises or the breach outlasts ``ESCALATE_AFTER``. Open
+alerts without a breach in an evaluation are resolved, whether their
+condition cleared, their group went quiet or their rule was removed.
+"""
+import datetime
+import warnings
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+from core.metrics import LATENCY_BUCKETS
+from .models import SystemAlert, SystemMetric
+
+logger = logging.getLogger(__name__)
+
+ALERT_SOURCE = 'alert_engine'
+EVALUATION_LOCK_KEY = 'system_alerts:evaluation_lock'
+EVALUATION_LOCK_TIMEOUT = 5 * 60
+ESCALATE_AFTER = datetime.timedelta(hours=1)
+# Anomaly tests need at least this share of their baseline to be present
+MIN_BASELINE_SHARE = 0.5
+# Spread floor relative to the baseline mean, so flat baselines don't alert on noise
+MIN_RELATIVE_SPREAD = 0.1
+
+SEVERITY_RANK = {severity: rank for rank, severity in enumerate(SystemAlert.Severity.values)}
+
+# Metadata totals that rate and percentile statistics are computed from
+RATE_PARTS = {
+    SystemMetric.MetricType.ERROR_RATE: ('errors', 'requests'),
+    SystemMetric.MetricType.PAYMENT_FAILURE_RATE: ('failed', 'total'),
+    SystemMetric.MetricType.RESPONSE_TIME: ('total_ms', 'count'),
+}
+HISTOGRAM_BOUNDS_MS = np.array(LATENCY_BUCKETS) * 1000
+
+AlertRule = namedtuple('AlertRule', [
+    'name',            # unique, part of the alert's dedupe key
+    'title',
+    'metric_type',
+    'alert_type',
+    'statistic',       # 'sum', 'rate' or 'p95'
+    'levels',          # ((severity, bound), ...), from least to most severe
+    'mode',            # 'threshold' compares the value, 'anomaly' its z-score
+    'direction',       # 'above' or 'below'
+    'window_hours',
+    'baseline',        # anomaly baseline: previous 'hourly' windows or the same hour 'daily'
+    'baseline_periods',
+    'by_region',
+    'min_volume',      # requests, payments or orders needed for a verdict
+    'complete_hours',  # skip the current, partial hour
+], defaults=['threshold', 'above', 1, 'hourly', 24, False, 0, False])
+
+Z_LEVELS = ((SystemAlert.Severity.MEDIUM, 3.0), (SystemAlert.Severity.HIGH, 4.0), (SystemAlert.Severity.CRITICAL, 6.0))
+
+DEFAULT_RULES = [
+    AlertRule(
+        'error-rate', 'High API error rate',
+        SystemMetric.MetricType.ERROR_RATE, SystemAlert.AlertType.ERROR_RATE, 'rate',
+        ((SystemAlert.Severity.MEDIUM, 0.02), (SystemAlert.Severity.HIGH, 0.05), (SystemAlert.Severity.CRITICAL, 0.15)),
+        min_volume=100,
+    ),
+    AlertRule(
+        'error-rate-spike', 'API error rate spike',
+        SystemMetric.MetricType.ERROR_RATE, SystemAlert.AlertType.ERROR_RATE, 'rate', Z_LEVELS,
+        mode='anomaly', min_volume=100,
+    ),
+    AlertRule(
+        'p95-latency', 'Slow API responses (p95)',
+        SystemMetric.MetricType.RESPONSE_TIME, SystemAlert.AlertType.PERFORMANCE, 'p95',
+        ((SystemAlert.Severity.MEDIUM, 1000), (SystemAlert.Severity.HIGH, 2500), (SystemAlert.Severity.CRITICAL, 5000)),
+        min_volume=50,
+    ),
+    AlertRule(
+        'payment-failure-rate', 'High payment failure rate',
+        SystemMetric.MetricType.PAYMENT_FAILURE_RATE, SystemAlert.AlertType.PAYMENT, 'rate',
+        ((SystemAlert.Severity.MEDIUM, 0.1), (SystemAlert.Severity.HIGH, 0.25), (SystemAlert.Severity.CRITICAL, 0.5)),
+        min_volume=20,
+    ),
+    AlertRule(
+        'payment-failure-spike', 'Payment failure spike',
+        SystemMetric.MetricType.PAYMENT_FAILURE_RATE, SystemAlert.AlertType.PAYMENT, 'rate', Z_LEVELS,
+        mode='anomaly', min_volume=20,
+    ),
+    AlertRule(
+        'order-drop', 'Order volume drop',
+        SystemMetric.MetricType.ORDER_COUNT, SystemAlert.AlertType.ORDER_VOLUME, 'sum',
+        ((SystemAlert.Severity.MEDIUM, 2.5), (SystemAlert.Severity.HIGH, 3.5), (SystemAlert.Severity.CRITICAL, 5.0)),
+        mode='anomaly', direction='below', window_hours=2, baseline='daily', baseline_periods=7,
+        by_region=True, min_volume=5, complete_hours=True,
+    ),
+]
+
+RuleOutcome = namedtuple('RuleOutcome', ['rule', 'breaches'])
+Breach = namedtuple('Breach', ['group', 'severity', 'value', 'limit'])
+
+
+def get_rules():
+    """
+    Get the built-in rules plus any declared in ``settings.SYSTEM_ALERT_RULES``.
+    """
+    rules = list(DEFAULT_RULES)
+    for definition in getattr(settings, 'SYSTEM_ALERT_RULES', []):
+        definition = dict(definition)
+        definition['levels'] = tuple((severity, float(bound)) for severity, bound in definition['levels'])
+        rules.append(AlertRule(**definition))
+    return rules
+
+
+class MetricWindow:
+    """
+    Hourly ``SystemMetric`` rows of the last ``hours`` hours, up to and
+    including the hour starting at ``end``.
+    """
+
+    def __init__(self, metric_types, end, hours):
+        self.end = end
+        self.hours = hours
+        self.start = end - datetime.timedelta(hours=hours - 1)
+        self._series = {}
+        self._rows = defaultdict(list)
+
+        rows = SystemMetric.objects.filter(
+            metric_type__in=metric_types,
+            date__gte=self.start.date(),
+            date__lte=end.date(),
+            hour__isnull=False,
+        ).values_list('metric_type', 'date', 'hour', 'region', 'value', 'metadata')
+        start_date = self.start.date()
+        for metric_type, date, hour, region, value, metadata in rows.iterator(chunk_size=5000):
+            slot = (date - start_date).days * 24 + hour - self.start.hour
+            if 0 <= slot < hours:
+                self._rows[metric_type].append((slot, region, value, metadata))
+
+    def series(self, metric_type, by_region):
+        """
+        Sum the rows of one metric into ``(groups, columns)``, where each
+        column is a ``(group, hour)`` matrix; rows of all user roles fold
+        into their group.
+        """
+        key = (metric_type, by_region)
+        if key not in self._series:
+            self._series[key] = self._build(metric_type, by_region)
+        return self._series[key]
+
+    def _build(self, metric_type, by_region):
+        rows = [row for row in self._rows[metric_type] if row[1] or not by_region]
+        groups = sorted({region for _, region, _, _ in rows}) if by_region else ['']
+        index = {group: position for position, group in enumerate(groups)}
+        shape = (len(groups), self.hours)
+        slots = np.array([slot for slot, _, _, _ in rows], dtype=np.int64)
+        group_codes = np.array([index[region if by_region else ''] for _, region, _, _ in rows], dtype=np.int64)
+
+        columns = {'value': np.zeros(shape)}
+        np.add.at(columns['value'], (group_codes, slots),
+                  np.array([float(value) for _, _, value, _ in rows]))
+        if metric_type in RATE_PARTS:
+            for column, field in zip(('numerator', 'denominator'), RATE_PARTS[metric_type]):
+                columns[column] = np.zeros(shape)
+                np.add.at(columns[column], (group_codes, slots),
+                          np.array([float(metadata.get(field, 0)) for _, _, _, metadata in rows]))
+        if metric_type == SystemMetric.MetricType.RESPONSE_TIME:
+            size = len(HISTOGRAM_BOUNDS_MS) + 1
+            columns['buckets'] = np.zeros(shape + (size,))
+            np.add.at(columns['buckets'], (group_codes, slots), np.array(
+                [metadata.get('buckets') or [0] * size for _, _, _, metadata in rows], dtype=np.float64
+            ).reshape(len(rows), size))
+        return groups, columns
+
+
+def _rolling_sum(values, width):
+    """
+    Sum ``width`` consecutive hours along axis 1; position ``i`` of the
+    result covers hours ``i`` to ``i + width - 1``.
+    """
+    padded = np.concatenate([np.zeros_like(values[:, :1]), np.cumsum(values, axis=1)], axis=1)
+    return padded[:, width:] - padded[:, :-width]
+
+
+def _histogram_quantile(buckets, q):
+    """
+    Estimate a quantile from per-bucket counts along the last axis,
+    interpolating linearly inside the bucket that holds it. Values in the
+    overflow bucket are reported at the largest finite bound.
+    """
+    totals = buckets.sum(axis=-1)
+    cumulative = np.cumsum(buckets, axis=-1)
+    rank = q * totals
+    position = np.minimum((cumulative < rank[..., None]).sum(axis=-1), len(HISTOGRAM_BOUNDS_MS) - 1)
+    lower_bounds = np.concatenate([[0.0], HISTOGRAM_BOUNDS_MS])
+    lower = lower_bounds[position]
+    upper = HISTOGRAM_BOUNDS_MS[position]
+    below = np.take_along_axis(cumulative, position[..., None], axis=-1)[..., 0] - \
+        np.take_along_axis(buckets, position[..., None], axis=-1)[..., 0]
+    in_bucket = np.take_along_axis(buckets, position[..., None], axis=-1)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.clip((rank - below) / in_bucket, 0, 1)
+        estimate = lower + (upper - lower) * np.nan_to_num(fraction, nan=1.0)
+    return np.where(totals > 0, estimate, np.nan)
+
+
+def _statistic(rule, columns):
+    """
+    Compute ``(values, volumes)`` for every group and window position.
+    """
+    width = rule.window_hours
+    if rule.statistic == 'sum':
+        values = _rolling_sum(columns['value'], width)
+        return values, values
+    if rule.statistic == 'rate':
+        numerator = _rolling_sum(columns['numerator'], width)
+        volume = _rolling_sum(columns['denominator'], width)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(volume > 0, numerator / volume, np.nan), volume
+    if rule.statistic == 'p95':
+        buckets = _rolling_sum(columns['buckets'], width)
+        return _histogram_quantile(buckets, 0.95), buckets.sum(axis=-1)
+    raise ValueError(f"Unknown statistic {rule.statistic} in rule {rule.name}")
+
+
+def _baseline_step(rule):
+    return 24 if rule.baseline == 'daily' else rule.window_hours
+
+
+def _span(rule):
+    """
+    Hours of history a rule needs.
+    """
+    span = rule.window_hours + int(rule.complete_hours)
+    if rule.mode == 'anomaly':
+        span += _baseline_step(rule) * rule.baseline_periods
+    return span
+
+
+def evaluate_rule(rule, window):
+    """
+    Evaluate one rule for all of its groups.
+    """
+    groups, columns = window.series(rule.metric_type, rule.by_region)
+    values, volumes = _statistic(rule, columns)
+    current = values.shape[1] - 1 - int(rule.complete_hours)
+    if current < 0:
+        return RuleOutcome(rule, [])
+    value = values[:, current]
+
+    if rule.mode == 'anomaly':
+        step = _baseline_step(rule)
+        positions = [current - step * period for period in range(1, rule.baseline_periods + 1)]
+        positions = [position for position in positions if position >= 0]
+        if not positions:
+            return RuleOutcome(rule, [])
+        baseline = values[:, positions]
+        present = np.sum(~np.isnan(baseline), axis=1)
+        with warnings.catch_warnings():
+            # Groups without any baseline yield NaN and are dropped below
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(baseline, axis=1)
+            spread = np.nanstd(baseline, axis=1)
+            baseline_volume = np.nanmean(volumes[:, positions], axis=1)
+        spread = np.maximum(spread, MIN_RELATIVE_SPREAD * np.abs(mean))
+        if rule.statistic == 'sum':
+            # Counts are at least Poisson-noisy
+            spread = np.maximum(spread, np.sqrt(np.abs(mean)))
+        elif rule.statistic == 'rate':
+            # Rates are at least binomially noisy at the current volume; a
+            # near-zero baseline is taken as one event per current window
+            trials = np.where(volumes[:, current] > 0, volumes[:, current], np.nan)
+            rate = np.clip(np.maximum(mean, 1 / trials), 0, 1)
+            spread = np.maximum(spread, np.sqrt(rate * (1 - rate) / trials))
+        spread = np.where(spread > 0, spread, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = (value - mean) / spread
+        # A drop is judged against the usual volume, a spike against the current one
+        volume = baseline_volume if rule.direction == 'below' else volumes[:, current]
+        valid = present >= max(1, int(len(positions) * MIN_BASELINE_SHARE))
+        bounds = np.array([bound for _, bound in rule.levels])
+    else:
+        mean = spread = None
+        score = value
+        volume = volumes[:, current]
+        valid = np.ones(len(groups), dtype=bool)
+        bounds = np.array([bound for _, bound in rule.levels])
+        if rule.direction == 'below':
+            # Lower limits get stricter as severity rises; negate to keep them ascending
+            bounds = -bounds
+
+    if rule.direction == 'below':
+        score = -score
+    valid &= ~np.isnan(score) & (volume >= rule.min_volume)
+
+    levels = np.searchsorted(bounds, np.where(valid, score, -np.inf), side='right') - 1
+
+    breaches = []
+    for position in np.flatnonzero(valid).tolist():
+        level = levels[position]
+        if level < 0:
+            continue
+        severity, bound = rule.levels[level]
+        if mean is not None:
+            sign = -1 if rule.direction == 'below' else 1
+            limit = mean[position] + sign * bound * spread[position]
+        else:
+            limit = bound
+        breaches.append(Breach(groups[position], severity, float(value[position]), float(limit)))
+    return RuleOutcome(rule, breaches)
+
+
+def _alert_key(rule, group):
+    return f"{rule.name}:{group}" if group else rule.name
+
+
+def _decimal(value):
+    return Decimal(str(round(value, 4)))
+
+
+def _describe(rule, breach):
+    scope = f" in region {breach.group}" if breach.group else ''
+    comparison = 'below' if rule.direction == 'below' else 'above'
+    return (
+        f"{rule.title}{scope}: {breach.value:.4g} over the last {rule.window_hours}h, "
+        f"{comparison} the {breach.severity.lower()} limit of {breach.limit:.4g}."
+    )
+
+
+def sync_alerts(outcomes, now=None, failed_rules=()):
+    """
+    Open, escalate or resolve alerts for a set of rule outcomes.
+
+    Open alerts of rules in ``failed_rules``, which could not be
+    evaluated, are left as they are.
+    """
+    now = now or timezone.now()
+    counts = {'created': 0, 'escalated': 0, 'resolved': 0}
+    with transaction.atomic():
+        active = {
+            alert.source_id: alert
+            for alert in SystemAlert.objects.select_for_update().filter(source_system=ALERT_SOURCE, is_active=True)
+        }
+        created, changed = [], []
+        breached = set()
+        for outcome in outcomes:
+            rule = outcome.rule
+            for breach in outcome.breaches:
+                key = _alert_key(rule, breach.group)
+                breached.add(key)
+                alert = active.get(key)
+                if alert is None:
+                    created.append(SystemAlert(
+                        title=f"{rule.title} ({breach.group})" if breach.group else rule.title,
+                        alert_type=rule.alert_type,
+                        description=_describe(rule, breach),
+                        severity=breach.severity,
+                        source_system=ALERT_SOURCE,
+                        source_id=key,
+                        threshold_value=_decimal(breach.limit),
+                        actual_value=_decimal(breach.value),
+                    ))
+                    continue
+
+                if SEVERITY_RANK[breach.severity] > SEVERITY_RANK[alert.severity]:
+                    alert.severity = breach.severity
+                    alert.escalation_level += 1
+                    alert.updated_at = now
+                    counts['escalated'] += 1
+                elif now - alert.updated_at >= ESCALATE_AFTER:
+                    alert.escalation_level += 1
+                    alert.updated_at = now
+                    counts['escalated'] += 1
+                alert.description = _describe(rule, breach)
+                alert.threshold_value = _decimal(breach.limit)
+                alert.actual_value = _decimal(breach.value)
+                changed.append(alert)
+
+        for key, alert in active.items():
+            # Keys are the rule name, then the group after the first colon
+            if key in breached or key.split(':', 1)[0] in failed_rules:
+                continue
+            alert.is_active = False
+            alert.is_resolved = True
+            alert.resolved_at = now
+            alert.resolution_notes = 'Resolved automatically: the condition is no longer breached.'
+            alert.updated_at = now
+            changed.append(alert)
+            counts['resolved'] += 1
+
+        SystemAlert.objects.bulk_create(created)
+        # bulk_update skips auto_now, so updated_at only moves on escalation and resolution
+        SystemAlert.objects.bulk_update(changed, [
+            'severity', 'escalation_level', 'description', 'threshold_value', 'actual_value',
+            'is_active', 'is_resolved', 'resolved_at', 'resolution_notes', 'updated_at',
+        ], batch_size=500)
+    counts['created'] = len(created)
+
+    for alert in created:
+        logger.warning(f"Alert raised: {alert.title} ({alert.severity})")
+    return counts
+
+
+def evaluate_alert_rules(rules=None, now=None):
+    """
+    Evaluate all rules against recent metrics and sync their alerts.
+
+    Returns None when another evaluation holds the lock.
+    """
+    if not cache.add(EVALUATION_LOCK_KEY, 1, timeout=EVALUATION_LOCK_TIMEOUT):
+        return None
+    try:
+        rules = rules if rules is not None else get_rules()
+        now = now or timezone.now()
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        window = MetricWindow(
+            {rule.metric_type for rule in rules},
+            current_hour,
+            max((_span(rule) for rule in rules), default=1),
+        )
+
+        outcomes, failed_rules = [], set()
+        for rule in rules:
+            try:
+                outcomes.append(evaluate_rule(rule, window))
+            except (KeyError, ValueError) as e:
+                failed_rules.add(rule.name)
+                logger.error(f"Alert rule {rule.name} could not be evaluated: {e}")
+        counts = sync_alerts(outcomes, now, failed_rules)
+    finally:
+        cache.delete(EVALUATION_LOCK_KEY)
+
+    if any(counts.values()):
+        logger.info(
+            f"Evaluated {len(rules)} alert rules: {counts['created']} raised, "
+            f"{counts['escalated']} escalated, {counts['resolved']} resolved"
+        )
+    return counts
@@ -0,0 +1,243 @@
+"""
+Platform KPIs for the AgriLink admin dashboard.
+
+The admin dashboard's figures are full-table aggregates over users,
+listings, orders, consultations and inquiries. They are kept in Postgres
+materialized views, one per subject, each with a unique index so it can
+be refreshed ``CONCURRENTLY``: readers and writers of the base tables
+are never blocked, and a refresh only rewrites rows whose figures
+changed. Views are refreshed on a schedule and on demand, and the
+dashboard reads them through the functions at the bottom of this module.
+
+There are no migrations for the views; create them with
+``manage.py setup_dashboard_kpis``.
+"""
+import datetime
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import connection, connections, router, transaction
+from django.utils import timezone
+import logging
+
+from .models import SystemMetric
+
+logger = logging.getLogger(__name__)
+
+REFRESH_LOCK_KEY = 'dashboard_kpis:refresh_lock'
+REFRESH_LOCK_TIMEOUT = 15 * 60
+REFRESHED_AT_KEY = 'dashboard_kpis:refreshed_at'
+RECENT_DAYS = 30
+
+KpiView = namedtuple('KpiView', ['name', 'sql', 'unique_columns'])
+
+KPI_VIEWS = [
+    KpiView('dashboard_kpi_users', """
+SELECT
+    role,
+    COUNT(*) AS total,
+    COUNT(*) FILTER (WHERE is_active) AS active,
+    COUNT(*) FILTER (WHERE is_verified) AS verified,
+    COUNT(*) FILTER (WHERE created_at >= now() - interval '30 days') AS joined_recently
+FROM users
+GROUP BY role
+""", ['role']),
+
+    KpiView('dashboard_kpi_listings', """
+SELECT
+    category,
+    status,
+    COUNT(*) AS listings,
+    COUNT(*) FILTER (
+        WHERE status = 'ACTIVE' AND expires_at > now() AND availability_period_end >= current_date
+    ) AS live,
+    COALESCE(SUM(quantity_available), 0) AS quantity,
+    COALESCE(SUM(view_count), 0) AS views
+FROM produce_listings
+GROUP BY category, status
+""", ['category', 'status']),
+
+    # Daily rows keep the view small while still giving a GMV trend
+    KpiView('dashboard_kpi_orders', """
+SELECT
+    (created_at AT TIME ZONE 'UTC')::date AS day,
+    status,
+    COUNT(*) AS orders,
+    COALESCE(SUM(final_amount), 0) AS amount,
+    COALESCE(SUM(final_amount) FILTER (
+        WHERE confirmed_at IS NOT NULL AND status NOT IN ('CANCELLED', 'REFUNDED')
+    ), 0) AS gmv
+FROM orders
+GROUP BY 1, status
+""", ['day', 'status']),
+
+    KpiView('dashboard_kpi_consultations', """
+SELECT
+    status,
+    COUNT(*) AS consultations,
+    COUNT(*) FILTER (WHERE created_at >= now() - interval '30 days') AS requested_recently,
+    COALESCE(SUM(total_amount) FILTER (WHERE payment_status = 'PAID'), 0) AS revenue
+FROM consultations
+GROUP BY status
+""", ['status']),
+
+    KpiView('dashboard_kpi_inquiries', """
+SELECT 'LISTING'::text AS source, status, COUNT(*) AS inquiries,
+       COUNT(*) FILTER (WHERE created_at >= now() - interval '30 days') AS received_recently
+FROM listing_inquiries
+GROUP BY status
+UNION ALL
+SELECT 'SUPPLIER'::text AS source, status, COUNT(*) AS inquiries,
+       COUNT(*) FILTER (WHERE created_at >= now() - interval '30 days') AS received_recently
+FROM supplier_inquiries
+GROUP BY status
+""", ['source', 'status']),
+]
+
+
+def create_kpi_views(recreate=False):
+    """
+    Create the KPI materialized views and their unique indexes.
+
+    Existing views are kept unless ``recreate`` is set, which drops and
+    rebuilds them, as needed after changing their SQL.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for view in KPI_VIEWS:
+            if recreate:
+                cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view.name}")
+            cursor.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view.name} AS {view.sql}")
+            # CONCURRENTLY needs a plain unique index covering every row
+            cursor.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {view.name}_uniq "
+                f"ON {view.name} ({', '.join(view.unique_columns)})"
+            )
+    cache.set(REFRESHED_AT_KEY, timezone.now().isoformat(), timeout=None)
+    logger.info(f"Created {len(KPI_VIEWS)} dashboard KPI views")
+    return len(KPI_VIEWS)
+
+
+def refresh_kpi_views():
+    """
+    Refresh every KPI view without blocking reads or writes.
+
+    Returns False when another refresh is already running.
+    """
+    if not cache.add(REFRESH_LOCK_KEY, 1, timeout=REFRESH_LOCK_TIMEOUT):
+        return False
+    try:
+        for view in KPI_VIEWS:
+            started = timezone.now()
+            with connection.cursor() as cursor:
+                cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}")
+            logger.debug(f"Refreshed {view.name} in {(timezone.now() - started).total_seconds():.2f}s")
+        cache.set(REFRESHED_AT_KEY, timezone.now().isoformat(), timeout=None)
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+    return True
+
+
+def _fetch(sql, params=None):
+    # The views hang off no model, so route reads as for SystemMetric
+    with connections[router.db_for_read(SystemMetric)].cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def user_kpis():
+    """
+    User counts per role, with platform totals.
+    """
+    rows = _fetch("SELECT role, total, active, verified, joined_recently FROM dashboard_kpi_users ORDER BY role")
+    totals = {
+        field: sum(row[field] for row in rows)
+        for field in ('total', 'active', 'verified', 'joined_recently')
+    }
+    return {'by_role': {row.pop('role'): row for row in rows}, **totals}
+
+
+def listing_kpis():
+    """
+    Listing counts per status and live listings per category.
+    """
+    rows = _fetch("SELECT category, status, listings, live, quantity, views FROM dashboard_kpi_listings")
+    by_status, live_by_category = {}, {}
+    for row in rows:
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['listings']
+        if row['live']:
+            live_by_category[row['category']] = live_by_category.get(row['category'], 0) + row['live']
+    return {
+        'total': sum(by_status.values()),
+        'active': sum(live_by_category.values()),
+        'by_status': by_status,
+        'active_by_category': live_by_category,
+        'active_quantity': sum(row['quantity'] for row in rows if row['status'] == 'ACTIVE'),
+        'total_views': sum(row['views'] for row in rows),
+    }
+
+
+def order_kpis(days=RECENT_DAYS):
+    """
+    Order counts per status, gross merchandise value and its daily trend.
+    """
+    since = timezone.now().date() - datetime.timedelta(days=days - 1)
+    totals = _fetch("""
+        SELECT status, SUM(orders) AS orders, SUM(amount) AS amount, SUM(gmv) AS gmv
+        FROM dashboard_kpi_orders GROUP BY status
+    """)
+    daily = _fetch("""
+        SELECT day, SUM(orders) AS orders, SUM(gmv) AS gmv
+        FROM dashboard_kpi_orders WHERE day >= %s GROUP BY day ORDER BY day
+    """, [since])
+    return {
+        'total': sum(row['orders'] for row in totals),
+        'by_status': {row['status']: row['orders'] for row in totals},
+        'gmv': sum(row['gmv'] for row in totals),
+        'gmv_recent': sum(row['gmv'] for row in daily),
+        'daily': [
+            {'date': row['day'].isoformat(), 'orders': row['orders'], 'gmv': row['gmv']}
+            for row in daily
+        ],
+    }
+
+
+def consultation_kpis():
+    """
+    Consultation counts per status and paid consultation revenue.
+    """
+    rows = _fetch("SELECT status, consultations, requested_recently, revenue FROM dashboard_kpi_consultations")
+    return {
+        'total': sum(row['consultations'] for row in rows),
+        'requested_recently': sum(row['requested_recently'] for row in rows),
+        'by_status': {row['status']: row['consultations'] for row in rows},
+        'revenue': sum(row['revenue'] for row in rows),
+    }
+
+
+def inquiry_kpis():
+    """
+    Listing and supplier inquiry counts per status.
+    """
+    rows = _fetch("SELECT source, status, inquiries, received_recently FROM dashboard_kpi_inquiries")
+    kpis = {}
+    for row in rows:
+        source = kpis.setdefault(row['source'].lower(), {'total': 0, 'received_recently': 0, 'by_status': {}})
+        source['total'] += row['inquiries']
+        source['received_recently'] += row['received_recently']
+        source['by_status'][row['status']] = row['inquiries']
+    return kpis
+
+
+def admin_kpis():
+    """
+    Read every platform KPI for the admin dashboard.
+    """
+    return {
+        'users': user_kpis(),
+        'listings': listing_kpis(),
+        'orders': order_kpis(),
+        'consultations': consultation_kpis(),
+        'inquiries': inquiry_kpis(),
+        'refreshed_at': cache.get(REFRESHED_AT_KEY),
+    }
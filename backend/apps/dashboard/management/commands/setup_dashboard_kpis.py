@@ -0,0 +1,30 @@
+"""
+Create or refresh the admin dashboard KPI materialized views.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.kpis import create_kpi_views, refresh_kpi_views
+
+
+class Command(BaseCommand):
+    help = 'Create the materialized views behind the admin dashboard KPIs, or refresh them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recreate', action='store_true', help='Drop and rebuild the views, e.g. after changing their SQL')
+        parser.add_argument('--refresh', action='store_true', help='Only refresh the existing views')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['refresh']:
+            if not refresh_kpi_views():
+                self.stdout.write(self.style.WARNING('Another refresh is already running'))
+                return
+            action = 'Refreshed'
+        else:
+            create_kpi_views(recreate=options['recreate'])
+            action = 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} dashboard KPI views in {time.perf_counter() - started:.1f}s'
+        ))
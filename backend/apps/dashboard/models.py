@@ -93,6 +93,7 @@ class SystemMetric(models.Model):
         API_CALLS = 'API_CALLS', 'API Calls'
         ERROR_RATE = 'ERROR_RATE', 'Error Rate'
         RESPONSE_TIME = 'RESPONSE_TIME', 'Response Time'
+        PAYMENT_FAILURE_RATE = 'PAYMENT_FAILURE_RATE', 'Payment Failure Rate'
 
     metric_type = models.CharField(max_length=30, choices=MetricType.choices, db_index=True)
     value = models.DecimalField(max_digits=20, decimal_places=4)
@@ -103,11 +104,12 @@ class SystemMetric(models.Model):
     hour = models.IntegerField(blank=True, null=True, help_text="Hour of the day (0-23)")
 
     # Dimensions for filtering
+    # Not nullable: NULLs would never collide in the unique constraint below
     user_role = models.CharField(
         max_length=20,
         choices=User.Role.choices,
         blank=True,
-        null=True
+        default=''
     )
     category = models.CharField(max_length=100, blank=True)
     region = models.CharField(max_length=100, blank=True)
@@ -270,6 +272,7 @@ class SystemAlert(models.Model):
         PAYMENT = 'PAYMENT', 'Payment Issue'
         USER_REPORT = 'USER_REPORT', 'User Report'
         SYSTEM_MAINTENANCE = 'SYSTEM_MAINTENANCE', 'Maintenance Required'
+        ORDER_VOLUME = 'ORDER_VOLUME', 'Order Volume Drop'
     class Severity(models.TextChoices):
         LOW = 'LOW', 'Low'
         MEDIUM = 'MEDIUM', 'Medium'
@@ -382,8 +385,9 @@ class Report(models.Model):
             ('CSV', 'CSV'),
             ('EXCEL', 'Excel'),
             ('JSON', 'JSON'),
+            ('PARQUET', 'Parquet'),
         ],
-        default='PDF'
+        default='CSV'
     )
     file_size_bytes = models.BigIntegerField(blank=True, null=True)
 
@@ -391,6 +395,7 @@ class Report(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.SCHEDULED)
     progress_percentage = models.IntegerField(default=0)
     error_message = models.TextField(blank=True)
+    checkpoint = models.JSONField(default=dict, blank=True, help_text="Export position for resuming generation")
 
     # Requested by
     requested_by = models.ForeignKey(
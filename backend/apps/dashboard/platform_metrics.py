@@ -0,0 +1,95 @@
+"""
+Hourly business metrics for AgriLink alerting.
+
+Request metrics reach ``SystemMetric`` through ``core.metrics``; this
+module adds the business side the alert rules watch: orders per region
+and the payment failure rate. Each run recomputes the current and
+previous hour from the orders and payments tables, so rows converge as
+late writes land and running it twice changes nothing.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db import connections, router
+from django.utils import timezone
+import logging
+
+from .models import SystemMetric
+
+logger = logging.getLogger(__name__)
+
+COLLECT_HOURS = 2
+
+# Region labels match core.utils.region_for_point with one-degree cells
+ORDERS_BY_REGION_SQL = """
+SELECT date_trunc('hour', created_at AT TIME ZONE 'UTC') AS slot,
+       floor(ST_Y(delivery_location::geometry))::int || ':' || floor(ST_X(delivery_location::geometry))::int AS region,
+       COUNT(*)
+FROM orders
+WHERE created_at >= %s AND created_at < %s
+GROUP BY 1, 2
+"""
+
+PAYMENT_OUTCOMES_SQL = """
+SELECT date_trunc('hour', created_at AT TIME ZONE 'UTC') AS slot,
+       COUNT(*) FILTER (WHERE status = 'FAILED') AS failed,
+       COUNT(*) AS total
+FROM payments
+WHERE created_at >= %s AND created_at < %s AND status IN ('COMPLETED', 'FAILED', 'REFUNDED')
+GROUP BY 1
+"""
+
+
+def _query(model, sql, params):
+    with connections[router.db_for_read(model)].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _store(metric_type, unit, values):
+    """
+    Write ``{(date, hour, region): (value, metadata)}`` as role-less rows.
+    """
+    if not values:
+        return 0
+    # Upserting lets concurrent runs write the same rows without conflicts
+    SystemMetric.objects.bulk_create(
+        [
+            SystemMetric(
+                metric_type=metric_type, date=date, hour=hour, region=region,
+                unit=unit, value=value, metadata=metadata,
+            )
+            for (date, hour, region), (value, metadata) in values.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['metric_type', 'date', 'hour', 'user_role', 'category', 'region'],
+        update_fields=['value', 'metadata'],
+    )
+    return len(values)
+
+
+def collect_platform_metrics(now=None):
+    """
+    Recompute order and payment metrics for the most recent hours.
+    """
+    from apps.orders.models import Order, Payment
+
+    now = now or timezone.now()
+    end = now.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+    start = end - datetime.timedelta(hours=COLLECT_HOURS)
+
+    orders = {
+        (slot.date(), slot.hour, region): (Decimal(count), {})
+        for slot, region, count in _query(Order, ORDERS_BY_REGION_SQL, [start, end])
+    }
+    payments = {
+        (slot.date(), slot.hour, ''): (
+            Decimal(str(round(failed / total, 4))), {'failed': failed, 'total': total}
+        )
+        for slot, failed, total in _query(Payment, PAYMENT_OUTCOMES_SQL, [start, end])
+    }
+
+    written = _store(SystemMetric.MetricType.ORDER_COUNT, 'count', orders)
+    written += _store(SystemMetric.MetricType.PAYMENT_FAILURE_RATE, 'ratio', payments)
+    logger.debug(f"Collected {written} platform metric rows")
+    return written
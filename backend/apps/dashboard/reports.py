@@ -0,0 +1,513 @@
+"""
+Report generation pipeline for AgriLink dashboards.
+
+Each report type is a query over the report's date range, user roles
+and regions, keyset-paginated in chronological order on its time column
+and primary key. Rows are exported in chunks; every chunk is stored as a
+gzipped JSON Lines part and recorded in the report's ``checkpoint``
+together with the last key, so a worker that dies mid-export resumes
+from the last stored part. Once all parts are
+written they are streamed into the requested format (CSV, JSON, Excel
+or Parquet) through a temporary file, so no step holds the full result
+in memory.
+"""
+import csv
+import datetime
+import gzip
+import io
+import json
+import tempfile
+from collections import namedtuple
+from decimal import Decimal
+
+from django.contrib.gis.geos import Polygon
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+import logging
+
+from .models import Report
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+# Share of progress spent exporting rows; the rest covers assembling the file
+EXPORT_PROGRESS = 90
+# A generating report without a heartbeat for this long is considered crashed
+STALL_TIMEOUT = timezone.timedelta(minutes=10)
+REPORT_LIFETIME_DAYS = 30
+MAX_ATTEMPTS = 3
+
+PART_NAME = 'reports/{report_id}/parts/{part:05d}.jsonl.gz'
+OUTPUT_NAME = 'reports/{report_id}/{slug}.{extension}'
+EXTENSIONS = {'CSV': 'csv', 'JSON': 'json', 'EXCEL': 'xlsx', 'PARQUET': 'parquet'}
+
+Column = namedtuple('Column', ['field', 'label', 'kind'])
+ReportSpec = namedtuple('ReportSpec', ['queryset', 'columns', 'order_field'])
+
+
+class ReportError(Exception):
+    """
+    A report that cannot be generated as requested.
+    """
+
+
+class ReportTakenOver(Exception):
+    """
+    Another worker claimed or finished the report while this one was
+    still generating it.
+    """
+
+
+def _datetime_range(report):
+    start = timezone.make_aware(datetime.datetime.combine(report.start_date, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(report.end_date + datetime.timedelta(days=1), datetime.time.min))
+    return start, end
+
+
+def _grid_filter(field, regions):
+    """
+    Match a point field against one-degree region grid labels such as
+    ``"-1:36"``, as produced by ``core.utils.region_for_point``.
+    """
+    condition = Q()
+    for region in regions:
+        try:
+            latitude, longitude = (float(part) for part in str(region).split(':'))
+        except ValueError:
+            continue
+        cell = Polygon.from_bbox((longitude, latitude, longitude + 1, latitude + 1))
+        cell.srid = 4326
+        condition |= Q(**{f'{field}__intersects': cell})
+    return condition
+
+
+def _user_activity(report):
+    from .models import UserActivity
+
+    start, end = _datetime_range(report)
+    queryset = UserActivity.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    if report.user_roles:
+        queryset = queryset.filter(user__role__in=report.user_roles)
+    if report.regions:
+        queryset = queryset.filter(Q(city__in=report.regions) | Q(country__in=report.regions))
+    return queryset
+
+
+def _sales_performance(report):
+    from apps.orders.models import Order
+
+    start, end = _datetime_range(report)
+    queryset = Order.objects.filter(created_at__gte=start, created_at__lt=end)
+    if report.user_roles:
+        queryset = queryset.filter(Q(buyer__role__in=report.user_roles) | Q(seller__role__in=report.user_roles))
+    if report.regions:
+        queryset = queryset.filter(_grid_filter('delivery_location', report.regions))
+    return queryset
+
+
+def _market_analysis(report):
+    from apps.marketplace.models import PriceBar
+
+    queryset = PriceBar.objects.filter(date__gte=report.start_date, date__lte=report.end_date)
+    if report.regions:
+        queryset = queryset.filter(region__in=report.regions)
+    return queryset
+
+
+def _financial_summary(report):
+    from apps.orders.models import Payment
+
+    start, end = _datetime_range(report)
+    queryset = Payment.objects.filter(created_at__gte=start, created_at__lt=end)
+    if report.user_roles:
+        queryset = queryset.filter(order__buyer__role__in=report.user_roles)
+    if report.regions:
+        queryset = queryset.filter(_grid_filter('order__delivery_location', report.regions))
+    return queryset
+
+
+def _system_performance(report):
+    from .models import SystemMetric
+
+    queryset = SystemMetric.objects.filter(date__gte=report.start_date, date__lte=report.end_date)
+    if report.user_roles:
+        queryset = queryset.filter(user_role__in=report.user_roles)
+    if report.regions:
+        queryset = queryset.filter(region__in=report.regions)
+    return queryset
+
+
+def _compliance(report):
+    from .models import SystemAlert
+
+    start, end = _datetime_range(report)
+    return SystemAlert.objects.filter(created_at__gte=start, created_at__lt=end)
+
+
+REPORT_SPECS = {
+    Report.ReportType.USER_ACTIVITY: ReportSpec(_user_activity, [
+        Column('timestamp', 'Timestamp', 'datetime'),
+        Column('user_id', 'User ID', 'str'),
+        Column('user__email', 'Email', 'str'),
+        Column('user__role', 'Role', 'str'),
+        Column('activity_type', 'Activity', 'str'),
+        Column('description', 'Description', 'str'),
+        Column('request_method', 'Method', 'str'),
+        Column('request_path', 'Path', 'str'),
+        Column('country', 'Country', 'str'),
+        Column('city', 'City', 'str'),
+    ], 'timestamp'),
+    Report.ReportType.SALES_PERFORMANCE: ReportSpec(_sales_performance, [
+        Column('order_number', 'Order Number', 'str'),
+        Column('created_at', 'Created At', 'datetime'),
+        Column('status', 'Status', 'str'),
+        Column('payment_status', 'Payment Status', 'str'),
+        Column('seller_id', 'Seller ID', 'str'),
+        Column('buyer_id', 'Buyer ID', 'str'),
+        Column('product_name', 'Product', 'str'),
+        Column('listing__category', 'Category', 'str'),
+        Column('quantity_ordered', 'Quantity (kg)', 'decimal'),
+        Column('unit_price', 'Unit Price', 'decimal'),
+        Column('total_amount', 'Total Amount', 'decimal'),
+        Column('final_amount', 'Final Amount', 'decimal'),
+    ], 'created_at'),
+    Report.ReportType.MARKET_ANALYSIS: ReportSpec(_market_analysis, [
+        Column('date', 'Date', 'date'),
+        Column('source', 'Source', 'str'),
+        Column('dimension', 'Dimension', 'str'),
+        Column('key', 'Product or Category', 'str'),
+        Column('region', 'Region', 'str'),
+        Column('open', 'Open', 'decimal'),
+        Column('high', 'High', 'decimal'),
+        Column('low', 'Low', 'decimal'),
+        Column('close', 'Close', 'decimal'),
+        Column('vwap', 'VWAP', 'decimal'),
+        Column('volume', 'Volume (kg)', 'decimal'),
+        Column('count', 'Count', 'int'),
+    ], 'date'),
+    Report.ReportType.FINANCIAL_SUMMARY: ReportSpec(_financial_summary, [
+        Column('created_at', 'Created At', 'datetime'),
+        Column('order__order_number', 'Order Number', 'str'),
+        Column('payment_method', 'Method', 'str'),
+        Column('gateway', 'Gateway', 'str'),
+        Column('status', 'Status', 'str'),
+        Column('amount', 'Amount', 'decimal'),
+        Column('currency', 'Currency', 'str'),
+        Column('refund_amount', 'Refunded', 'decimal'),
+        Column('processed_at', 'Processed At', 'datetime'),
+    ], 'created_at'),
+    Report.ReportType.SYSTEM_PERFORMANCE: ReportSpec(_system_performance, [
+        Column('date', 'Date', 'date'),
+        Column('hour', 'Hour', 'int'),
+        Column('metric_type', 'Metric', 'str'),
+        Column('value', 'Value', 'decimal'),
+        Column('unit', 'Unit', 'str'),
+        Column('user_role', 'Role', 'str'),
+        Column('category', 'Category', 'str'),
+        Column('region', 'Region', 'str'),
+    ], 'date'),
+    Report.ReportType.COMPLIANCE: ReportSpec(_compliance, [
+        Column('created_at', 'Created At', 'datetime'),
+        Column('alert_type', 'Alert Type', 'str'),
+        Column('severity', 'Severity', 'str'),
+        Column('title', 'Title', 'str'),
+        Column('source_system', 'Source', 'str'),
+        Column('is_resolved', 'Resolved', 'bool'),
+        Column('resolved_at', 'Resolved At', 'datetime'),
+        Column('escalation_level', 'Escalation Level', 'int'),
+    ], 'created_at'),
+}
+
+
+def _to_json(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _from_json(value, kind):
+    """
+    Turn a stored part value into a typed cell for Excel and Parquet.
+    """
+    if value is None:
+        return None
+    if kind == 'decimal':
+        return float(value)
+    if kind == 'datetime':
+        # Excel has no time zones, so cells are naive UTC
+        moment = datetime.datetime.fromisoformat(value)
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return moment
+    if kind == 'date':
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+def _write_part(report, part, rows):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as stream:
+        for row in rows:
+            stream.write(json.dumps([_to_json(value) for value in row]).encode('utf-8'))
+            stream.write(b'\n')
+    return default_storage.save(
+        PART_NAME.format(report_id=report.pk, part=part), ContentFile(buffer.getvalue())
+    )
+
+
+def _read_parts(parts):
+    for name in parts:
+        with default_storage.open(name, 'rb') as raw, gzip.GzipFile(fileobj=raw) as stream:
+            part_rows = [json.loads(line) for line in stream]
+        yield part_rows
+
+
+def _assemble_csv(output, columns, parts):
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text)
+    writer.writerow([column.label for column in columns])
+    for rows in _read_parts(parts):
+        writer.writerows(rows)
+    text.detach()
+
+
+def _assemble_json(output, columns, parts):
+    fields = [column.field for column in columns]
+    output.write(b'[')
+    first = True
+    for rows in _read_parts(parts):
+        for row in rows:
+            if not first:
+                output.write(b',')
+            output.write(json.dumps(dict(zip(fields, row))).encode('utf-8'))
+            first = False
+    output.write(b']')
+
+
+def _assemble_excel(output, columns, parts):
+    if openpyxl is None:
+        raise ReportError("Excel reports need openpyxl installed")
+    # Write-only workbooks stream rows to disk instead of building a sheet in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Report')
+    sheet.append([column.label for column in columns])
+    for rows in _read_parts(parts):
+        for row in rows:
+            sheet.append([_from_json(value, column.kind) for value, column in zip(row, columns)])
+    workbook.save(output)
+
+
+PARQUET_TYPES = {
+    'str': 'string',
+    'int': 'int64',
+    'decimal': 'float64',
+    'bool': 'bool_',
+    'date': 'date32',
+}
+
+
+def _assemble_parquet(output, columns, parts):
+    if pa is None:
+        raise ReportError("Parquet reports need pyarrow installed")
+    schema = pa.schema([
+        (column.label, pa.timestamp('us') if column.kind == 'datetime' else getattr(pa, PARQUET_TYPES[column.kind])())
+        for column in columns
+    ])
+    with pq.ParquetWriter(output, schema) as writer:
+        for rows in _read_parts(parts):
+            # Each part becomes one row group
+            data = {
+                column.label: [_from_json(row[index], column.kind) for row in rows]
+                for index, column in enumerate(columns)
+            }
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+
+
+ASSEMBLERS = {
+    'CSV': _assemble_csv,
+    'JSON': _assemble_json,
+    'EXCEL': _assemble_excel,
+    'PARQUET': _assemble_parquet,
+}
+
+
+def _save_progress(report, **fields):
+    """
+    Update a report this worker is generating and refresh its heartbeat.
+
+    Reports another worker already finished are left alone.
+    """
+    fields['updated_at'] = timezone.now()
+    return Report.objects.filter(pk=report.pk, status=Report.Status.GENERATING).update(**fields)
+
+
+def _assembly_heartbeat(report, parts):
+    """
+    Yield part names to an assembler, saving progress before each one so
+    a long assembly isn't taken for a stalled worker.
+    """
+    for index, name in enumerate(parts):
+        saved = _save_progress(
+            report,
+            progress_percentage=EXPORT_PROGRESS + (99 - EXPORT_PROGRESS) * index // len(parts),
+        )
+        if not saved:
+            raise ReportTakenOver(f"Report {report.pk} is no longer generated by this worker")
+        yield name
+
+
+def claim_report(report_id):
+    """
+    Take a scheduled or stalled report for generation.
+
+    Returns the report, or None when it is finished or another worker
+    is still generating it.
+    """
+    claimed = Report.objects.filter(pk=report_id).filter(
+        Q(status=Report.Status.SCHEDULED) |
+        Q(status=Report.Status.GENERATING, updated_at__lt=timezone.now() - STALL_TIMEOUT)
+    ).update(status=Report.Status.GENERATING, updated_at=timezone.now())
+    if not claimed:
+        return None
+    return Report.objects.get(pk=report_id)
+
+
+def generate(report):
+    """
+    Export a claimed report chunk by chunk and assemble its file.
+    """
+    spec = REPORT_SPECS.get(report.report_type)
+    if spec is None:
+        raise ReportError(f"Unsupported report type {report.report_type}")
+    assemble = ASSEMBLERS.get(report.file_format)
+    if assemble is None:
+        raise ReportError(f"{report.file_format} reports are not supported")
+
+    queryset = spec.queryset(report)
+    fields = [column.field for column in spec.columns]
+    checkpoint = report.checkpoint or {}
+    parts = checkpoint.get('parts', [])
+    rows_written = checkpoint.get('rows', 0)
+    last_key = checkpoint.get('last_key')
+    if 'total' not in checkpoint:
+        checkpoint['total'] = queryset.count()
+    total = checkpoint['total']
+    if parts:
+        logger.info(f"Resuming report {report.pk} after {rows_written} rows")
+
+    order_field = spec.order_field
+    while True:
+        page = queryset
+        if last_key is not None:
+            last_value, last_pk = last_key
+            page = queryset.filter(
+                Q(**{f'{order_field}__gt': last_value}) | Q(**{order_field: last_value, 'pk__gt': last_pk})
+            )
+        chunk = list(page.order_by(order_field, 'pk').values_list(order_field, 'pk', *fields)[:CHUNK_SIZE])
+        if not chunk:
+            break
+
+        parts.append(_write_part(report, len(parts) + 1, [row[2:] for row in chunk]))
+        rows_written += len(chunk)
+        last_key = [_to_json(chunk[-1][0]), _to_json(chunk[-1][1])]
+        checkpoint.update(parts=parts, rows=rows_written, last_key=last_key)
+        saved = _save_progress(
+            report,
+            checkpoint=checkpoint,
+            progress_percentage=min(EXPORT_PROGRESS, EXPORT_PROGRESS * rows_written // max(total, 1)),
+        )
+        if not saved:
+            raise ReportTakenOver(f"Report {report.pk} is no longer generated by this worker")
+        if len(chunk) < CHUNK_SIZE:
+            break
+
+    extension = EXTENSIONS[report.file_format]
+    with tempfile.TemporaryFile() as output:
+        assemble(output, spec.columns, _assembly_heartbeat(report, parts))
+        size = output.tell()
+        output.seek(0)
+        name = default_storage.save(
+            OUTPUT_NAME.format(report_id=report.pk, slug=slugify(report.title) or 'report', extension=extension),
+            File(output),
+        )
+
+    report.checkpoint = {}
+    report.expires_at = timezone.now() + timezone.timedelta(days=REPORT_LIFETIME_DAYS)
+    report.complete_report(default_storage.url(name), size)
+    for part in parts:
+        default_storage.delete(part)
+    logger.info(f"Generated report {report.pk}: {rows_written} rows, {size} bytes")
+    return report
+
+
+def run_report(report_id):
+    """
+    Generate one report if it can be claimed.
+
+    Unexpected errors put the report back in the schedule with its
+    checkpoint, so the retry resumes where it stopped; after
+    ``MAX_ATTEMPTS`` the report fails for good.
+    """
+    report = claim_report(report_id)
+    if report is None:
+        return False
+    try:
+        generate(report)
+    except ReportTakenOver as e:
+        # The other worker owns the checkpoint and its parts now
+        logger.warning(str(e))
+        return False
+    except ReportError as e:
+        _save_progress(report, status=Report.Status.FAILED, error_message=str(e))
+        return False
+    except Exception as e:
+        logger.exception(f"Report {report_id} failed")
+        report.refresh_from_db(fields=['checkpoint'])
+        attempts = report.checkpoint.get('attempts', 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            _save_progress(report, status=Report.Status.FAILED, error_message=f"Report generation failed: {e}")
+        else:
+            _save_progress(
+                report,
+                status=Report.Status.SCHEDULED,
+                checkpoint={**report.checkpoint, 'attempts': attempts},
+            )
+        raise
+    return True
+
+
+def resume_stalled_reports():
+    """
+    Queue reports whose worker stopped sending progress, or that were
+    scheduled but never picked up.
+    """
+    from .tasks import generate_report
+
+    stalled = list(Report.objects.filter(
+        status__in=[Report.Status.SCHEDULED, Report.Status.GENERATING],
+        updated_at__lt=timezone.now() - STALL_TIMEOUT,
+    ).values_list('pk', flat=True))
+    for report_id in stalled:
+        generate_report.delay(report_id)
+    if stalled:
+        logger.warning(f"Requeued {len(stalled)} stalled reports")
+    return len(stalled)
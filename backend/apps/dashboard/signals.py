@@ -0,0 +1,17 @@
+"""
+Dashboard signals for AgriLink API.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Report
+
+
+@receiver(post_save, sender=Report)
+def report_post_save(sender, instance, created, **kwargs):
+    """
+    Queue newly scheduled reports for generation.
+    """
+    if created and instance.status == Report.Status.SCHEDULED:
+        from .tasks import generate_report
+        transaction.on_commit(lambda: generate_report.delay(instance.pk))
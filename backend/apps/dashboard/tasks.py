@@ -0,0 +1,45 @@
+"""
+Dashboard background tasks for AgriLink.
+"""
+from celery import shared_task
+
+from .alerts import evaluate_alert_rules
+from .kpis import refresh_kpi_views
+from .platform_metrics import collect_platform_metrics
+from .reports import MAX_ATTEMPTS, run_report, resume_stalled_reports
+
+
+@shared_task(bind=True, max_retries=MAX_ATTEMPTS - 1, default_retry_delay=60)
+def generate_report(self, report_id):
+    """
+    Generate a report file, resuming from its checkpoint after a failure.
+    """
+    try:
+        return run_report(report_id)
+    except Exception as e:
+        raise self.retry(exc=e)
+
+
+@shared_task
+def resume_stalled_report_generation():
+    """
+    Requeue reports that were abandoned by a crashed worker.
+    """
+    return resume_stalled_reports()
+
+
+@shared_task
+def refresh_dashboard_kpis():
+    """
+    Refresh the admin dashboard KPI views.
+    """
+    return refresh_kpi_views()
+
+
+@shared_task
+def evaluate_system_alerts():
+    """
+    Collect business metrics, then raise, escalate or resolve alerts.
+    """
+    collect_platform_metrics()
+    return evaluate_alert_rules()
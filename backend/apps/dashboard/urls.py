@@ -8,6 +8,7 @@ from .views import (
     SupplierDashboardView,
     ExpertDashboardView,
     AdminDashboardView,
+    AdminDashboardRefreshView,
 )
 
 urlpatterns = [
@@ -17,4 +18,5 @@ urlpatterns = [
     path('supplier/', SupplierDashboardView.as_view(), name='supplier_dashboard'),
     path('expert/', ExpertDashboardView.as_view(), name='expert_dashboard'),
     path('admin/', AdminDashboardView.as_view(), name='admin_dashboard'),
+    path('admin/refresh/', AdminDashboardRefreshView.as_view(), name='admin_dashboard_refresh'),
 ]
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Dashboard views for AgriLink API.
+"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db.models import Count, Sum, F
+from django.utils import timezone
+
+from core.permissions import IsFarmer, IsBuyer, IsSupplier, IsExpert, IsAdmin, IsActiveUser
+from .kpis import admin_kpis
+from .tasks import refresh_dashboard_kpis
+
+
+def _counts_by(queryset, field):
+    return {
+        row[field]: row['count']
+        for row in queryset.order_by().values(field).annotate(count=Count('pk'))
+    }
+
+
+def _dashboard_response(data):
+    return Response({
+        'success': True,
+        'data': data,
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+class FarmerDashboardView(APIView):
+    """
+    Listing, sales and inquiry overview for the current farmer.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsFarmer, IsActiveUser]
+
+    def get(self, request):
+        from apps.experts.models import Consultation
+        from apps.marketplace.models import ListingInquiry
+        from apps.orders.models import Order
+
+        user = request.user
+        sales = user.sales_orders.exclude(status__in=[Order.Status.CANCELLED, Order.Status.REFUNDED])
+        return _dashboard_response({
+            'listings': {
+                'by_status': _counts_by(user.produce_listings.all(), 'status'),
+                'active': user.produce_listings.active().count(),
+            },
+            'sales': {
+                'by_status': _counts_by(user.sales_orders.all(), 'status'),
+                'revenue': sales.aggregate(total=Sum('final_amount'))['total'] or 0,
+            },
+            'pending_inquiries': ListingInquiry.objects.filter(
+                listing__farmer=user, status=ListingInquiry.Status.PENDING
+            ).count(),
+            'upcoming_consultations': user.farmer_consultations.filter(
+                scheduled_date__gte=timezone.now(),
+                status__in=[Consultation.Status.REQUESTED, Consultation.Status.SCHEDULED],
+            ).count(),
+        })
+
+
+class BuyerDashboardView(APIView):
+    """
+    Purchase and inquiry overview for the current buyer.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsBuyer, IsActiveUser]
+
+    def get(self, request):
+        from apps.marketplace.models import ListingInquiry
+        from apps.orders.models import Order
+
+        user = request.user
+        purchases = user.purchase_orders.exclude(status__in=[Order.Status.CANCELLED, Order.Status.REFUNDED])
+        return _dashboard_response({
+            'orders': {
+                'by_status': _counts_by(user.purchase_orders.all(), 'status'),
+                'total_spent': purchases.aggregate(total=Sum('final_amount'))['total'] or 0,
+            },
+            'inquiries': _counts_by(ListingInquiry.objects.filter(buyer=user), 'status'),
+        })
+
+
+class SupplierDashboardView(APIView):
+    """
+    Catalog, stock and inquiry overview for the current supplier.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsSupplier, IsActiveUser]
+
+    def get(self, request):
+        user = request.user
+        return _dashboard_response({
+            'products': {
+                'by_status': _counts_by(user.products.all(), 'status'),
+                'low_stock': user.products.filter(
+                    is_unlimited=False, stock_quantity__lte=F('reorder_level')
+                ).count(),
+            },
+            'inquiries': _counts_by(user.inquiries_received.all(), 'status'),
+        })
+
+
+class ExpertDashboardView(APIView):
+    """
+    Consultation and advice overview for the current expert.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsExpert, IsActiveUser]
+
+    def get(self, request):
+        from apps.experts.stats import get_expert_stats
+
+        stats = get_expert_stats(request.user)
+        return _dashboard_response({
+            'advice': {
+                'published_posts': stats.published_posts,
+                'total_views': stats.total_views,
+                'total_likes': stats.total_likes,
+                'total_comments': stats.total_comments,
+            },
+            'consultations': {
+                'total': stats.consultations_total,
+                'pending': stats.consultations_requested,
+                'upcoming': stats.consultations_upcoming,
+                'completed': stats.consultations_completed,
+            },
+            'earnings_total': stats.earnings_total,
+        })
+
+
+class AdminDashboardView(APIView):
+    """
+    Platform-wide KPIs, read from the dashboard's materialized views.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return _dashboard_response(admin_kpis())
+
+
+class AdminDashboardRefreshView(APIView):
+    """
+    Queue an immediate refresh of the admin dashboard KPIs.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        refresh_dashboard_kpis.delay()
+        return Response({
+            'success': True,
+            'message': 'Dashboard KPI refresh queued',
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,151 @@
+"""
+Precomputed advice feed for AgriLink.
+
+Published posts are scored once per refresh from recency, engagement and
+the author's rating, and grouped into ranked ``(post_id, score)`` lists
+per segment: target audience, audience within a category, region and
+crop. A reader's feed is a merge of their segments' lists;
+pages are then loaded by primary key.
+"""
+import math
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.utils import timezone
+import logging
+
+from core.utils import region_for_point
+from .matching import normalize_terms
+from .models import AdvicePost
+
+logger = logging.getLogger(__name__)
+
+FEED_KEY = 'advice_feed:{segment}'
+FEED_BUILT_KEY = 'advice_feed:built_at'
+FEED_LOCK_KEY = 'advice_feed:lock'
+FEED_TIMEOUT = 60 * 60
+SEGMENT_SIZE = 500
+CANDIDATE_LIMIT = 20000
+RECENCY_HALF_LIFE_DAYS = 21
+
+# Boosts for posts that also match the reader's region or crops
+REGION_BOOST = 0.2
+CROP_BOOST = 0.3
+
+AUDIENCE_BY_ROLE = {
+    'FARMER': AdvicePost.TargetAudience.FARMERS,
+    'BUYER': AdvicePost.TargetAudience.BUYERS,
+    'SUPPLIER': AdvicePost.TargetAudience.SUPPLIERS,
+}
+
+
+def score_post(published_at, likes, comments, views, rating, now):
+    """
+    Combine recency, engagement and expert rating into one score.
+    """
+    age_days = max((now - published_at).total_seconds() / 86400, 0)
+    recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    engagement = math.log1p(likes + 2 * comments + views / 10) / 10
+    return round(0.5 * recency + 0.3 * min(engagement, 1) + 0.2 * float(rating or 0) / 5, 6)
+
+
+def build_feed():
+    """
+    Recompute every segment list and store them in the cache.
+    """
+    now = timezone.now()
+    posts = AdvicePost.objects.filter(
+        is_published=True, published_at__isnull=False
+    ).order_by('-published_at').values_list(
+        'id', 'category', 'target_audience', 'tags', 'published_at',
+        'likes_count', 'comments_count', 'view_count',
+        'expert__location', 'expert__expert_profile__rating',
+    )[:CANDIDATE_LIMIT]
+
+    segments = defaultdict(list)
+    for (post_id, category, audience, tags, published_at,
+         likes, comments, views, location, rating) in posts:
+        entry = (str(post_id), score_post(published_at, likes, comments, views, rating, now))
+        for value in audience or [AdvicePost.TargetAudience.ALL]:
+            segments[f'audience:{value}'].append(entry)
+            # Category feeds get their own lists, so they aren't cut to the audience's top posts
+            segments[f'audience:{value}:category:{category}'].append(entry)
+        region = region_for_point(location)
+        if region:
+            segments[f'region:{region}'].append(entry)
+        for term in normalize_terms(tags):
+            segments[f'crop:{term}'].append(entry)
+
+    cache.set_many(
+        {
+            FEED_KEY.format(segment=segment): sorted(entries, key=lambda entry: -entry[1])[:SEGMENT_SIZE]
+            for segment, entries in segments.items()
+        },
+        timeout=FEED_TIMEOUT,
+    )
+    cache.set(FEED_BUILT_KEY, now.isoformat(), timeout=FEED_TIMEOUT)
+    logger.info(f"Built advice feed with {len(segments)} segments")
+    return len(segments)
+
+
+def ensure_feed():
+    """
+    Build the feed if it is missing, letting one request do the work.
+    """
+    if cache.get(FEED_BUILT_KEY):
+        return
+    if cache.add(FEED_LOCK_KEY, 1, timeout=60):
+        try:
+            build_feed()
+        finally:
+            cache.delete(FEED_LOCK_KEY)
+
+
+def get_segment(segment):
+    return cache.get(FEED_KEY.format(segment=segment)) or []
+
+
+def reader_segments(user):
+    """
+    Get the audience, region and crop segments of a reader.
+    """
+    audiences = [AdvicePost.TargetAudience.ALL]
+    role_audience = AUDIENCE_BY_ROLE.get(getattr(user, 'role', None))
+    if role_audience:
+        audiences.append(role_audience)
+
+    region, crops = '', []
+    profile = getattr(user, 'farmer_profile', None) if user and user.is_authenticated else None
+    if profile is not None:
+        region = region_for_point(profile.farm_location or user.location)
+        crops = normalize_terms(profile.primary_crops)
+    elif user and user.is_authenticated:
+        region = region_for_point(user.location)
+
+    return audiences, region, crops
+
+
+def get_feed_ids(user, category=None):
+    """
+    Get the ranked post ids of a reader's feed.
+    """
+    ensure_feed()
+    audiences, region, crops = reader_segments(user)
+
+    scores = {}
+    for audience in audiences:
+        segment = f'audience:{audience}:category:{category}' if category else f'audience:{audience}'
+        scores.update(get_segment(segment))
+
+    boosts = []
+    if region:
+        boosts.append((f'region:{region}', REGION_BOOST))
+    boosts.extend((f'crop:{crop}', CROP_BOOST) for crop in crops)
+
+    boosted = dict(scores)
+    for segment, boost in boosts:
+        for post_id, _ in get_segment(segment):
+            if post_id in scores:
+                boosted[post_id] += boost
+
+    return sorted(boosted, key=lambda post_id: -boosted[post_id])
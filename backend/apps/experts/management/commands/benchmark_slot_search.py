@@ -0,0 +1,141 @@
+"""
+Benchmark the consultation slot search.
+"""
+import datetime
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.utils import timezone
+
+from apps.users.models import ExpertProfile
+from apps.experts.models import Consultation, ExpertAvailabilityWindow, ExpertBooking
+from apps.experts.services import find_free_slots
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Seed experts, availability and bookings, then time the free slot search.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--experts', type=int, default=1000)
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--bookings-per-day', type=int, default=2)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['experts'], options['days'], options['bookings_per_day'])
+            self.run_benchmark(options['days'], options['runs'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def seed(self, expert_count, days, bookings_per_day):
+        started = time.perf_counter()
+        specializations = list(ExpertProfile.Specialization.values)
+        tag = uuid.uuid4().hex[:8]
+
+        farmer = User.objects.create(
+            email=f'bench-farmer-{tag}@example.com',
+            username=f'bench-farmer-{tag}',
+            first_name='Bench',
+            last_name='Farmer',
+            role=User.Role.FARMER,
+        )
+        experts = User.objects.bulk_create([
+            User(
+                email=f'bench-expert-{tag}-{index}@example.com',
+                username=f'bench-expert-{tag}-{index}',
+                first_name='Bench',
+                last_name=f'Expert {index}',
+                role=User.Role.EXPERT,
+                password='!',
+            )
+            for index in range(expert_count)
+        ], batch_size=1000)
+
+        ExpertProfile.objects.bulk_create([
+            ExpertProfile(
+                user=expert,
+                specialization=random.sample(specializations, 2),
+                consultation_rate=random.randint(10, 80),
+                rating=round(random.uniform(3, 5), 2),
+                bio='Benchmark expert',
+            )
+            for expert in experts
+        ], batch_size=1000)
+
+        ExpertAvailabilityWindow.objects.bulk_create([
+            ExpertAvailabilityWindow(
+                expert=expert,
+                weekday=weekday,
+                start_time=datetime.time(8),
+                end_time=datetime.time(17),
+                timezone='Africa/Nairobi',
+            )
+            for expert in experts
+            for weekday in range(5)
+        ], batch_size=5000)
+
+        today = timezone.now().replace(minute=0, second=0, microsecond=0)
+        consultations = []
+        bookings = []
+        for expert in experts:
+            for day in range(days):
+                hours = random.sample(range(6, 14), bookings_per_day)
+                for hour in hours:
+                    start = today.replace(hour=hour) + datetime.timedelta(days=day)
+                    consultation = Consultation(
+                        expert=expert,
+                        farmer=farmer,
+                        topic='Benchmark consultation',
+                        description='Benchmark consultation',
+                        consultation_type=Consultation.ConsultationType.VIDEO,
+                        scheduled_date=start,
+                        duration_minutes=60,
+                        status=Consultation.Status.SCHEDULED,
+                        consultation_rate=20,
+                        total_amount=20,
+                    )
+                    consultations.append(consultation)
+                    bookings.append(ExpertBooking(
+                        consultation=consultation,
+                        expert=expert,
+                        period=DateTimeTZRange(start, start + datetime.timedelta(hours=1), '[)'),
+                    ))
+
+        Consultation.objects.bulk_create(consultations, batch_size=5000)
+        ExpertBooking.objects.bulk_create(bookings, batch_size=5000)
+
+        self.stdout.write(
+            f'Seeded {expert_count} experts and {len(bookings)} bookings '
+            f'in {time.perf_counter() - started:.1f}s'
+        )
+
+    def run_benchmark(self, days, runs):
+        scenarios = [
+            ('any expert, next 20', {}),
+            ('specialization, next 20', {'specialization': ExpertProfile.Specialization.PEST_CONTROL}),
+            ('specialization, next 100, 1 per expert', {
+                'specialization': ExpertProfile.Specialization.IRRIGATION, 'limit': 100, 'per_expert': 1,
+            }),
+        ]
+
+        for name, kwargs in scenarios:
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                slots = find_free_slots(days=days, **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(
+                f'{name}: {len(slots)} slots, median {statistics.median(timings):.1f}ms, '
+                f'min {min(timings):.1f}ms, max {max(timings):.1f}ms'
+            )
@@ -0,0 +1,14 @@
+"""
+Rebuild the full-text search vectors of advice posts.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.experts.services import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the weighted search vectors of all advice posts.'
+
+    def handle(self, *args, **options):
+        updated = update_search_vectors()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search vectors for {updated} advice posts'))
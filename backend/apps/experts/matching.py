@@ -0,0 +1,300 @@
+"""
+Expert matching engine for AgriLink.
+
+Each expert is described by a precomputed ``ExpertMatchProfile`` row. The
+rows are loaded into NumPy arrays once per process and patched
+incrementally when their generation changes, so ranking every expert for
+a farmer is a handful of vectorized operations.
+"""
+import datetime
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.cache import bump_generation, get_generations
+from apps.users.models import ExpertProfile
+from .models import Consultation, ExpertAvailabilityWindow, ExpertMatchProfile
+from .services import BLOCKING_STATUSES
+
+User = get_user_model()
+
+AVAILABILITY_HORIZON_DAYS = 14
+AVAILABILITY_TARGET_HOURS = 20
+DISTANCE_SCALE_KM = 200
+EARTH_RADIUS_KM = 6371.0
+
+DEFAULT_WEIGHTS = {
+    'specialization': 0.4,
+    'distance': 0.2,
+    'rating': 0.2,
+    'rate': 0.1,
+    'availability': 0.1,
+}
+
+STOP_WORDS = {'and', 'of', 'the', 'for', 'in', 'management'}
+
+
+def normalize_terms(values):
+    """
+    Split specializations or crop names into lowercase word terms.
+    """
+    terms = set()
+    for value in values or []:
+        for word in re.split(r'[^a-z0-9]+', str(value).lower()):
+            if len(word) > 1 and word not in STOP_WORDS:
+                terms.add(word)
+    return sorted(terms)
+
+
+def _window_hours(expert_ids):
+    hours = defaultdict(float)
+    windows = ExpertAvailabilityWindow.objects.filter(expert_id__in=expert_ids).values_list(
+        'expert_id', 'start_time', 'end_time'
+    )
+    # The horizon covers exactly two weeks, so every weekday occurs twice
+    repeats = AVAILABILITY_HORIZON_DAYS // 7
+    for expert_id, start_time, end_time in windows:
+        minutes = (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+        hours[expert_id] += repeats * minutes / 60
+    return hours
+
+
+def _booked_hours(expert_ids):
+    now = timezone.now()
+    rows = Consultation.objects.filter(
+        expert_id__in=expert_ids,
+        status__in=BLOCKING_STATUSES,
+        scheduled_date__gte=now,
+        scheduled_date__lt=now + datetime.timedelta(days=AVAILABILITY_HORIZON_DAYS),
+    ).values('expert_id').annotate(minutes=Sum('duration_minutes')).order_by()
+    return {row['expert_id']: row['minutes'] / 60 for row in rows}
+
+
+def refresh_expert_features(expert_ids=None):
+    """
+    Recompute the match features of the given experts, or of all experts.
+    """
+    profiles = ExpertProfile.objects.select_related('user').only(
+        'user_id', 'specialization', 'rating', 'consultation_rate',
+        'user__is_active', 'user__role', 'user__location',
+    )
+    if expert_ids is not None:
+        expert_ids = list(expert_ids)
+        if not expert_ids:
+            return 0
+        profiles = profiles.filter(user_id__in=expert_ids)
+
+    profiles = list(profiles)
+    ids = [profile.user_id for profile in profiles]
+    window_hours = _window_hours(ids)
+    booked_hours = _booked_hours(ids)
+
+    rows = []
+    for profile in profiles:
+        location = profile.user.location
+        rows.append(ExpertMatchProfile(
+            expert_id=profile.user_id,
+            terms=normalize_terms(profile.specialization),
+            latitude=location.y if location else None,
+            longitude=location.x if location else None,
+            rating=float(profile.rating or 0),
+            consultation_rate=float(profile.consultation_rate or 0),
+            available_hours=max(window_hours.get(profile.user_id, 0) - booked_hours.get(profile.user_id, 0), 0),
+            is_active=profile.user.is_active and profile.user.role == User.Role.EXPERT,
+        ))
+
+    ExpertMatchProfile.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['expert'],
+        update_fields=[
+            'terms', 'latitude', 'longitude', 'rating', 'consultation_rate',
+            'available_hours', 'is_active', 'updated_at',
+        ],
+    )
+
+    if expert_ids is not None:
+        # Experts whose profile was deleted drop out of the index
+        missing = set(expert_ids) - set(ids)
+        if missing:
+            ExpertMatchProfile.objects.filter(expert_id__in=missing).update(
+                is_active=False, updated_at=timezone.now()
+            )
+
+    bump_generation(ExpertMatchProfile)
+    return len(rows)
+
+
+class ExpertMatchIndex:
+    """
+    In-process NumPy view of all ``ExpertMatchProfile`` rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.generation = None
+        self.synced_until = None
+        self.positions = {}
+        self.expert_ids = []
+        self.vocabulary = {}
+        self.term_matrix = np.zeros((0, 0), dtype=bool)
+        self.coordinates = np.zeros((0, 2))
+        self.rating = np.zeros(0)
+        self.rate = np.zeros(0)
+        self.available_hours = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
+
+    def sync(self):
+        """
+        Load rows changed since the last sync, if the generation moved.
+        """
+        generation = get_generations([ExpertMatchProfile])[0]
+        if generation == self.generation and self.synced_until is not None:
+            return
+
+        with self._lock:
+            if generation == self.generation and self.synced_until is not None:
+                return
+
+            rows = ExpertMatchProfile.objects.order_by()
+            if self.synced_until is not None:
+                rows = rows.filter(updated_at__gte=self.synced_until)
+            rows = list(rows.values_list(
+                'expert_id', 'terms', 'latitude', 'longitude', 'rating',
+                'consultation_rate', 'available_hours', 'is_active', 'updated_at',
+            ))
+            self._apply(rows)
+            if rows:
+                self.synced_until = max(row[-1] for row in rows)
+            elif self.synced_until is None:
+                self.synced_until = timezone.now()
+            self.generation = generation
+
+    def _apply(self, rows):
+        new_ids = [row[0] for row in rows if row[0] not in self.positions]
+        new_terms = sorted({
+            term for row in rows for term in row[1] if term not in self.vocabulary
+        })
+
+        if new_ids:
+            count = len(new_ids)
+            for expert_id in new_ids:
+                self.positions[expert_id] = len(self.expert_ids)
+                self.expert_ids.append(expert_id)
+            self.term_matrix = np.vstack([
+                self.term_matrix, np.zeros((count, self.term_matrix.shape[1]), dtype=bool)
+            ])
+            self.coordinates = np.vstack([self.coordinates, np.full((count, 2), np.nan)])
+            self.rating = np.concatenate([self.rating, np.zeros(count)])
+            self.rate = np.concatenate([self.rate, np.zeros(count)])
+            self.available_hours = np.concatenate([self.available_hours, np.zeros(count)])
+            self.active = np.concatenate([self.active, np.zeros(count, dtype=bool)])
+
+        if new_terms:
+            for term in new_terms:
+                self.vocabulary[term] = len(self.vocabulary)
+            self.term_matrix = np.hstack([
+                self.term_matrix, np.zeros((self.term_matrix.shape[0], len(new_terms)), dtype=bool)
+            ])
+
+        for expert_id, terms, latitude, longitude, rating, rate, hours, is_active, _ in rows:
+            position = self.positions[expert_id]
+            self.term_matrix[position, :] = False
+            self.term_matrix[position, [self.vocabulary[term] for term in terms]] = True
+            self.coordinates[position] = (
+                np.radians([latitude, longitude]) if latitude is not None and longitude is not None
+                else (np.nan, np.nan)
+            )
+            self.rating[position] = rating
+            self.rate[position] = rate
+            self.available_hours[position] = hours
+            self.active[position] = is_active
+
+    def _distance_km(self, latitude, longitude):
+        lat1, lon1 = np.radians(latitude), np.radians(longitude)
+        lat2, lon2 = self.coordinates[:, 0], self.coordinates[:, 1]
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def top_k(self, crops, latitude=None, longitude=None, k=10, weights=None):
+        """
+        Rank experts for a farmer and return the best ``k`` with their scores.
+        """
+        self.sync()
+        weights = dict(weights or getattr(settings, 'EXPERT_MATCH_WEIGHTS', DEFAULT_WEIGHTS))
+
+        with self._lock:
+            if not self.expert_ids:
+                return []
+
+            components = {}
+            crop_columns = [self.vocabulary[term] for term in normalize_terms(crops) if term in self.vocabulary]
+            crop_count = len(normalize_terms(crops))
+            if crop_count:
+                components['specialization'] = self.term_matrix[:, crop_columns].sum(axis=1) / crop_count
+            else:
+                components['specialization'] = np.zeros(len(self.expert_ids))
+
+            distances = np.full(len(self.expert_ids), np.nan)
+            if latitude is not None and longitude is not None:
+                distances = self._distance_km(latitude, longitude)
+                components['distance'] = np.nan_to_num(np.exp(-distances / DISTANCE_SCALE_KM), nan=0.0)
+            else:
+                # Without a farm location the other components share its weight
+                weights.pop('distance', None)
+
+            components['rating'] = np.clip(self.rating / 5, 0, 1)
+            positive_rates = self.rate[self.active & (self.rate > 0)]
+            median_rate = np.median(positive_rates) if positive_rates.size else 1.0
+            components['rate'] = 1 / (1 + self.rate / median_rate)
+            components['availability'] = np.clip(self.available_hours / AVAILABILITY_TARGET_HOURS, 0, 1)
+
+            total_weight = sum(weights.get(name, 0) for name in components) or 1
+            scores = sum(weights.get(name, 0) * values for name, values in components.items()) / total_weight
+            scores = np.where(self.active, scores, -np.inf)
+
+            k = min(k, int(self.active.sum()))
+            if k <= 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+
+            return [
+                {
+                    'expert_id': self.expert_ids[position],
+                    'score': round(float(scores[position]), 4),
+                    'distance_km': None if np.isnan(distances[position]) else round(float(distances[position]), 1),
+                    'components': {
+                        name: round(float(values[position]), 4) for name, values in components.items()
+                    },
+                }
+                for position in best
+            ]
+
+
+match_index = ExpertMatchIndex()
+
+
+def match_experts_for_farmer(farmer, k=10):
+    """
+    Return the top ``k`` experts for a farmer.
+    """
+    profile = getattr(farmer, 'farmer_profile', None)
+    crops = profile.primary_crops if profile else []
+    location = (profile.farm_location if profile else None) or farmer.location
+    return match_index.top_k(
+        crops,
+        latitude=location.y if location else None,
+        longitude=location.x if location else None,
+        k=k,
+    )
@@ -4,14 +4,20 @@ Expert services models for AgriLink.
 import uuid
 from django.contrib.gis.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.conf import settings
+from core.models import VersionedModel
+from core.slugs import UniqueSlugMixin
 
 User = get_user_model()
 
 
-class AdvicePost(models.Model):
+class AdvicePost(UniqueSlugMixin, VersionedModel):
     """
     Advice posts published by agricultural experts.
     """
@@ -72,10 +78,15 @@ class AdvicePost(models.Model):
     is_published = models.BooleanField(default=False)
     published_at = models.DateTimeField(blank=True, null=True)
 
+    # Full-text search document, maintained from title, excerpt, tags and content
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    unversioned_fields = ('view_count',)
+
     class Meta:
         db_table = 'advice_posts'
         indexes = [
@@ -84,6 +95,13 @@ class AdvicePost(models.Model):
             models.Index(fields=['is_featured', 'published_at']),
             models.Index(fields=['published_at']),
             models.Index(fields=['view_count']),
+            GinIndex(fields=['search_vector'], name='advice_posts_search_gin'),
+            GinIndex(fields=['tags'], name='advice_posts_tags_gin', opclasses=['jsonb_path_ops']),
+            GinIndex(
+                fields=['target_audience'],
+                name='advice_posts_audience_gin',
+                opclasses=['jsonb_path_ops'],
+            ),
         ]
         ordering = ['-published_at', '-created_at']
 
@@ -91,17 +109,6 @@ class AdvicePost(models.Model):
         return f"{self.title} by {self.expert.full_name}"
 
     def save(self, *args, **kwargs):
-        # Generate slug from title if not provided
-        if not self.slug:
-            from django.utils.text import slugify
-            base_slug = slugify(self.title)
-            unique_slug = base_slug
-            counter = 1
-            while AdvicePost.objects.filter(slug=unique_slug).exists():
-                unique_slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = unique_slug
-
         # Set published timestamp
         if self.is_published and not self.published_at:
             self.published_at = timezone.now()
@@ -112,8 +119,11 @@ class AdvicePost(models.Model):
         """
         Increment view count for the post.
         """
+        from .stats import apply_engagement_delta
+
         self.view_count += 1
         self.save(update_fields=['view_count'])
+        apply_engagement_delta(self.expert_id, views=1)
 
     @property
     def reading_time(self):
@@ -259,6 +269,7 @@ class Consultation(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     cancelled_at = models.DateTimeField(blank=True, null=True)
+    reminder_sent_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = 'consultations'
@@ -268,6 +279,17 @@ class Consultation(models.Model):
             models.Index(fields=['scheduled_date']),
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['consultation_type']),
+            # Scheduler scans: reminders still to send and sessions still open
+            models.Index(
+                fields=['scheduled_date'],
+                name='consultation_reminder_due_idx',
+                condition=models.Q(status='SCHEDULED', reminder_sent_at__isnull=True),
+            ),
+            models.Index(
+                fields=['scheduled_date'],
+                name='consultation_open_idx',
+                condition=models.Q(status__in=['REQUESTED', 'SCHEDULED']),
+            ),
         ]
         ordering = ['-created_at']
 
@@ -340,6 +362,159 @@ class Consultation(models.Model):
         ]
 
 
+class ExpertAvailabilityWindow(models.Model):
+    """
+    Weekly recurring availability window of an expert.
+
+    Times are wall-clock times in ``timezone``; slots start every
+    ``slot_minutes`` inside the window.
+    """
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, 'Monday'
+        TUESDAY = 1, 'Tuesday'
+        WEDNESDAY = 2, 'Wednesday'
+        THURSDAY = 3, 'Thursday'
+        FRIDAY = 4, 'Friday'
+        SATURDAY = 5, 'Saturday'
+        SUNDAY = 6, 'Sunday'
+
+    expert = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='availability_windows',
+        limit_choices_to={'role': User.Role.EXPERT}
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    timezone = models.CharField(max_length=50, default='UTC')
+    slot_minutes = models.PositiveSmallIntegerField(default=30)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'expert_availability_windows'
+        indexes = [
+            models.Index(fields=['expert', 'weekday']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(end_time__gt=models.F('start_time')),
+                name='availability_window_end_after_start',
+            ),
+        ]
+        ordering = ['expert', 'weekday', 'start_time']
+
+    def __str__(self):
+        return f"{self.expert.full_name}: {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
+class ExpertBooking(models.Model):
+    """
+    Time range during which an expert is booked by a consultation.
+
+    Kept in sync with active consultations; the exclusion constraint
+    rejects overlapping bookings for the same expert.
+    """
+    consultation = models.OneToOneField(
+        Consultation,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='booking'
+    )
+    expert = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
+    period = DateTimeRangeField()
+
+    class Meta:
+        db_table = 'expert_bookings'
+        constraints = [
+            ExclusionConstraint(
+                name='expert_bookings_no_overlap',
+                expressions=[
+                    ('expert', RangeOperators.EQUAL),
+                    ('period', RangeOperators.OVERLAPS),
+                ],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.expert_id} booked {self.period}"
+
+
+class ExpertMatchProfile(models.Model):
+    """
+    Precomputed matching features of an expert.
+
+    Rows are refreshed whenever the expert's profile, location or bookings
+    change and read incrementally by the in-process matching index.
+    """
+    expert = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='match_profile'
+    )
+    terms = models.JSONField(default=list, help_text="Normalized specialization terms")
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    rating = models.FloatField(default=0)
+    consultation_rate = models.FloatField(default=0)
+    available_hours = models.FloatField(default=0, help_text="Free hours in the next two weeks")
+    is_active = models.BooleanField(default=True)
+
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        db_table = 'expert_match_profiles'
+
+    def __str__(self):
+        return f"Match features for {self.expert_id}"
+
+
+class ExpertStats(models.Model):
+    """
+    Materialized statistics of an expert.
+
+    Engagement counters move with like, comment and view events;
+    consultation figures are recomputed when one of the expert's
+    consultations changes, and everything is reconciled periodically.
+    """
+    expert = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='expert_stats'
+    )
+
+    # Advice posts
+    published_posts = models.IntegerField(default=0)
+    total_views = models.BigIntegerField(default=0)
+    total_likes = models.IntegerField(default=0)
+    total_comments = models.IntegerField(default=0)
+
+    # Consultations
+    consultations_total = models.IntegerField(default=0)
+    consultations_requested = models.IntegerField(default=0)
+    consultations_scheduled = models.IntegerField(default=0)
+    consultations_completed = models.IntegerField(default=0)
+    consultations_cancelled = models.IntegerField(default=0)
+    consultations_no_show = models.IntegerField(default=0)
+    consultations_upcoming = models.IntegerField(default=0)
+
+    # Earnings from completed consultations
+    earnings_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    monthly = models.JSONField(default=dict, help_text="Completed consultations and earnings per YYYY-MM")
+
+    reconciled_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'expert_stats'
+
+    def __str__(self):
+        return f"Statistics for {self.expert_id}"
+
+
 class ConsultationReview(models.Model):
     """
     Reviews for completed consultations.
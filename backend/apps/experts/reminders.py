@@ -0,0 +1,161 @@
+"""
+Consultation reminder and no-show scheduler for AgriLink.
+
+Both jobs claim due consultations in batches with ``SELECT ... FOR UPDATE
+SKIP LOCKED`` and record the outcome in the same transaction, so any
+number of workers can run them concurrently and each consultation is
+handled exactly once.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+from core.cache import bump_generation
+from .models import Consultation, ExpertBooking
+
+logger = logging.getLogger(__name__)
+
+
+def _consultation_notification(recipient_id, consultation_id, title, message, notification_type, priority):
+    from apps.notifications.models import Notification
+
+    return Notification(
+        recipient_id=recipient_id,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        priority=priority,
+        related_object_type=Notification.RelatedObjectType.CONSULTATION,
+        related_object_id=consultation_id,
+        action_url=f"/experts/consultations/{consultation_id}/",
+    )
+
+
+def send_due_reminders(batch_size=200):
+    """
+    Remind both participants of scheduled consultations starting soon.
+    """
+    from apps.notifications.models import Notification
+
+    now = timezone.now()
+    lead = datetime.timedelta(minutes=getattr(settings, 'CONSULTATION_REMINDER_LEAD_MINUTES', 60))
+    sent = 0
+
+    while True:
+        with transaction.atomic():
+            claimed = list(
+                Consultation.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                    status=Consultation.Status.SCHEDULED,
+                    reminder_sent_at__isnull=True,
+                    scheduled_date__gte=now,
+                    scheduled_date__lt=now + lead,
+                ).select_related('expert', 'farmer').order_by('scheduled_date')[:batch_size]
+            )
+            if not claimed:
+                break
+
+            notifications = []
+            for consultation in claimed:
+                starts_in = max(int((consultation.scheduled_date - now).total_seconds() // 60), 0)
+                for recipient, other in (
+                    (consultation.farmer, consultation.expert),
+                    (consultation.expert, consultation.farmer),
+                ):
+                    notifications.append(_consultation_notification(
+                        recipient.pk,
+                        consultation.pk,
+                        "Upcoming consultation",
+                        f"Your consultation \"{consultation.topic}\" with {other.full_name} "
+                        f"starts in {starts_in} minutes.",
+                        Notification.Type.REMINDER,
+                        Notification.Priority.HIGH,
+                    ))
+
+            Notification.objects.bulk_create(notifications, batch_size=500)
+            Consultation.objects.filter(pk__in=[consultation.pk for consultation in claimed]).update(
+                reminder_sent_at=now
+            )
+            sent += len(claimed)
+
+        if len(claimed) < batch_size:
+            break
+
+    if sent:
+        logger.info(f"Sent reminders for {sent} consultations")
+    return sent
+
+
+def mark_past_due(batch_size=500):
+    """
+    Close consultations whose start time passed by more than the grace period.
+
+    Scheduled sessions that never started become no-shows; requests that
+    were never confirmed are cancelled. Their bookings are released.
+    """
+    from apps.notifications.models import Notification
+    from .matching import refresh_expert_features
+    from .stats import refresh_consultation_stats
+
+    now = timezone.now()
+    grace = datetime.timedelta(minutes=getattr(settings, 'CONSULTATION_NO_SHOW_GRACE_MINUTES', 30))
+    expert_ids = set()
+    closed = 0
+
+    while True:
+        with transaction.atomic():
+            claimed = list(
+                Consultation.objects.select_for_update(skip_locked=True).filter(
+                    status__in=[Consultation.Status.REQUESTED, Consultation.Status.SCHEDULED],
+                    scheduled_date__lt=now - grace,
+                ).order_by('scheduled_date').values_list(
+                    'pk', 'status', 'expert_id', 'farmer_id', 'topic'
+                )[:batch_size]
+            )
+            if not claimed:
+                break
+
+            no_show_ids = [row[0] for row in claimed if row[1] == Consultation.Status.SCHEDULED]
+            expired_ids = [row[0] for row in claimed if row[1] == Consultation.Status.REQUESTED]
+
+            Consultation.objects.filter(pk__in=no_show_ids).update(
+                status=Consultation.Status.NO_SHOW, updated_at=now
+            )
+            Consultation.objects.filter(pk__in=expired_ids).update(
+                status=Consultation.Status.CANCELLED,
+                cancelled_at=now,
+                updated_at=now,
+                shared_notes="Cancelled automatically: the request was not confirmed in time",
+            )
+            ExpertBooking.objects.filter(consultation_id__in=[row[0] for row in claimed]).delete()
+
+            notifications = []
+            for consultation_id, status, expert_id, farmer_id, topic in claimed:
+                if status == Consultation.Status.SCHEDULED:
+                    title, message = "Consultation missed", f"Consultation \"{topic}\" was marked as a no-show."
+                else:
+                    title, message = "Consultation request expired", (
+                        f"Consultation request \"{topic}\" expired before it was confirmed."
+                    )
+                for recipient_id in (farmer_id, expert_id):
+                    notifications.append(_consultation_notification(
+                        recipient_id, consultation_id, title, message,
+                        Notification.Type.CONSULTATION, Notification.Priority.NORMAL,
+                    ))
+            Notification.objects.bulk_create(notifications, batch_size=500)
+
+            expert_ids.update(row[2] for row in claimed)
+            closed += len(claimed)
+
+        if len(claimed) < batch_size:
+            break
+
+    if closed:
+        # Bulk updates skip post_save, so refresh what the signals would have
+        bump_generation(Consultation)
+        refresh_expert_features(expert_ids)
+        refresh_consultation_stats(expert_ids)
+        logger.info(f"Closed {closed} past-due consultations")
+    return closed
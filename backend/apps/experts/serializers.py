@@ -8,10 +8,25 @@ from django.utils import timezone
 from core.utils import format_currency, format_date
 from core.exceptions import ValidationException, NotFoundException
 from .models import AdvicePost, AdvicePostLike, AdvicePostComment, Consultation, ConsultationReview
+from .services import liked_post_ids
 
 User = get_user_model()
 
 
+class AdvicePostListSerializer(serializers.ListSerializer):
+    """
+    List serializer that looks up the current user's likes for a whole page.
+    """
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        if request is not None:
+            liked = liked_post_ids(request.user, [post.pk for post in posts])
+            self.context['liked_post_ids'] = self.context.get('liked_post_ids', set()) | liked
+        return super().to_representation(posts)
+
+
 class AdvicePostSerializer(serializers.ModelSerializer):
     """
     Serializer for expert advice posts.
@@ -24,6 +39,9 @@ class AdvicePostSerializer(serializers.ModelSerializer):
     likes_count = serializers.ReadOnlyField()
     comments_count = serializers.ReadOnlyField()
     is_liked = serializers.SerializerMethodField()
+    search_rank = serializers.FloatField(read_only=True)
+    search_title = serializers.CharField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True)
 
     class Meta:
         model = AdvicePost
@@ -36,13 +54,15 @@ class AdvicePostSerializer(serializers.ModelSerializer):
             'is_featured', 'view_count', 'likes_count',
             'comments_count', 'is_liked',
             'formatted_date', 'reading_time',
-            'published_at', 'created_at', 'updated_at'
+            'published_at', 'created_at', 'updated_at',
+            'search_rank', 'search_title', 'search_snippet'
         ]
         read_only_fields = [
             'id', 'expert', 'expert_name', 'slug', 'view_count',
             'likes_count', 'comments_count', 'published_at',
             'created_at', 'updated_at'
         ]
+        list_serializer_class = AdvicePostListSerializer
 
     def get_expert_profile(self, obj):
         """
@@ -70,6 +90,9 @@ class AdvicePostSerializer(serializers.ModelSerializer):
         """
         Check if current user has liked this post.
         """
+        if 'liked_post_ids' in self.context:
+            return obj.pk in self.context['liked_post_ids']
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
@@ -138,22 +161,8 @@ class AdvicePostSerializer(serializers.ModelSerializer):
         """
         Create advice post with automatic slug generation.
         """
-        # Create post
-        post = AdvicePost.objects.create(**validated_data)
-
-        # Generate slug if not provided
-        if not post.slug:
-            from django.utils.text import slugify
-            base_slug = slugify(post.title)
-            unique_slug = base_slug
-            counter = 1
-            while AdvicePost.objects.filter(slug=unique_slug).exists():
-                unique_slug = f"{base_slug}-{counter}"
-                counter += 1
-            post.slug = unique_slug
-            post.save()
-
-        return post
+        # The model allocates a unique slug from the title on save
+        return AdvicePost.objects.create(**validated_data)
 
 
 class AdvicePostDetailSerializer(AdvicePostSerializer):
@@ -0,0 +1,337 @@
+"""
+Expert services business logic for AgriLink.
+"""
+import datetime
+import json
+
+from django.db import connection, connections, router, transaction
+from django.contrib.postgres.search import SearchVector
+from django.db.models import Count, F, OuterRef, Q, Subquery, TextField
+from django.db.models.functions import Cast, Coalesce
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.utils import timezone
+import logging
+
+from .models import (
+    AdvicePost,
+    AdvicePostComment,
+    AdvicePostLike,
+    Consultation,
+    ExpertAvailabilityWindow,
+    ExpertBooking,
+)
+from .stats import apply_engagement_delta
+
+logger = logging.getLogger(__name__)
+
+# Consultations in these states hold their time slot
+BLOCKING_STATUSES = (
+    Consultation.Status.REQUESTED,
+    Consultation.Status.SCHEDULED,
+    Consultation.Status.IN_PROGRESS,
+)
+
+SEARCH_CONFIG = 'english'
+
+# Changing any of these fields requires rebuilding the search vector
+SEARCH_SOURCE_FIELDS = {'title', 'excerpt', 'tags', 'content'}
+
+WEEKDAY_NAMES = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6,
+}
+
+
+def sync_booking(consultation):
+    """
+    Create, move or release the booking held by a consultation.
+
+    Raises ``IntegrityError`` when the slot overlaps another booking of
+    the same expert.
+    """
+    if consultation.status not in BLOCKING_STATUSES or not consultation.expert_id:
+        ExpertBooking.objects.filter(consultation_id=consultation.pk).delete()
+        return None
+
+    start = consultation.scheduled_date
+    end = start + datetime.timedelta(minutes=consultation.duration_minutes)
+    booking, _ = ExpertBooking.objects.update_or_create(
+        consultation_id=consultation.pk,
+        defaults={
+            'expert_id': consultation.expert_id,
+            'period': DateTimeTZRange(start, end, '[)'),
+        },
+    )
+    return booking
+
+
+def _parse_time(value):
+    return datetime.time.fromisoformat(value) if isinstance(value, str) else value
+
+
+def parse_availability(availability):
+    """
+    Turn the free-form ``ExpertProfile.availability`` JSON into window rows.
+
+    Understands ``{"timezone": "...", "slot_minutes": 30, "schedule":
+    {"monday": [["09:00", "12:00"], {"start": "14:00", "end": "17:00"}]}}``;
+    anything else yields no windows.
+    """
+    if not isinstance(availability, dict):
+        return []
+
+    tz_name = availability.get('timezone') or 'UTC'
+    slot_minutes = availability.get('slot_minutes') or 30
+    schedule = availability.get('schedule') or {}
+    if not isinstance(schedule, dict):
+        return []
+
+    windows = []
+    for day, ranges in schedule.items():
+        weekday = WEEKDAY_NAMES.get(str(day).lower())
+        if weekday is None or not isinstance(ranges, list):
+            continue
+        for time_range in ranges:
+            try:
+                if isinstance(time_range, dict):
+                    start, end = time_range['start'], time_range['end']
+                else:
+                    start, end = time_range
+                start, end = _parse_time(start), _parse_time(end)
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Ignoring invalid availability range {time_range!r} on {day}")
+                continue
+            if start < end:
+                windows.append((weekday, start, end, tz_name, slot_minutes))
+    return windows
+
+
+def sync_availability_windows(profile):
+    """
+    Replace the availability windows of an expert from their profile.
+    """
+    windows = parse_availability(profile.availability)
+    with transaction.atomic():
+        ExpertAvailabilityWindow.objects.filter(expert_id=profile.user_id).delete()
+        ExpertAvailabilityWindow.objects.bulk_create([
+            ExpertAvailabilityWindow(
+                expert_id=profile.user_id,
+                weekday=weekday,
+                start_time=start,
+                end_time=end,
+                timezone=tz_name,
+                slot_minutes=slot_minutes,
+            )
+            for weekday, start, end, tz_name, slot_minutes in windows
+        ])
+    return len(windows)
+
+
+FREE_SLOTS_SQL = """
+WITH experts AS (
+    SELECT u.id, u.first_name, u.last_name, ep.consultation_rate, ep.rating
+    FROM users u
+    JOIN expert_profiles ep ON ep.user_id = u.id
+    WHERE u.is_active
+      AND u.role = 'EXPERT'
+      AND (%(specialization)s::jsonb IS NULL OR ep.specialization @> %(specialization)s::jsonb)
+      AND (%(expert_ids)s::uuid[] IS NULL OR u.id = ANY(%(expert_ids)s::uuid[]))
+),
+candidates AS (
+    SELECT w.expert_id, slot.start_at
+    FROM expert_availability_windows w
+    JOIN experts e ON e.id = w.expert_id
+    CROSS JOIN LATERAL generate_series(
+        %(start_date)s::date - 1, %(end_date)s::date, interval '1 day'
+    ) AS d(day)
+    CROSS JOIN LATERAL generate_series(
+        (d.day::date + w.start_time) AT TIME ZONE w.timezone,
+        (d.day::date + w.end_time) AT TIME ZONE w.timezone - make_interval(mins => %(duration)s),
+        make_interval(mins => w.slot_minutes)
+    ) AS slot(start_at)
+    WHERE EXTRACT(ISODOW FROM d.day) - 1 = w.weekday
+),
+free AS (
+    SELECT c.expert_id, c.start_at,
+           row_number() OVER (PARTITION BY c.expert_id ORDER BY c.start_at) AS expert_rank
+    FROM candidates c
+    WHERE c.start_at >= %(start)s
+      AND c.start_at < %(end)s
+      AND NOT EXISTS (
+          SELECT 1 FROM expert_bookings b
+          WHERE b.expert_id = c.expert_id
+            AND b.period && tstzrange(c.start_at, c.start_at + make_interval(mins => %(duration)s))
+      )
+)
+SELECT f.expert_id, e.first_name, e.last_name, e.consultation_rate, e.rating, f.start_at
+FROM free f
+JOIN experts e ON e.id = f.expert_id
+WHERE f.expert_rank <= %(per_expert)s
+ORDER BY f.start_at, e.rating DESC, f.expert_id
+LIMIT %(limit)s
+"""
+
+
+def find_free_slots(specialization=None, expert_ids=None, start=None, days=14,
+                    duration_minutes=60, limit=20, per_expert=3):
+    """
+    Find the next free consultation slots across many experts in one query.
+
+    Candidate slots are expanded from the weekly windows and filtered
+    against the GiST-indexed bookings; ``per_expert`` caps how many slots
+    a single expert contributes.
+    """
+    start = start or timezone.now()
+    end = start + datetime.timedelta(days=days)
+    params = {
+        'specialization': json.dumps([specialization]) if specialization else None,
+        'expert_ids': [str(expert_id) for expert_id in expert_ids] if expert_ids else None,
+        'start': start,
+        'end': end,
+        'start_date': start.date(),
+        'end_date': end.date(),
+        'duration': duration_minutes,
+        'limit': limit,
+        'per_expert': per_expert,
+    }
+
+    connection = connections[router.db_for_read(ExpertBooking)]
+    with connection.cursor() as cursor:
+        cursor.execute(FREE_SLOTS_SQL, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'expert_id': str(expert_id),
+            'expert_name': f"{first_name} {last_name}".strip(),
+            'consultation_rate': consultation_rate,
+            'rating': rating,
+            'start': start_at,
+            'end': start_at + datetime.timedelta(minutes=duration_minutes),
+        }
+        for expert_id, first_name, last_name, consultation_rate, rating, start_at in rows
+    ]
+
+
+def _insert_like(post_id, user_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {AdvicePostLike._meta.db_table} (post_id, user_id, created_at) "
+            "VALUES (%s, %s, %s) ON CONFLICT (post_id, user_id) DO NOTHING RETURNING id",
+            [post_id, user_id, timezone.now()],
+        )
+        return cursor.rowcount
+
+
+def adjust_post_counter(post_id, field, delta):
+    """
+    Apply ``delta`` to a counter of an advice post and return the new value.
+
+    The version and ``updated_at`` move with the counter so HTTP validators
+    of the post change too.
+    """
+    with connection.cursor() as cursor:
+        if delta:
+            cursor.execute(
+                f"UPDATE {AdvicePost._meta.db_table} "
+                f"SET {field} = GREATEST({field} + %s, 0), version = version + 1, updated_at = %s "
+                f"WHERE id = %s RETURNING {field}",
+                [delta, timezone.now(), post_id],
+            )
+        else:
+            cursor.execute(
+                f"SELECT {field} FROM {AdvicePost._meta.db_table} WHERE id = %s",
+                [post_id],
+            )
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def set_post_like(post, user, liked=None):
+    """
+    Like (``True``), unlike (``False``) or toggle (``None``) a post.
+
+    Setting an explicit state is idempotent: the insert skips existing
+    likes and the counter only moves by the rows actually changed.
+    Returns ``(liked, likes_count)``.
+    """
+    with transaction.atomic():
+        delta = 0
+        if liked is not True:
+            deleted, _ = AdvicePostLike.objects.filter(post_id=post.pk, user_id=user.pk).delete()
+            delta = -deleted
+            if liked is None:
+                liked = not deleted
+        if liked:
+            delta = _insert_like(post.pk, user.pk)
+
+        likes_count = adjust_post_counter(post.pk, 'likes_count', delta)
+        apply_engagement_delta(post.expert_id, likes=delta)
+
+    return liked, likes_count
+
+
+def liked_post_ids(user, post_ids):
+    """
+    Return the subset of ``post_ids`` liked by ``user`` in one query.
+    """
+    if not user or not user.is_authenticated or not post_ids:
+        return set()
+    return set(
+        AdvicePostLike.objects.filter(user=user, post_id__in=post_ids).values_list('post_id', flat=True)
+    )
+
+
+def reconcile_post_counters(batch_size=1000):
+    """
+    Reset ``likes_count`` and ``comments_count`` of posts that drifted from
+    the like and comment tables. Returns the number of posts fixed.
+    """
+    like_counts = AdvicePostLike.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(
+        total=Count('pk')
+    ).values('total')
+    comment_counts = AdvicePostComment.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(
+        total=Count('pk')
+    ).values('total')
+
+    drifted = AdvicePost.objects.annotate(
+        actual_likes=Coalesce(Subquery(like_counts), 0),
+        actual_comments=Coalesce(Subquery(comment_counts), 0),
+    ).filter(
+        ~Q(likes_count=F('actual_likes')) | ~Q(comments_count=F('actual_comments'))
+    ).values_list('pk', 'actual_likes', 'actual_comments')
+
+    fixed = 0
+    for post_id, likes, comments in drifted.iterator(chunk_size=batch_size):
+        AdvicePost.objects.filter(pk=post_id).update(
+            likes_count=likes,
+            comments_count=comments,
+            version=F('version') + 1,
+            updated_at=timezone.now(),
+        )
+        fixed += 1
+
+    if fixed:
+        logger.info(f"Reconciled counters of {fixed} advice posts")
+    return fixed
+
+
+def advice_post_search_vector():
+    """
+    Weighted search document: title (A) > excerpt and tags (B) > content (C).
+    """
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('excerpt', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Cast('tags', TextField()), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset=None):
+    """
+    Rebuild the search vector of the given advice posts in one UPDATE.
+    """
+    if queryset is None:
+        queryset = AdvicePost.objects.all()
+    return queryset.update(search_vector=advice_post_search_vector())
@@ -0,0 +1,84 @@
+"""
+Expert services signals for AgriLink API.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import register_cache_invalidation
+from apps.users.models import ExpertProfile
+from .matching import refresh_expert_features
+from .models import AdvicePost, Consultation
+from .stats import refresh_consultation_stats, refresh_post_stats
+from .services import (
+    SEARCH_SOURCE_FIELDS,
+    sync_availability_windows,
+    sync_booking,
+    update_search_vectors,
+)
+
+User = get_user_model()
+
+register_cache_invalidation(Consultation)
+
+# Counter-only saves are tracked by the engagement deltas instead
+COUNTER_FIELDS = {'view_count', 'likes_count', 'comments_count', 'shares_count', 'version', 'updated_at'}
+
+
+def _refresh_match_features_on_commit(expert_id):
+    transaction.on_commit(lambda: refresh_expert_features([expert_id]))
+
+
+@receiver(post_save, sender=Consultation)
+def consultation_post_save(sender, instance, created, **kwargs):
+    """
+    Keep the expert booking index and match features in sync with the consultation.
+    """
+    sync_booking(instance)
+    if instance.expert_id:
+        _refresh_match_features_on_commit(instance.expert_id)
+        transaction.on_commit(lambda: refresh_consultation_stats([instance.expert_id]))
+
+
+@receiver(post_save, sender=ExpertProfile)
+def expert_profile_post_save(sender, instance, created, **kwargs):
+    """
+    Rebuild availability windows and match features of the expert.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'availability' in update_fields:
+        sync_availability_windows(instance)
+    _refresh_match_features_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def expert_user_post_save(sender, instance, created, **kwargs):
+    """
+    Refresh match features when an expert's location or status changes.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'location', 'is_active', 'role'} & set(update_fields):
+        return
+    if instance.role == User.Role.EXPERT and not created:
+        _refresh_match_features_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=AdvicePost)
+def advice_post_post_save(sender, instance, created, **kwargs):
+    """
+    Rebuild the search vector and expert statistics when the post changes.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or SEARCH_SOURCE_FIELDS & set(update_fields):
+        update_search_vectors(AdvicePost.objects.filter(pk=instance.pk))
+    if update_fields is None or not set(update_fields) <= COUNTER_FIELDS:
+        transaction.on_commit(lambda: refresh_post_stats([instance.expert_id]))
+
+
+@receiver(post_delete, sender=AdvicePost)
+def advice_post_post_delete(sender, instance, **kwargs):
+    """
+    Drop a deleted post from its expert's statistics.
+    """
+    transaction.on_commit(lambda: refresh_post_stats([instance.expert_id]))
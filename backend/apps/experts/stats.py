@@ -0,0 +1,201 @@
+"""
+Expert statistics materialization for AgriLink.
+
+``ExpertStats`` rows are kept current from events and rebuilt for all
+experts at once by a periodic reconciliation using grouped aggregates.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+import logging
+
+from .models import AdvicePost, AdvicePostComment, AdvicePostLike, Consultation, ExpertStats
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+MONTHS_KEPT = 12
+
+POST_FIELDS = ['published_posts', 'total_views', 'total_likes', 'total_comments']
+CONSULTATION_FIELDS = [
+    'consultations_total', 'consultations_requested', 'consultations_scheduled',
+    'consultations_completed', 'consultations_cancelled', 'consultations_no_show',
+    'consultations_upcoming', 'earnings_total', 'monthly',
+]
+
+
+def _post_stats(expert_ids):
+    stats = defaultdict(dict)
+    posts = AdvicePost.objects.filter(expert_id__in=expert_ids).values('expert_id').annotate(
+        published=Count('pk', filter=Q(is_published=True)),
+        views=Sum('view_count'),
+    ).order_by()
+    for row in posts:
+        stats[row['expert_id']].update(published_posts=row['published'], total_views=row['views'] or 0)
+
+    likes = AdvicePostLike.objects.filter(post__expert_id__in=expert_ids).values(
+        'post__expert_id'
+    ).annotate(total=Count('pk')).order_by()
+    for row in likes:
+        stats[row['post__expert_id']]['total_likes'] = row['total']
+
+    comments = AdvicePostComment.objects.filter(post__expert_id__in=expert_ids).values(
+        'post__expert_id'
+    ).annotate(total=Count('pk')).order_by()
+    for row in comments:
+        stats[row['post__expert_id']]['total_comments'] = row['total']
+
+    return stats
+
+
+def _consultation_stats(expert_ids):
+    now = timezone.now()
+    completed = Q(status=Consultation.Status.COMPLETED)
+    stats = defaultdict(dict)
+
+    rows = Consultation.objects.filter(expert_id__in=expert_ids).values('expert_id').annotate(
+        total=Count('pk'),
+        requested=Count('pk', filter=Q(status=Consultation.Status.REQUESTED)),
+        scheduled=Count('pk', filter=Q(status=Consultation.Status.SCHEDULED)),
+        completed=Count('pk', filter=completed),
+        cancelled=Count('pk', filter=Q(status=Consultation.Status.CANCELLED)),
+        no_show=Count('pk', filter=Q(status=Consultation.Status.NO_SHOW)),
+        upcoming=Count('pk', filter=Q(
+            status__in=[Consultation.Status.SCHEDULED, Consultation.Status.REQUESTED],
+            scheduled_date__gt=now,
+        )),
+        earnings=Sum('total_amount', filter=completed),
+    ).order_by()
+    for row in rows:
+        stats[row['expert_id']].update(
+            consultations_total=row['total'],
+            consultations_requested=row['requested'],
+            consultations_scheduled=row['scheduled'],
+            consultations_completed=row['completed'],
+            consultations_cancelled=row['cancelled'],
+            consultations_no_show=row['no_show'],
+            consultations_upcoming=row['upcoming'],
+            earnings_total=row['earnings'] or Decimal('0'),
+        )
+
+    months_back = now.year * 12 + now.month - 1 - (MONTHS_KEPT - 1)
+    since = now.replace(year=months_back // 12, month=months_back % 12 + 1, day=1,
+                        hour=0, minute=0, second=0, microsecond=0)
+    monthly = Consultation.objects.filter(
+        completed, expert_id__in=expert_ids, completed_at__gte=since
+    ).annotate(month=TruncMonth('completed_at')).values('expert_id', 'month').annotate(
+        count=Count('pk'),
+        earnings=Sum('total_amount'),
+    ).order_by('month')
+    for row in monthly:
+        stats[row['expert_id']].setdefault('monthly', {})[row['month'].strftime('%Y-%m')] = {
+            'completed': row['count'],
+            'earnings': str(row['earnings'] or Decimal('0')),
+        }
+
+    return stats
+
+
+def _save_stats(expert_ids, stats, fields, reconciled=False):
+    now = timezone.now()
+    defaults = {field: ExpertStats._meta.get_field(field).get_default() for field in fields}
+    rows = []
+    for expert_id in expert_ids:
+        values = {**defaults, **stats.get(expert_id, {})}
+        if reconciled:
+            values['reconciled_at'] = now
+        rows.append(ExpertStats(expert_id=expert_id, **values))
+
+    update_fields = fields + ['updated_at'] + (['reconciled_at'] if reconciled else [])
+    ExpertStats.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['expert'],
+        update_fields=update_fields,
+    )
+
+
+def _split_missing(expert_ids):
+    existing = set(ExpertStats.objects.filter(pk__in=expert_ids).values_list('pk', flat=True))
+    return (
+        [expert_id for expert_id in expert_ids if expert_id in existing],
+        [expert_id for expert_id in expert_ids if expert_id not in existing],
+    )
+
+
+def refresh_post_stats(expert_ids):
+    """
+    Recompute the advice post figures of the given experts.
+    """
+    existing, missing = _split_missing(list(expert_ids))
+    if missing:
+        refresh_expert_stats(missing)
+    if existing:
+        _save_stats(existing, _post_stats(existing), POST_FIELDS)
+
+
+def refresh_consultation_stats(expert_ids):
+    """
+    Recompute the consultation figures of the given experts.
+    """
+    existing, missing = _split_missing(list(expert_ids))
+    if missing:
+        refresh_expert_stats(missing)
+    if existing:
+        _save_stats(existing, _consultation_stats(existing), CONSULTATION_FIELDS)
+
+
+def refresh_expert_stats(expert_ids, reconciled=False):
+    """
+    Recompute every figure of the given experts.
+    """
+    expert_ids = list(expert_ids)
+    stats = _post_stats(expert_ids)
+    for expert_id, values in _consultation_stats(expert_ids).items():
+        stats[expert_id].update(values)
+    _save_stats(expert_ids, stats, POST_FIELDS + CONSULTATION_FIELDS, reconciled=reconciled)
+
+
+def apply_engagement_delta(expert_id, likes=0, comments=0, views=0):
+    """
+    Move the engagement counters of an expert in place.
+    """
+    if not (likes or comments or views):
+        return
+    updated = ExpertStats.objects.filter(expert_id=expert_id).update(
+        total_likes=F('total_likes') + likes,
+        total_comments=F('total_comments') + comments,
+        total_views=F('total_views') + views,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        refresh_expert_stats([expert_id])
+
+
+def reconcile_expert_stats(batch_size=500):
+    """
+    Rebuild the statistics of every expert from the source tables.
+    """
+    expert_ids = list(User.objects.filter(role=User.Role.EXPERT).values_list('pk', flat=True))
+    for start in range(0, len(expert_ids), batch_size):
+        refresh_expert_stats(expert_ids[start:start + batch_size], reconciled=True)
+
+    logger.info(f"Reconciled statistics of {len(expert_ids)} experts")
+    return len(expert_ids)
+
+
+def get_expert_stats(expert):
+    """
+    Read the statistics row of an expert, building it on first access.
+    """
+    stats = ExpertStats.objects.filter(pk=expert.pk).first()
+    if stats is None:
+        refresh_expert_stats([expert.pk], reconciled=True)
+        stats = ExpertStats.objects.get(pk=expert.pk)
+    return stats
@@ -0,0 +1,58 @@
+"""
+Expert services background tasks for AgriLink.
+"""
+from celery import shared_task
+
+from .feed import build_feed
+from .matching import refresh_expert_features
+from .reminders import mark_past_due, send_due_reminders
+from .services import reconcile_post_counters
+from .stats import reconcile_expert_stats
+
+
+@shared_task
+def refresh_expert_match_features():
+    """
+    Recompute all expert match features so availability keeps up with time.
+    """
+    return refresh_expert_features()
+
+
+@shared_task
+def reconcile_advice_post_counters():
+    """
+    Repair like and comment counters that drifted from their tables.
+    """
+    return reconcile_post_counters()
+
+
+@shared_task
+def rebuild_advice_feed():
+    """
+    Recompute the ranked advice feed segments.
+    """
+    return build_feed()
+
+
+@shared_task
+def send_consultation_reminders():
+    """
+    Send reminders for consultations starting soon.
+    """
+    return send_due_reminders()
+
+
+@shared_task
+def mark_past_due_consultations():
+    """
+    Close consultations that were never started or confirmed.
+    """
+    return mark_past_due()
+
+
+@shared_task
+def reconcile_expert_statistics():
+    """
+    Rebuild the materialized statistics of every expert.
+    """
+    return reconcile_expert_stats()
@@ -0,0 +1,63 @@
+"""
+Tests for the experts app.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from apps.users.models import User
+from core.slugs import allocate_slug
+from .models import AdvicePost
+
+
+class AdvicePostSlugTests(TransactionTestCase):
+    """
+    Unique slug allocation for advice posts.
+    """
+    title = 'Controlling fall armyworm in maize'
+
+    def setUp(self):
+        self.expert = User.objects.create_user(
+            username='slug-expert',
+            email='slug-expert@example.com',
+            password='test-password',
+            first_name='Slug',
+            last_name='Expert',
+            role=User.Role.EXPERT,
+        )
+
+    def _create_post(self, index=0):
+        return AdvicePost.objects.create(
+            expert=self.expert,
+            title=self.title,
+            content='Scout fields weekly and treat early instars.',
+            excerpt=f'Armyworm control #{index}',
+            category=AdvicePost.Category.PEST_CONTROL,
+        ).slug
+
+    def _create_post_in_thread(self, index):
+        try:
+            return self._create_post(index)
+        finally:
+            # Each worker thread opens its own connection
+            connection.close()
+
+    def test_allocate_slug_takes_next_suffix(self):
+        self.assertEqual(allocate_slug(AdvicePost, self.title), 'controlling-fall-armyworm-in-maize')
+        self._create_post()
+        self.assertEqual(allocate_slug(AdvicePost, self.title), 'controlling-fall-armyworm-in-maize-1')
+        self._create_post()
+        self.assertEqual(allocate_slug(AdvicePost, self.title), 'controlling-fall-armyworm-in-maize-2')
+
+    def test_concurrent_posts_get_unique_slugs(self):
+        count = 1000
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            slugs = list(executor.map(self._create_post_in_thread, range(count)))
+
+        self.assertEqual(len(set(slugs)), count)
+        self.assertEqual(AdvicePost.objects.filter(slug__startswith='controlling-fall-armyworm').count(), count)
+        self.assertEqual(
+            AdvicePost.objects.values('slug').distinct().count(),
+            AdvicePost.objects.count(),
+        )
@@ -9,15 +9,29 @@ from .views import (
     ConsultationDetailView,
     ConsultationStatusUpdateView,
     ExpertListView,
+    available_slots,
+    matched_experts,
+    like_advice_post,
+    comment_on_advice_post,
+    liked_advice_posts,
+    advice_feed,
+    expert_statistics,
 )
 
 urlpatterns = [
     # Expert Directory
     path('', ExpertListView.as_view(), name='expert_list'),
+    path('slots/', available_slots, name='available_slots'),
+    path('matches/', matched_experts, name='matched_experts'),
+    path('statistics/', expert_statistics, name='expert_statistics'),
 
     # Advice Posts
     path('advice/', AdvicePostListCreateView.as_view(), name='advice_posts'),
     path('advice/<uuid:post_id>/', AdvicePostDetailView.as_view(), name='advice_post_detail'),
+    path('advice/feed/', advice_feed, name='advice_feed'),
+    path('advice/liked/', liked_advice_posts, name='liked_advice_posts'),
+    path('advice/<slug:post_slug>/like/', like_advice_post, name='like_advice_post'),
+    path('advice/<slug:post_slug>/comments/', comment_on_advice_post, name='comment_on_advice_post'),
 
     # Consultations
     path('consultations/', ConsultationListCreateView.as_view(), name='consultations'),
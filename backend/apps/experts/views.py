@@ -1,6 +1,9 @@
 """
 Expert services views for AgriLink API.
 """
+import uuid
+from decimal import Decimal
+
 from rest_framework import status, permissions, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -10,12 +13,28 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Count, Avg
 
 from core.permissions import IsExpert, IsFarmer, IsOwnerOrReadOnly, IsActiveUser
 from core.pagination import StandardResultsSetPagination
+from core.cache import CachedListMixin
+from core.filters import FullTextSearchFilter
+from core.conditional import (
+    ConditionalListMixin,
+    is_not_modified,
+    not_modified_response,
+    object_validators,
+    set_validators,
+)
 from core.exceptions import ValidationException, NotFoundException, AuthorizationException
+from core.utils import format_currency
+from apps.users.models import ExpertProfile
 from .models import AdvicePost, AdvicePostLike, AdvicePostComment, Consultation, ConsultationReview
+from .feed import get_feed_ids
+from .matching import match_experts_for_farmer
+from .stats import apply_engagement_delta, get_expert_stats
+from .services import adjust_post_counter, find_free_slots, liked_post_ids, set_post_like
 from .serializers import (
     AdvicePostSerializer,
     AdvicePostDetailSerializer,
@@ -30,11 +49,14 @@ from .serializers import (
 User = get_user_model()
 
 
-class ExpertListView(generics.ListAPIView):
+class ExpertListView(CachedListMixin, generics.ListAPIView):
     """
     List all available experts.
     """
     permission_classes = [permissions.AllowAny]
+    cache_namespace = 'experts:list'
+    cache_models = [User, ExpertProfile, Consultation]
+    cache_options = {'timeout': 300, 'anonymous_only': False}
     serializer_class = ExpertListSerializer
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -56,15 +78,16 @@ class ExpertListView(generics.ListAPIView):
         ).order_by('-expert_profile__rating', '-expert_profile__total_consultations')
 
 
-class AdvicePostListCreateView(generics.ListCreateAPIView):
+class AdvicePostListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     """
     List and create advice posts.
     """
     serializer_class = AdvicePostSerializer
     pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category', 'target_audience', 'is_featured', 'is_published']
-    search_fields = ['title', 'content', 'excerpt', 'tags']
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
+    filterset_fields = ['category', 'is_featured', 'is_published']
+    search_vector_field = 'search_vector'
+    search_headline_fields = {'search_snippet': 'content', 'search_title': 'title'}
     ordering_fields = ['created_at', 'published_at', 'view_count', 'likes_count']
     ordering = ['-published_at', '-created_at']
 
@@ -72,7 +95,7 @@ class AdvicePostListCreateView(generics.ListCreateAPIView):
         """
         Filter advice posts based on user and query parameters.
         """
-        queryset = AdvicePost.objects.select_related('expert').prefetch_related('likes', 'comments')
+        queryset = AdvicePost.objects.select_related('expert', 'expert__expert_profile').defer('search_vector')
 
         # Public users only see published posts
         if not self.request.user.is_authenticated:
@@ -93,6 +116,11 @@ class AdvicePostListCreateView(generics.ListCreateAPIView):
         if target_audience:
             queryset = queryset.filter(target_audience__contains=[target_audience])
 
+        # Filter by tag
+        tag = self.request.query_params.get('tag')
+        if tag:
+            queryset = queryset.filter(tags__contains=[tag])
+
         # Featured posts
         featured_only = self.request.query_params.get('featured_only')
         if featured_only == 'true':
@@ -169,7 +197,7 @@ class AdvicePostDetailView(generics.RetrieveUpdateDestroyAPIView):
         """
         return AdvicePost.objects.select_related('expert').prefetch_related(
             'likes', 'comments', 'comments__replies'
-        )
+        ).defer('search_vector')
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -194,12 +222,18 @@ class AdvicePostDetailView(generics.RetrieveUpdateDestroyAPIView):
                 }
             )
 
+        # Skip serialization when the client's copy is current
+        etag, last_modified = object_validators(post, request)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
         serializer = self.get_serializer(post)
-        return Response({
+        response = Response({
             'success': True,
             'data': serializer.data,
             'timestamp': timezone.now().isoformat(),
         }, status=status.HTTP_200_OK)
+        return set_validators(response, etag, last_modified)
 
     def get_permissions(self):
         """
@@ -210,6 +244,17 @@ class AdvicePostDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.AllowAny]
 
 
+def _slot_unavailable_response():
+    return Response({
+        'success': False,
+        'error': {
+            'code': 'SLOT_UNAVAILABLE',
+            'message': 'The expert is not available at the requested time.',
+        },
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_409_CONFLICT)
+
+
 class ConsultationListCreateView(generics.ListCreateAPIView):
     """
     List and create consultations.
@@ -281,7 +326,12 @@ class ConsultationListCreateView(generics.ListCreateAPIView):
         try:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            consultation = serializer.save()
+            try:
+                with transaction.atomic():
+                    consultation = serializer.save()
+            except IntegrityError:
+                # The booking overlaps another one of the same expert
+                return _slot_unavailable_response()
 
             return Response({
                 'success': True,
@@ -326,6 +376,20 @@ class ConsultationDetailView(generics.RetrieveUpdateAPIView):
         else:
             return queryset.none()
 
+    def update(self, request, *args, **kwargs):
+        """
+        Update consultation details; moving it onto a booked slot is a conflict.
+        """
+        try:
+            return super().update(request, *args, **kwargs)
+        except IntegrityError:
+            return _slot_unavailable_response()
+
+    def perform_update(self, serializer):
+        # The booking is synced on save, so roll the consultation back with it
+        with transaction.atomic():
+            serializer.save()
+
 
 class ConsultationStatusUpdateView(generics.UpdateAPIView):
     """
@@ -447,12 +511,14 @@ class ConsultationStatusUpdateView(generics.UpdateAPIView):
 def like_advice_post(request, post_slug):
     """
     Like or unlike an advice post.
+
+    Toggles by default; pass ``liked`` to set the state idempotently.
     """
     try:
-        post = get_object_or_404(AdvicePost, slug=post_slug)
+        post = get_object_or_404(AdvicePost.objects.only('id', 'expert_id'), slug=post_slug)
 
         # Check if user can like this post
-        if post.expert == request.user:
+        if post.expert_id == request.user.pk:
             return Response({
                 'success': False,
                 'error': {
@@ -462,33 +528,20 @@ def like_advice_post(request, post_slug):
                 'timestamp': timezone.now().isoformat(),
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if already liked
-        existing_like = AdvicePostLike.objects.filter(post=post, user=request.user).first()
+        liked = request.data.get('liked')
+        if isinstance(liked, str):
+            liked = liked.lower() in ('true', '1')
+        elif liked is not None:
+            liked = bool(liked)
 
-        if existing_like:
-            # Unlike the post
-            existing_like.delete()
-            post.likes_count -= 1
-            post.save(update_fields=['likes_count'])
-
-            return Response({
-                'success': True,
-                'data': {'liked': False, 'likes_count': post.likes_count},
-                'message': 'Post unliked successfully',
-                'timestamp': timezone.now().isoformat(),
-            }, status=status.HTTP_200_OK)
-        else:
-            # Like the post
-            AdvicePostLike.objects.create(post=post, user=request.user)
-            post.likes_count += 1
-            post.save(update_fields=['likes_count'])
+        liked, likes_count = set_post_like(post, request.user, liked=liked)
 
-            return Response({
-                'success': True,
-                'data': {'liked': True, 'likes_count': post.likes_count},
-                'message': 'Post liked successfully',
-                'timestamp': timezone.now().isoformat(),
-            }, status=status.HTTP_201_CREATED)
+        return Response({
+            'success': True,
+            'data': {'liked': liked, 'likes_count': likes_count},
+            'message': 'Post liked successfully' if liked else 'Post unliked successfully',
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_201_CREATED if liked else status.HTTP_200_OK)
 
     except Exception as e:
         return Response({
@@ -516,11 +569,10 @@ def comment_on_advice_post(request, post_slug):
             context={'post': post, 'request': request}
         )
         serializer.is_valid(raise_exception=True)
-        comment = serializer.save()
-
-        # Update comment count
-        post.comments_count += 1
-        post.save(update_fields=['comments_count'])
+        with transaction.atomic():
+            comment = serializer.save()
+            adjust_post_counter(post.pk, 'comments_count', 1)
+            apply_engagement_delta(post.expert_id, comments=1)
 
         # Create activity log
         from apps.dashboard.models import UserActivity
@@ -572,46 +624,34 @@ def expert_statistics(request):
                 'timestamp': timezone.now().isoformat(),
             }, status=status.HTTP_403_FORBIDDEN)
 
-        # Get expert statistics
+        # Statistics are materialized per expert; this is a primary-key read
+        expert_stats = get_expert_stats(user)
+        this_month = expert_stats.monthly.get(timezone.now().strftime('%Y-%m'), {})
+
         stats = {
             'expert': {
-                'published_posts': AdvicePost.objects.filter(
-                    expert=user, is_published=True
-                ).count(),
-                'total_views': AdvicePost.objects.filter(expert=user).aggregate(
-                    total_views=Count('view_count')
-                )['total_views'] or 0,
-                'total_likes': AdvicePostLike.objects.filter(post__expert=user).count(),
-                'total_comments': AdvicePostComment.objects.filter(post__expert=user).count(),
+                'published_posts': expert_stats.published_posts,
+                'total_views': expert_stats.total_views,
+                'total_likes': expert_stats.total_likes,
+                'total_comments': expert_stats.total_comments,
                 'consultations': {
-                    'total': Consultation.objects.filter(expert=user).count(),
-                    'pending': Consultation.objects.filter(
-                        expert=user, status=Consultation.Status.REQUESTED
-                    ).count(),
-                    'scheduled': Consultation.objects.filter(
-                        expert=user, status=Consultation.Status.SCHEDULED
-                    ).count(),
-                    'completed': Consultation.objects.filter(
-                        expert=user, status=Consultation.Status.COMPLETED
-                    ).count(),
-                    'upcoming': Consultation.objects.filter(
-                        expert=user,
-                        status__in=[Consultation.Status.SCHEDULED, Consultation.Status.REQUESTED],
-                        scheduled_date__gt=timezone.now()
-                    ).count(),
+                    'total': expert_stats.consultations_total,
+                    'pending': expert_stats.consultations_requested,
+                    'scheduled': expert_stats.consultations_scheduled,
+                    'completed': expert_stats.consultations_completed,
+                    'cancelled': expert_stats.consultations_cancelled,
+                    'no_show': expert_stats.consultations_no_show,
+                    'upcoming': expert_stats.consultations_upcoming,
                 },
                 'earnings': {
-                    'total': Consultation.objects.filter(
-                        expert=user,
-                        status=Consultation.Status.COMPLETED
-                    ).aggregate(total=Count('total_amount'))['total'] or 0,
-                    'this_month': Consultation.objects.filter(
-                        expert=user,
-                        status=Consultation.Status.COMPLETED,
-                        completed_at__month=timezone.now().month,
-                        completed_at__year=timezone.now().year
-                    ).aggregate(total=Count('total_amount'))['total'] or 0,
+                    'total': format_currency(expert_stats.earnings_total),
+                    'this_month': format_currency(Decimal(this_month.get('earnings', '0'))),
+                    'monthly': [
+                        {**values, 'month': month, 'earnings': format_currency(Decimal(values['earnings']))}
+                        for month, values in sorted(expert_stats.monthly.items())
+                    ],
                 },
+                'updated_at': expert_stats.updated_at.isoformat(),
             }
         }
 
@@ -679,4 +719,142 @@ def farmer_consultations(request):
                 'message': 'Failed to retrieve consultations.',
             },
             'timestamp': timezone.now().isoformat(),
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def available_slots(request):
+    """
+    Get the next free consultation slots across experts.
+    """
+    try:
+        params = request.query_params
+        expert_ids = [uuid.UUID(value) for value in params.get('expert_ids', '').split(',') if value]
+        slots = find_free_slots(
+            specialization=params.get('specialization') or None,
+            expert_ids=expert_ids or None,
+            days=min(max(int(params.get('days', 14)), 1), 90),
+            duration_minutes=min(max(int(params.get('duration', 60)), 15), 480),
+            limit=min(max(int(params.get('limit', 20)), 1), 100),
+            per_expert=min(max(int(params.get('per_expert', 3)), 1), 20),
+        )
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': 'days, duration, limit and per_expert must be integers and expert_ids valid UUIDs.',
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+        'data': {
+            'slots': [
+                {
+                    **slot,
+                    'start': slot['start'].isoformat(),
+                    'end': slot['end'].isoformat(),
+                }
+                for slot in slots
+            ],
+            'count': len(slots),
+        },
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsFarmer, IsActiveUser])
+def matched_experts(request):
+    """
+    Get the experts best matching the current farmer.
+    """
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    matches = match_experts_for_farmer(request.user, k=limit)
+    experts = User.objects.select_related('expert_profile').in_bulk(
+        [match['expert_id'] for match in matches]
+    )
+
+    results = []
+    for match in matches:
+        expert = experts.get(match['expert_id'])
+        if expert is None or not hasattr(expert, 'expert_profile'):
+            continue
+        profile = expert.expert_profile
+        results.append({
+            'id': str(expert.id),
+            'full_name': expert.full_name,
+            'profile_picture': expert.profile_picture,
+            'specialization': profile.specialization,
+            'rating': profile.rating,
+            'consultation_rate': profile.consultation_rate,
+            'years_experience': profile.years_experience,
+            'is_verified_expert': profile.is_verified_expert,
+            'distance_km': match['distance_km'],
+            'match_score': match['score'],
+            'score_breakdown': match['components'],
+        })
+
+    return Response({
+        'success': True,
+        'data': results,
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsActiveUser])
+def liked_advice_posts(request):
+    """
+    Get which of the given advice posts the current user has liked.
+    """
+    try:
+        post_ids = [uuid.UUID(value) for value in request.query_params.get('post_ids', '').split(',') if value]
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': 'post_ids must be a comma-separated list of UUIDs.',
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    liked = liked_post_ids(request.user, post_ids[:200])
+
+    return Response({
+        'success': True,
+        'data': {'liked_post_ids': sorted(str(post_id) for post_id in liked)},
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def advice_feed(request):
+    """
+    Get the ranked advice feed of the current user.
+    """
+    post_ids = get_feed_ids(request.user, category=request.query_params.get('category'))
+
+    paginator = StandardResultsSetPagination()
+    page_ids = paginator.paginate_queryset(post_ids, request)
+
+    posts = AdvicePost.objects.filter(pk__in=page_ids, is_published=True).select_related(
+        'expert', 'expert__expert_profile'
+    ).defer('search_vector').in_bulk()
+    ordered = [posts[post_id] for post_id in map(uuid.UUID, page_ids) if post_id in posts]
+
+    serializer = AdvicePostSerializer(ordered, many=True, context={'request': request})
+    return paginator.get_paginated_response({
+        'success': True,
+        'data': serializer.data,
+        'timestamp': timezone.now().isoformat(),
+    })
@@ -0,0 +1,156 @@
+"""
+Bulk listing creation for AgriLink marketplace.
+
+A batch is validated item by item against one shared serializer
+instance, then every valid listing is written with a single
+``bulk_create`` and their activity log rows with another. Listings in a
+batch usually share a handful of pickup points, so each distinct
+coordinate pair is turned into a geometry only once.
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+import logging
+
+from core.cache import bump_generation
+from core.utils import create_point_from_coordinates
+from .models import ProduceListing
+from .price_suggestions import record_listing_prices
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 500
+LISTING_LIFETIME_DAYS = 30
+
+
+class PointCache:
+    """
+    Memoize ``create_point_from_coordinates`` for the length of one batch.
+    """
+
+    def __init__(self):
+        self._points = {}
+
+    def get(self, latitude, longitude):
+        key = (float(latitude), float(longitude))
+        point = self._points.get(key)
+        if point is None:
+            point = self._points[key] = create_point_from_coordinates(*key)
+        return point
+
+    def __len__(self):
+        return len(self._points)
+
+
+def _fallback_point(farmer, points):
+    profile = getattr(farmer, 'farmer_profile', None)
+    location = getattr(profile, 'farm_location', None) or farmer.location
+    if location is None:
+        return None
+    return points.get(location.y, location.x)
+
+
+def validate_listings(items, farmer, context, defaults=None):
+    """
+    Validate raw listing payloads and build unsaved listings.
+
+    Returns ``(listings, results)``: ``listings`` pairs each valid item's
+    index with its ``ProduceListing``, and ``results`` holds an entry per
+    item with its errors, if any.
+    """
+    from .serializers import ProduceListingBatchItemSerializer
+
+    defaults = defaults or {}
+    item_serializer = ProduceListingBatchItemSerializer(context=context)
+    points = PointCache()
+    fallback = _UNSET = object()
+    expires_at = timezone.now() + timezone.timedelta(days=LISTING_LIFETIME_DAYS)
+
+    listings, results = [], []
+    for index, item in enumerate(items):
+        try:
+            attrs = item_serializer.run_validation(item)
+        except serializers.ValidationError as e:
+            results.append({'index': index, 'success': False, 'errors': e.detail})
+            continue
+
+        attrs.pop('farmer', None)
+        latitude = attrs.pop('latitude', defaults.get('latitude'))
+        longitude = attrs.pop('longitude', defaults.get('longitude'))
+        if latitude is not None and longitude is not None:
+            location = points.get(latitude, longitude)
+        else:
+            if fallback is _UNSET:
+                fallback = _fallback_point(farmer, points)
+            location = fallback
+        if location is None:
+            results.append({
+                'index': index,
+                'success': False,
+                'errors': {'location': ['Provide latitude and longitude, or set a farm location.']},
+            })
+            continue
+
+        attrs.setdefault('location_address', defaults.get('location_address'))
+        # bulk_create skips save(), which is where the expiry default lives
+        listings.append((index, ProduceListing(
+            farmer=farmer,
+            location=location,
+            expires_at=expires_at,
+            **attrs
+        )))
+        results.append({'index': index, 'success': True})
+
+    logger.debug(f"Validated {len(items)} listings with {len(points)} distinct locations")
+    return listings, results
+
+
+def create_listings(farmer, items, context, defaults=None, atomic=False, request=None):
+    """
+    Create up to ``MAX_BATCH_SIZE`` listings for ``farmer`` in one go.
+
+    Invalid items are reported and skipped, unless ``atomic`` is set, in
+    which case any invalid item means nothing is created. Returns a list
+    of per-item results in input order.
+    """
+    from apps.dashboard.models import UserActivity
+
+    listings, results = validate_listings(items, farmer, context, defaults)
+    if not listings or (atomic and len(listings) < len(items)):
+        if atomic:
+            for result in results:
+                if result['success']:
+                    result.update(success=False, errors={'non_field_errors': ['Not created: batch is atomic.']})
+        return results
+
+    instances = [listing for _, listing in listings]
+    activities = [
+        UserActivity(
+            user=farmer,
+            activity_type=UserActivity.ActivityType.LISTING_CREATE,
+            request_path=request.path if request is not None else '',
+            request_method=request.method if request is not None else '',
+            description=f"Created listing: {listing.product_name}",
+            metadata={
+                'listing_id': str(listing.id),
+                'category': listing.category,
+                'quantity': float(listing.quantity_available),
+                'price': float(listing.unit_price),
+                'batch': True,
+            },
+        )
+        for listing in instances
+    ]
+
+    with transaction.atomic():
+        ProduceListing.objects.bulk_create(instances, batch_size=MAX_BATCH_SIZE)
+        UserActivity.objects.bulk_create(activities, batch_size=MAX_BATCH_SIZE)
+        # bulk_create skips post_save, so invalidate cached listing pages here
+        transaction.on_commit(lambda: bump_generation(ProduceListing))
+        transaction.on_commit(lambda: record_listing_prices(instances))
+
+    for index, listing in listings:
+        results[index]['id'] = str(listing.id)
+
+    logger.info(f"Farmer {farmer.pk} created {len(instances)} of {len(items)} listings in bulk")
+    return results
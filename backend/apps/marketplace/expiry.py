@@ -0,0 +1,52 @@
+"""
+Listing expiry sweeper for AgriLink marketplace.
+
+Listings past ``expires_at`` or the end of their availability window
+are moved to ``EXPIRED`` in batches of set-based UPDATEs, which keeps
+them out of the partial index on active listings.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+import logging
+
+from core.cache import bump_generation
+from .models import ProduceListing
+from .trending import remove_listings
+
+logger = logging.getLogger(__name__)
+
+
+def expire_listings(batch_size=1000):
+    """
+    Mark stale active listings as expired and return how many were.
+
+    Rows are claimed with ``SKIP LOCKED`` so the sweep never waits on a
+    listing that is being edited; it is picked up on the next run.
+    """
+    now = timezone.now()
+    expired = 0
+
+    while True:
+        with transaction.atomic():
+            entries = list(
+                ProduceListing.objects.select_for_update(skip_locked=True)
+                .expired(now).values_list('pk', 'category')[:batch_size]
+            )
+            if not entries:
+                break
+            listing_ids = [listing_id for listing_id, _ in entries]
+            expired += ProduceListing.objects.filter(pk__in=listing_ids).update(
+                status=ProduceListing.Status.EXPIRED,
+                version=F('version') + 1,
+                updated_at=now,
+            )
+        remove_listings(entries)
+        if len(listing_ids) < batch_size:
+            break
+
+    if expired:
+        # Bulk updates skip post_save, so invalidate cached listing pages here
+        bump_generation(ProduceListing)
+        logger.info(f"Expired {expired} produce listings")
+    return expired
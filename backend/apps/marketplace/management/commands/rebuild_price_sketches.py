@@ -0,0 +1,22 @@
+"""
+Rebuild the price suggestion sketches from history.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.price_suggestions import rebuild_price_sketches
+
+
+class Command(BaseCommand):
+    help = 'Recompute the price suggestion sketches from every listing and confirmed order.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        recorded = rebuild_price_sketches(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt sketches from {recorded} prices in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,19 @@
+"""
+Rebuild the trending listing scores from logged engagement.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.trending import rebuild_trending
+
+
+class Command(BaseCommand):
+    help = 'Recompute trending listing scores from recent views, inquiries and orders.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        listings = rebuild_trending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ranked {listings} trending listings in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,26 @@
+"""
+Update or rebuild the market price index.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.price_index import CHUNK_SIZE, rebuild_price_index, update_price_index
+
+
+class Command(BaseCommand):
+    help = 'Fold new listings and orders into the daily price bars, or rebuild them from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Drop all bars and recompute the full history')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['rebuild']:
+            events = rebuild_price_index(chunk_size=options['chunk_size'])
+        else:
+            events = update_price_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Read {events} price events in {time.perf_counter() - started:.1f}s'
+        ))
@@ -6,7 +6,9 @@ from django.contrib.gis.db import models
 from django.contrib.gis.geos import Point
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import Q
 from django.utils import timezone
+from core.models import VersionedModel
 from core.utils import create_point_from_coordinates
 
 User = get_user_model()
@@ -33,7 +35,43 @@ class ProduceCategory(models.Model):
         return self.name
 
 
-class ProduceListing(models.Model):
+class ProduceListingQuerySet(models.QuerySet):
+    """
+    Availability filters for produce listings, evaluated in SQL.
+    """
+
+    def active(self, now=None):
+        """
+        Active listings that have neither expired nor ended their window.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            status=ProduceListing.Status.ACTIVE,
+            expires_at__gt=now,
+            availability_period_end__gte=now.date(),
+        )
+
+    def available(self, now=None):
+        """
+        Active listings whose availability window has started.
+
+        The SQL counterpart of ``ProduceListing.is_available``.
+        """
+        now = now or timezone.now()
+        return self.active(now).filter(availability_period_start__lte=now.date())
+
+    def expired(self, now=None):
+        """
+        Listings still marked active although they expired or went out of season.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            Q(expires_at__lte=now) | Q(availability_period_end__lt=now.date()),
+            status=ProduceListing.Status.ACTIVE,
+        )
+
+
+class ProduceListing(VersionedModel):
     """
     Produce listings for farmers to sell their products.
     """
@@ -123,6 +161,10 @@ class ProduceListing(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField()
 
+    unversioned_fields = ('view_count', 'contact_count')
+
+    objects = ProduceListingQuerySet.as_manager()
+
     class Meta:
         db_table = 'produce_listings'
         indexes = [
@@ -131,6 +173,17 @@ class ProduceListing(models.Model):
             models.Index(fields=['is_organic', 'status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['expires_at']),
+            # Only active rows are indexed; the expiry sweeper moves stale ones out
+            models.Index(
+                fields=['availability_period_end', 'expires_at', 'availability_period_start'],
+                name='produce_listings_available_idx',
+                condition=Q(status='ACTIVE'),
+            ),
+            models.Index(
+                fields=['category', '-created_at'],
+                name='produce_listings_active_idx',
+                condition=Q(status='ACTIVE'),
+            ),
         ]
         ordering = ['-created_at']
 
@@ -301,4 +354,97 @@ class ListingReview(models.Model):
         unique_together = ['listing', 'reviewer']
 
     def __str__(self):
-        return f"Review for {self.listing.product_name} by {self.reviewer.full_name}"
\ No newline at end of file
+        return f"Review for {self.listing.product_name} by {self.reviewer.full_name}"
+
+
+class PriceBar(models.Model):
+    """
+    Daily open/high/low/close and volume-weighted price of one price series.
+
+    A series is an asking (listings) or transacted (orders) price for a
+    product or category, in one region or across all of them (empty
+    ``region``). Bars are written by the price index engine only.
+    """
+    class Source(models.TextChoices):
+        ASK = 'ASK', 'Asking Price'
+        TRADE = 'TRADE', 'Transacted Price'
+
+    class Dimension(models.TextChoices):
+        PRODUCT = 'PRODUCT', 'Product'
+        CATEGORY = 'CATEGORY', 'Category'
+
+    source = models.CharField(max_length=5, choices=Source.choices)
+    dimension = models.CharField(max_length=8, choices=Dimension.choices)
+    key = models.CharField(max_length=100, help_text="Normalized product name or category code")
+    region = models.CharField(max_length=32, blank=True, help_text="Region grid label, empty for all regions")
+    date = models.DateField()
+
+    open = models.DecimalField(max_digits=10, decimal_places=2)
+    high = models.DecimalField(max_digits=10, decimal_places=2)
+    low = models.DecimalField(max_digits=10, decimal_places=2)
+    close = models.DecimalField(max_digits=10, decimal_places=2)
+    vwap = models.DecimalField(max_digits=10, decimal_places=2)
+    volume = models.DecimalField(max_digits=18, decimal_places=2, help_text="Quantity in kg")
+    notional = models.DecimalField(max_digits=20, decimal_places=2, help_text="Sum of price times quantity")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'price_bars'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'dimension', 'key', 'region', 'date'],
+                name='price_bars_series_date_uniq',
+            ),
+        ]
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.source} {self.key} {self.region or 'all'} {self.date}"
+
+
+class PriceIndexCursor(models.Model):
+    """
+    How far the price index engine has read one price source.
+    """
+    source = models.CharField(max_length=5, choices=PriceBar.Source.choices, primary_key=True)
+    position_at = models.DateTimeField(blank=True, null=True)
+    position_id = models.CharField(max_length=36, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'price_index_cursors'
+
+    def __str__(self):
+        return f"{self.source} at {self.position_at}"
+
+
+class PriceSketch(models.Model):
+    """
+    Quantile sketch of the prices in one price segment.
+
+    A segment narrows a product or category by quality grade and region;
+    an empty ``quality_grade`` or ``region`` covers all of them. Sketches
+    are t-digests (see ``core.sketches``) updated as listings are created
+    and orders confirmed.
+    """
+    source = models.CharField(max_length=5, choices=PriceBar.Source.choices)
+    dimension = models.CharField(max_length=8, choices=PriceBar.Dimension.choices)
+    key = models.CharField(max_length=100, help_text="Normalized product name or category code")
+    quality_grade = models.CharField(max_length=1, blank=True)
+    region = models.CharField(max_length=32, blank=True, help_text="Region grid label, empty for all regions")
+
+    digest = models.BinaryField(help_text="Serialized t-digest")
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'price_sketches'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'dimension', 'key', 'quality_grade', 'region'],
+                name='price_sketches_segment_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.key} {self.quality_grade or 'any'} {self.region or 'all'}"
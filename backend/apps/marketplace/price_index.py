@@ -0,0 +1,287 @@
+"""
+Market price index engine for AgriLink.
+
+Listings (asking prices) and confirmed orders (transacted prices) are
+read incrementally behind a per-source cursor, in chunks ordered by
+event time. Each chunk is aggregated into daily open/high/low/close,
+volume and volume-weighted price bars with NumPy, per product and per
+category, in the event's region and across all regions, and merged into
+``PriceBar`` rows in the same transaction that advances the cursor.
+
+Days are UTC days, and quantities weight asking prices by the amount
+offered and transacted prices by the amount ordered.
+"""
+import datetime
+import uuid
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+import logging
+
+from core.cache import bump_generation
+from core.utils import region_for_point
+from .models import PriceBar, PriceIndexCursor, ProduceListing
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 20000
+# Rows committed this long after their timestamp can still be picked up
+SETTLE_DELAY = timezone.timedelta(minutes=5)
+ALL_REGIONS = ''
+
+CENT = Decimal('0.01')
+BAR_FIELDS = ['open', 'high', 'low', 'close', 'vwap', 'volume', 'notional', 'count']
+SERIES_FIELDS = ['open', 'high', 'low', 'close', 'vwap', 'volume', 'count']
+
+
+def normalize_product_name(name):
+    """
+    Turn a free-text product name into a price series key.
+    """
+    return ' '.join((name or '').lower().split())[:100]
+
+
+def _listing_rows(after_at, after_id, until, limit):
+    rows = ProduceListing.objects.filter(created_at__lte=until)
+    if after_at is not None:
+        rows = rows.filter(Q(created_at__gt=after_at) | Q(created_at=after_at, pk__gt=uuid.UUID(after_id)))
+    return [
+        (created_at, pk, name, category, price, quantity, location)
+        for created_at, pk, name, category, price, quantity, location in rows.order_by(
+            'created_at', 'pk'
+        ).values_list(
+            'created_at', 'pk', 'product_name', 'category', 'unit_price', 'quantity_available', 'location'
+        )[:limit]
+    ]
+
+
+def _order_rows(after_at, after_id, until, limit):
+    from apps.orders.models import Order
+
+    rows = Order.objects.filter(confirmed_at__isnull=False, confirmed_at__lte=until).exclude(
+        status__in=[Order.Status.CANCELLED, Order.Status.REFUNDED]
+    )
+    if after_at is not None:
+        rows = rows.filter(Q(confirmed_at__gt=after_at) | Q(confirmed_at=after_at, pk__gt=uuid.UUID(after_id)))
+    return [
+        # Trades are placed where the produce was listed, else where it went
+        (confirmed_at, pk, name, category, price, quantity, listing_location or delivery_location)
+        for confirmed_at, pk, name, category, price, quantity, listing_location, delivery_location
+        in rows.order_by('confirmed_at', 'pk').values_list(
+            'confirmed_at', 'pk', 'product_name', 'listing__category', 'unit_price',
+            'quantity_ordered', 'listing__location', 'delivery_location',
+        )[:limit]
+    ]
+
+
+SOURCES = {
+    PriceBar.Source.ASK: _listing_rows,
+    PriceBar.Source.TRADE: _order_rows,
+}
+
+
+def aggregate_bars(rows):
+    """
+    Aggregate ``(timestamp, pk, product, category, price, quantity, point)``
+    rows, oldest first, into daily bars.
+
+    Returns ``{(dimension, key, region, date): bar}`` with float values;
+    open and close follow the row order.
+    """
+    if not rows:
+        return {}
+
+    regions = {}
+    series_codes = {}
+    event_index, event_series = [], []
+    for index, (_, _, name, category, _, _, point) in enumerate(rows):
+        coords = point.coords if point is not None else None
+        region = regions.get(coords)
+        if region is None:
+            region = regions[coords] = region_for_point(point)
+
+        product = normalize_product_name(name)
+        series = [(PriceBar.Dimension.PRODUCT, product, ALL_REGIONS)]
+        if region:
+            series.append((PriceBar.Dimension.PRODUCT, product, region))
+        if category:
+            series.append((PriceBar.Dimension.CATEGORY, category, ALL_REGIONS))
+            if region:
+                series.append((PriceBar.Dimension.CATEGORY, category, region))
+        for key in series:
+            event_index.append(index)
+            event_series.append(series_codes.setdefault(key, len(series_codes)))
+
+    timestamps = np.array(
+        [row[0].astimezone(datetime.timezone.utc).replace(tzinfo=None) for row in rows],
+        dtype='datetime64[us]',
+    )
+    prices = np.array([float(row[4]) for row in rows])
+    quantities = np.array([float(row[5]) for row in rows])
+    days, day_codes = np.unique(timestamps.astype('datetime64[D]'), return_inverse=True)
+
+    event_index = np.array(event_index, dtype=np.int64)
+    groups = np.array(event_series, dtype=np.int64) * len(days) + day_codes[event_index]
+
+    # A stable sort keeps each group's events in time order for open/close
+    order = np.argsort(groups, kind='stable')
+    groups = groups[order]
+    price = prices[event_index[order]]
+    quantity = quantities[event_index[order]]
+
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    ends = np.r_[starts[1:], len(groups)] - 1
+    volume = np.add.reduceat(quantity, starts)
+    notional = np.add.reduceat(price * quantity, starts)
+    columns = {
+        'open': price[starts],
+        'high': np.maximum.reduceat(price, starts),
+        'low': np.minimum.reduceat(price, starts),
+        'close': price[ends],
+        'volume': volume,
+        'notional': notional,
+        'count': np.diff(np.r_[starts, len(groups)]),
+    }
+
+    series_keys = list(series_codes)
+    bars = {}
+    for position, group in enumerate(groups[starts].tolist()):
+        dimension, key, region = series_keys[group // len(days)]
+        date = days[group % len(days)].item()
+        bars[(dimension, key, region, date)] = {
+            name: values[position].item() for name, values in columns.items()
+        }
+    return bars
+
+
+def _money(value):
+    return Decimal(str(round(value, 2))).quantize(CENT)
+
+
+def _merge_bars(source, bars):
+    """
+    Merge freshly aggregated bars into stored ones and upsert them.
+    """
+    existing = {}
+    stored = PriceBar.objects.filter(
+        source=source,
+        date__in={date for _, _, _, date in bars},
+        key__in={key for _, key, _, _ in bars},
+    ).values_list('dimension', 'key', 'region', 'date', *BAR_FIELDS)
+    for dimension, key, region, date, *values in stored:
+        if (dimension, key, region, date) in bars:
+            existing[(dimension, key, region, date)] = dict(zip(BAR_FIELDS, values))
+
+    records = []
+    for (dimension, key, region, date), bar in bars.items():
+        previous = existing.get((dimension, key, region, date))
+        if previous is not None:
+            # Stored bars hold older events, so only the close moves forward
+            bar = {
+                'open': float(previous['open']),
+                'high': max(bar['high'], float(previous['high'])),
+                'low': min(bar['low'], float(previous['low'])),
+                'close': bar['close'],
+                'volume': bar['volume'] + float(previous['volume']),
+                'notional': bar['notional'] + float(previous['notional']),
+                'count': bar['count'] + previous['count'],
+            }
+        vwap = bar['notional'] / bar['volume'] if bar['volume'] else bar['close']
+        records.append(PriceBar(
+            source=source,
+            dimension=dimension,
+            key=key,
+            region=region,
+            date=date,
+            open=_money(bar['open']),
+            high=_money(bar['high']),
+            low=_money(bar['low']),
+            close=_money(bar['close']),
+            vwap=_money(vwap),
+            volume=_money(bar['volume']),
+            notional=_money(bar['notional']),
+            count=bar['count'],
+        ))
+
+    PriceBar.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=['source', 'dimension', 'key', 'region', 'date'],
+        update_fields=BAR_FIELDS,
+        batch_size=2000,
+    )
+    return len(records)
+
+
+def update_source(source, chunk_size=CHUNK_SIZE, until=None):
+    """
+    Fold new events of one source into the price index.
+
+    Each chunk commits together with the cursor, so a crashed run resumes
+    where it stopped without counting anything twice.
+    """
+    read_rows = SOURCES[source]
+    until = until or timezone.now() - SETTLE_DELAY
+    PriceIndexCursor.objects.get_or_create(source=source)
+    events = bars = 0
+
+    while True:
+        with transaction.atomic():
+            cursor = PriceIndexCursor.objects.select_for_update().get(source=source)
+            rows = read_rows(cursor.position_at, cursor.position_id, until, chunk_size)
+            if not rows:
+                break
+
+            bars += _merge_bars(source, aggregate_bars(rows))
+            cursor.position_at, cursor.position_id = rows[-1][0], str(rows[-1][1])
+            cursor.save(update_fields=['position_at', 'position_id', 'updated_at'])
+            events += len(rows)
+        if len(rows) < chunk_size:
+            break
+
+    if events:
+        logger.info(f"Price index read {events} {source} events into {bars} bars")
+    return events
+
+
+def update_price_index(chunk_size=CHUNK_SIZE):
+    """
+    Bring every price source up to date.
+    """
+    events = sum(update_source(source, chunk_size) for source in SOURCES)
+    if events:
+        # Bulk upserts skip post_save, so invalidate cached price series here
+        bump_generation(PriceBar)
+    return events
+
+
+def rebuild_price_index(chunk_size=CHUNK_SIZE):
+    """
+    Drop all bars and recompute the index from the full history.
+    """
+    with transaction.atomic():
+        PriceBar.objects.all().delete()
+        PriceIndexCursor.objects.all().delete()
+    return update_price_index(chunk_size)
+
+
+def price_series(source, dimension, key, region=ALL_REGIONS, start=None, end=None):
+    """
+    Read one series as chart-ready columns, oldest bar first.
+    """
+    bars = PriceBar.objects.filter(source=source, dimension=dimension, key=key, region=region)
+    if start is not None:
+        bars = bars.filter(date__gte=start)
+    if end is not None:
+        bars = bars.filter(date__lte=end)
+
+    series = {'dates': []}
+    series.update({name: [] for name in SERIES_FIELDS})
+    for date, *values in bars.order_by('date').values_list('date', *SERIES_FIELDS):
+        series['dates'].append(date.isoformat())
+        for name, value in zip(SERIES_FIELDS, values):
+            series[name].append(float(value) if isinstance(value, Decimal) else value)
+    return series
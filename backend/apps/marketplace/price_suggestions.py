@@ -0,0 +1,263 @@
+"""
+Price suggestions for AgriLink listings.
+
+Asking prices (new listings) and transacted prices (confirmed orders)
+are folded into ``PriceSketch`` t-digests per segment: product or
+category, narrowed by quality grade and region. A suggestion walks the
+segments from most to least specific and returns the quartiles of the
+first one with enough samples. Quartile summaries are cached per
+segment and replaced whenever the segment's sketch changes, so a
+suggestion is a single cache round trip.
+"""
+from collections import defaultdict, namedtuple
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+import logging
+
+from core.sketches import TDigest
+from core.utils import region_for_point
+from .models import PriceBar, PriceSketch, ProduceListing
+from .price_index import normalize_product_name
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEY = 'price_sketch:{source}:{dimension}:{key}:{grade}:{region}'
+SUMMARY_TIMEOUT = 60 * 60
+QUANTILES = (0.25, 0.5, 0.75)
+MIN_SAMPLES = 5
+SEGMENT_BATCH_SIZE = 500
+ANY = ''
+
+PriceEvent = namedtuple('PriceEvent', ['product_name', 'category', 'quality_grade', 'point', 'price'])
+
+
+def segments(product_name, category, quality_grade, region):
+    """
+    List the segments a price belongs to, most specific first.
+    """
+    dimensions = [(PriceBar.Dimension.PRODUCT, normalize_product_name(product_name))]
+    if category:
+        dimensions.append((PriceBar.Dimension.CATEGORY, category))
+    grades = [quality_grade, ANY] if quality_grade else [ANY]
+    regions = [region, ANY] if region else [ANY]
+    return [
+        (dimension, key, grade, segment_region)
+        for dimension, key in dimensions
+        for grade in grades
+        for segment_region in regions
+    ]
+
+
+def _summary_key(source, segment):
+    dimension, key, grade, region = segment
+    return SUMMARY_KEY.format(
+        source=source, dimension=dimension, key=key.replace(' ', '_'), grade=grade, region=region
+    )
+
+
+def _summarize(digest, count):
+    quartiles = digest.quantiles(QUANTILES) if count else [None] * len(QUANTILES)
+    return {
+        'count': count,
+        **{
+            f'p{int(q * 100)}': round(value, 2) if value is not None else None
+            for q, value in zip(QUANTILES, quartiles)
+        },
+    }
+
+
+def _segment_filter(segment_list):
+    return reduce(or_, (
+        Q(dimension=dimension, key=key, quality_grade=grade, region=region)
+        for dimension, key, grade, region in segment_list
+    ))
+
+
+def record_prices(source, events):
+    """
+    Fold price events into the sketches of every segment they belong to.
+    """
+    values = defaultdict(list)
+    for event in events:
+        region = region_for_point(event.point)
+        for segment in segments(event.product_name, event.category, event.quality_grade, region):
+            values[segment].append(float(event.price))
+    if not values:
+        return 0
+
+    now = timezone.now()
+    summaries = {}
+    ordered = sorted(values)
+    with transaction.atomic():
+        for start in range(0, len(ordered), SEGMENT_BATCH_SIZE):
+            batch = ordered[start:start + SEGMENT_BATCH_SIZE]
+            PriceSketch.objects.bulk_create([
+                PriceSketch(source=source, dimension=dimension, key=key, quality_grade=grade,
+                            region=region, digest=b'')
+                for dimension, key, grade, region in batch
+            ], ignore_conflicts=True)
+
+            # Locking in primary key order keeps concurrent writers from deadlocking
+            sketches = list(
+                PriceSketch.objects.select_for_update().filter(_segment_filter(batch), source=source)
+                .order_by('pk')
+            )
+            for sketch in sketches:
+                segment = (sketch.dimension, sketch.key, sketch.quality_grade, sketch.region)
+                digest = TDigest.from_bytes(sketch.digest)
+                digest.update_many(values[segment])
+                sketch.digest = digest.to_bytes()
+                sketch.count += len(values[segment])
+                sketch.updated_at = now
+                summaries[_summary_key(source, segment)] = _summarize(digest, sketch.count)
+            PriceSketch.objects.bulk_update(sketches, ['digest', 'count', 'updated_at'])
+
+        transaction.on_commit(lambda: cache.set_many(summaries, timeout=SUMMARY_TIMEOUT))
+    return len(summaries)
+
+
+def listing_price_event(listing):
+    """
+    Describe a listing's asking price as a price event.
+    """
+    return PriceEvent(
+        listing.product_name, listing.category, listing.quality_grade, listing.location, listing.unit_price
+    )
+
+
+def record_listing_prices(listings):
+    """
+    Record the asking prices of newly created listings.
+    """
+    try:
+        record_prices(PriceBar.Source.ASK, [listing_price_event(listing) for listing in listings])
+    except DatabaseError as e:
+        logger.error(f"Failed to record asking prices: {e}")
+
+
+def record_order_price(order):
+    """
+    Record a confirmed order's price, once per order.
+
+    The order's ``price_recorded_at`` is claimed in the transaction that
+    updates the sketches, so later saves of the order never add it again.
+    """
+    from apps.orders.models import Order
+
+    listing = order.listing
+    event = PriceEvent(
+        order.product_name,
+        listing.category if listing else None,
+        listing.quality_grade if listing else ANY,
+        listing.location if listing else order.delivery_location,
+        order.unit_price,
+    )
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            claimed = Order.objects.filter(pk=order.pk, price_recorded_at__isnull=True).update(
+                price_recorded_at=now
+            )
+            if not claimed:
+                return
+            record_prices(PriceBar.Source.TRADE, [event])
+    except DatabaseError as e:
+        logger.error(f"Failed to record price of order {order.pk}: {e}")
+        return
+    # Keep a later full save of this instance from clearing the claim
+    order.price_recorded_at = now
+
+
+def _load_summaries(source, segment_list):
+    summaries = {
+        _summary_key(source, segment): {'count': 0, **{f'p{int(q * 100)}': None for q in QUANTILES}}
+        for segment in segment_list
+    }
+    for sketch in PriceSketch.objects.filter(_segment_filter(segment_list), source=source):
+        segment = (sketch.dimension, sketch.key, sketch.quality_grade, sketch.region)
+        summaries[_summary_key(source, segment)] = _summarize(TDigest.from_bytes(sketch.digest), sketch.count)
+    cache.set_many(summaries, timeout=SUMMARY_TIMEOUT)
+    return summaries
+
+
+def suggest_price(product_name, category=None, quality_grade=None, point=None):
+    """
+    Get asking and transacted price quartiles for a prospective listing.
+    """
+    candidates = segments(product_name, category, quality_grade, region_for_point(point))
+    keys = {
+        source: [_summary_key(source, segment) for segment in candidates]
+        for source in PriceBar.Source.values
+    }
+    summaries = cache.get_many([key for source_keys in keys.values() for key in source_keys])
+
+    suggestion = {}
+    for source, source_keys in keys.items():
+        missing = [segment for segment, key in zip(candidates, source_keys) if key not in summaries]
+        if missing:
+            summaries.update(_load_summaries(source, missing))
+
+        suggestion[source] = None
+        for segment, key in zip(candidates, source_keys):
+            summary = summaries[key]
+            if summary['count'] >= MIN_SAMPLES:
+                dimension, segment_key, grade, region = segment
+                suggestion[source] = {
+                    **summary,
+                    'segment': {
+                        'dimension': dimension,
+                        'key': segment_key,
+                        'quality_grade': grade or None,
+                        'region': region or None,
+                    },
+                }
+                break
+
+    return {'asking': suggestion[PriceBar.Source.ASK], 'transacted': suggestion[PriceBar.Source.TRADE]}
+
+
+def rebuild_price_sketches(chunk_size=5000):
+    """
+    Drop all sketches and rebuild them from every listing and confirmed order.
+    """
+    from apps.orders.models import Order
+
+    PriceSketch.objects.all().delete()
+    recorded = 0
+
+    listings = ProduceListing.objects.values_list(
+        'product_name', 'category', 'quality_grade', 'location', 'unit_price'
+    ).order_by()
+    orders = Order.objects.filter(confirmed_at__isnull=False).exclude(
+        status__in=[Order.Status.CANCELLED, Order.Status.REFUNDED]
+    ).values_list(
+        'product_name', 'listing__category', 'listing__quality_grade',
+        'listing__location', 'delivery_location', 'unit_price',
+    ).order_by()
+
+    for source, rows in [
+        (PriceBar.Source.ASK, (PriceEvent(*row) for row in listings.iterator(chunk_size=chunk_size))),
+        (PriceBar.Source.TRADE, (
+            PriceEvent(name, category, grade or ANY, listing_location or delivery_location, price)
+            for name, category, grade, listing_location, delivery_location, price
+            in orders.iterator(chunk_size=chunk_size)
+        )),
+    ]:
+        chunk = []
+        for event in rows:
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                record_prices(source, chunk)
+                recorded += len(chunk)
+                chunk = []
+        if chunk:
+            record_prices(source, chunk)
+            recorded += len(chunk)
+
+    logger.info(f"Rebuilt price sketches from {recorded} prices")
+    return recorded
@@ -8,7 +8,9 @@ from django.contrib.gis.geos import Point
 from django.utils import timezone
 from core.utils import create_point_from_coordinates, format_currency, format_date
 from core.exceptions import ValidationException
-from .models import ProduceCategory, ProduceListing, ListingInquiry, ListingReview
+from core.serializers import SparseFieldsetMixin
+from .bulk import MAX_BATCH_SIZE
+from .models import PriceBar, ProduceCategory, ProduceListing, ListingInquiry, ListingReview
 
 User = get_user_model()
 
@@ -23,7 +25,7 @@ class ProduceCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class ProduceListingSerializer(serializers.ModelSerializer):
+class ProduceListingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for produce listings (create and update).
     """
@@ -59,6 +61,29 @@ class ProduceListingSerializer(serializers.ModelSerializer):
             'is_available', 'days_until_expiry', 'availability_status',
             'created_at', 'updated_at', 'expires_at'
         ]
+        field_dependencies = {
+            'farmer_name': ['farmer__first_name', 'farmer__last_name'],
+            'farmer_profile': [
+                'farmer__farmer_profile__user',
+                'farmer__farmer_profile__farm_name',
+                'farmer__farmer_profile__years_experience',
+                'farmer__farmer_profile__farm_size',
+                'farmer__farmer_profile__primary_crops',
+            ],
+            'location_coordinates': ['location'],
+            'formatted_price': ['unit_price'],
+            'formatted_quantity': ['quantity_available'],
+            'total_value': ['quantity_available', 'unit_price'],
+            'is_available': [
+                'status', 'expires_at',
+                'availability_period_start', 'availability_period_end',
+            ],
+            'days_until_expiry': ['expires_at'],
+            'availability_status': [
+                'status', 'expires_at',
+                'availability_period_start', 'availability_period_end',
+            ],
+        }
 
     def get_farmer_profile(self, obj):
         """
@@ -240,6 +265,86 @@ class ProduceListingSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ProduceListingBatchItemSerializer(ProduceListingSerializer):
+    """
+    Serializer for one listing in a bulk create request.
+    """
+    latitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, min_value=-90, max_value=90, required=False
+    )
+    longitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, min_value=-180, max_value=180, required=False
+    )
+
+    class Meta(ProduceListingSerializer.Meta):
+        fields = [
+            name for name in ProduceListingSerializer.Meta.fields if name != 'location'
+        ] + ['latitude', 'longitude']
+
+    def validate_availability_period_end(self, value):
+        """
+        Checked in validate(), since batch items have no initial_data.
+        """
+        return value
+
+    def validate(self, attrs):
+        """
+        Cross-field validation, including the availability window.
+        """
+        attrs = super().validate(attrs)
+
+        start_date = attrs.get('availability_period_start')
+        end_date = attrs.get('availability_period_end')
+        if start_date and end_date and end_date <= start_date:
+            raise serializers.ValidationError("Availability end date must be after start date")
+
+        if (attrs.get('latitude') is None) != (attrs.get('longitude') is None):
+            raise serializers.ValidationError("Both latitude and longitude must be provided")
+
+        return attrs
+
+
+class ProduceListingBatchSerializer(serializers.Serializer):
+    """
+    Serializer for bulk listing creation requests.
+    """
+    listings = serializers.ListField(
+        child=serializers.DictField(), min_length=1, max_length=MAX_BATCH_SIZE
+    )
+    latitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, min_value=-90, max_value=90, required=False,
+        help_text="Default location for listings without their own coordinates"
+    )
+    longitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, min_value=-180, max_value=180, required=False
+    )
+    location_address = serializers.CharField(max_length=255, required=False)
+    atomic = serializers.BooleanField(
+        default=False,
+        help_text="Create nothing unless every listing is valid"
+    )
+
+    def validate(self, attrs):
+        """
+        Validate the default location.
+        """
+        if (attrs.get('latitude') is None) != (attrs.get('longitude') is None):
+            raise serializers.ValidationError("Both latitude and longitude must be provided")
+        return attrs
+
+
+class TrendingListingsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for trending listing parameters.
+    """
+    category = serializers.ChoiceField(
+        choices=ProduceListing._meta.get_field('category').choices,
+        required=False
+    )
+    offset = serializers.IntegerField(min_value=0, max_value=1000, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
 class ProduceListingDetailSerializer(ProduceListingSerializer):
     """
     Detailed serializer for produce listings with additional information.
@@ -254,6 +359,11 @@ class ProduceListingDetailSerializer(ProduceListingSerializer):
             'farmer_location', 'farmer_rating', 'reviews_summary',
             'related_listings'
         ]
+        expandable_fields = ['farmer_rating', 'reviews_summary', 'related_listings']
+        field_dependencies = {
+            **ProduceListingSerializer.Meta.field_dependencies,
+            'farmer_location': ['farmer__location'],
+        }
 
     def get_farmer_location(self, obj):
         """
@@ -302,9 +412,8 @@ class ProduceListingDetailSerializer(ProduceListingSerializer):
         """
         Get related listings from same farmer.
         """
-        related = ProduceListing.objects.filter(
-            farmer=obj.farmer,
-            status=ProduceListing.Status.ACTIVE
+        related = ProduceListing.objects.active().filter(
+            farmer=obj.farmer
         ).exclude(id=obj.id)[:3]
 
         return ProduceListingSerializer(related, many=True).data
@@ -500,6 +609,10 @@ class ListingSearchSerializer(serializers.Serializer):
     price_min = serializers.DecimalField(min_value=0, required=False)
     price_max = serializers.DecimalField(min_value=0, required=False)
     organic_only = serializers.BooleanField(default=False)
+    available_now = serializers.BooleanField(
+        default=False,
+        help_text="Only listings whose availability window has started"
+    )
     quality_grade = serializers.ChoiceField(
         choices=ProduceListing.QualityGrade.choices,
         required=False
@@ -512,6 +625,7 @@ class ListingSearchSerializer(serializers.Serializer):
             ('price_high', 'Price: High to Low'),
             ('rating', 'Highest Rated'),
             ('distance', 'Nearest First'),
+            ('trending', 'Trending'),
         ],
         default='newest'
     )
@@ -533,4 +647,67 @@ class ListingSearchSerializer(serializers.Serializer):
         if price_min is not None and price_max is not None and price_min > price_max:
             raise serializers.ValidationError("Minimum price cannot be greater than maximum price")
 
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class PriceSeriesQuerySerializer(serializers.Serializer):
+    """
+    Serializer for price index series parameters.
+    """
+    product = serializers.CharField(max_length=100, required=False)
+    category = serializers.ChoiceField(
+        choices=ProduceListing._meta.get_field('category').choices,
+        required=False
+    )
+    region = serializers.CharField(max_length=32, required=False, default='')
+    source = serializers.ChoiceField(choices=PriceBar.Source.choices, default=PriceBar.Source.TRADE)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=730, default=90)
+
+    def validate(self, attrs):
+        """
+        Require exactly one of product and category, and resolve the date range.
+        """
+        if bool(attrs.get('product')) == bool(attrs.get('category')):
+            raise serializers.ValidationError("Provide either product or category")
+
+        end_date = attrs.get('end_date') or timezone.now().date()
+        start_date = attrs.get('start_date') or end_date - timezone.timedelta(days=attrs['days'] - 1)
+        if start_date > end_date:
+            raise serializers.ValidationError("Start date cannot be after end date")
+        if (end_date - start_date).days >= 730:
+            raise serializers.ValidationError("Date range cannot exceed 730 days")
+
+        attrs['start_date'] = start_date
+        attrs['end_date'] = end_date
+        return attrs
+
+
+class PriceSuggestionQuerySerializer(serializers.Serializer):
+    """
+    Serializer for price suggestion parameters.
+    """
+    product_name = serializers.CharField(max_length=100)
+    category = serializers.ChoiceField(
+        choices=ProduceListing._meta.get_field('category').choices,
+        required=False
+    )
+    quality_grade = serializers.ChoiceField(
+        choices=ProduceListing.QualityGrade.choices,
+        required=False
+    )
+    latitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, min_value=-90, max_value=90, required=False
+    )
+    longitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, min_value=-180, max_value=180, required=False
+    )
+
+    def validate(self, attrs):
+        """
+        Validate the location.
+        """
+        if (attrs.get('latitude') is None) != (attrs.get('longitude') is None):
+            raise serializers.ValidationError("Both latitude and longitude must be provided")
+        return attrs
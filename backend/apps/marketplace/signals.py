@@ -1,10 +1,14 @@
 """
 Marketplace signals for AgriLink API.
 """
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import ProduceListing, ListingInquiry, ListingReview
+from core.cache import register_cache_invalidation
+from .models import ProduceCategory, ProduceListing, ListingInquiry, ListingReview
+
+register_cache_invalidation(ProduceCategory, ProduceListing, ListingReview)
 
 
 @receiver(post_save, sender=ProduceListing)
@@ -13,6 +17,9 @@ def produce_listing_post_save(sender, instance, created, **kwargs):
     Handle produce listing creation and updates.
     """
     if created:
+        from .price_suggestions import record_listing_prices
+        transaction.on_commit(lambda: record_listing_prices([instance]))
+
         # Log listing creation
         from apps.dashboard.models import UserActivity
         UserActivity.objects.create(
@@ -26,6 +33,20 @@ def produce_listing_post_save(sender, instance, created, **kwargs):
                 'price': float(instance.unit_price),
             }
         )
+    elif instance.status != ProduceListing.Status.ACTIVE:
+        from .trending import remove_listings
+        entry = (instance.pk, instance.category)
+        transaction.on_commit(lambda: remove_listings([entry]))
+
+
+@receiver(post_delete, sender=ProduceListing)
+def produce_listing_post_delete(sender, instance, **kwargs):
+    """
+    Drop deleted listings from the trending sets.
+    """
+    from .trending import remove_listings
+    entry = (instance.pk, instance.category)
+    transaction.on_commit(lambda: remove_listings([entry]))
 
 
 @receiver(post_save, sender=ListingInquiry)
@@ -34,6 +55,9 @@ def listing_inquiry_post_save(sender, instance, created, **kwargs):
     Handle listing inquiry creation.
     """
     if created:
+        from .trending import record_listing_event
+        transaction.on_commit(lambda: record_listing_event(instance.listing, 'inquiry'))
+
         # Create notification for farmer
         from apps.notifications.models import Notification
         Notification.objects.create(
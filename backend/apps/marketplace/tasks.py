@@ -0,0 +1,32 @@
+"""
+Marketplace background tasks for AgriLink.
+"""
+from celery import shared_task
+
+from .expiry import expire_listings
+from .price_index import update_price_index
+from .trending import rebase_trending
+
+
+@shared_task
+def expire_produce_listings():
+    """
+    Move listings that expired or went out of season to EXPIRED.
+    """
+    return expire_listings()
+
+
+@shared_task
+def update_market_price_index():
+    """
+    Fold new listings and confirmed orders into the daily price bars.
+    """
+    return update_price_index()
+
+
+@shared_task
+def rebase_trending_listings():
+    """
+    Rescale trending scores to the current time and prune faded listings.
+    """
+    return rebase_trending()
@@ -0,0 +1,259 @@
+"""
+Trending listings for AgriLink marketplace.
+
+Every view, inquiry and order adds a weighted amount of engagement to
+its listing, and engagement decays exponentially with a fixed half-life.
+Because all scores decay at the same rate, the ranking only changes when
+events arrive: an event at time ``t`` adds ``weight * exp(rate * (t -
+epoch))`` to the listing's member in a Redis sorted set, so recording is
+a single ``ZINCRBY`` and reading the top listings is a ``ZREVRANGE``,
+both O(log n). Scores grow with ``t``, so a periodic rebase rescales
+every set to a new epoch and prunes listings whose engagement has
+decayed away. Events are applied by Lua scripts that read the epoch and
+Redis' own clock, so a rebase never races an increment.
+
+There is one set across the marketplace and one per category. Listings
+leave the sets when they stop being active.
+"""
+import math
+import time
+import uuid
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import ExpressionWrapper, F, FloatField, Func, IntegerField, Sum, UUIDField, Value
+from django.db.models.functions import Exp, Extract
+from django.utils import timezone
+import logging
+
+from .models import ListingInquiry, ProduceListing
+
+logger = logging.getLogger(__name__)
+
+HALF_LIFE = timezone.timedelta(hours=24)
+DECAY_RATE = math.log(2) / HALF_LIFE.total_seconds()
+EVENT_WEIGHTS = {
+    'view': 1.0,
+    'inquiry': 5.0,
+    'order': 10.0,
+}
+# Scores below this, in current units, are dropped on rebase (about a week-old view)
+MIN_SCORE = 0.01
+# Engagement older than this no longer matters when rebuilding from the database
+REBUILD_WINDOW = timezone.timedelta(days=14)
+# How many top listings sort_by=trending ranks ahead of the rest
+SEARCH_DEPTH = 1000
+REBUILD_BATCH_SIZE = 5000
+
+EPOCH_KEY = 'trending:listings:epoch'
+ALL_KEY = 'trending:listings:all'
+CATEGORY_KEY = 'trending:listings:category:{category}'
+
+RECORD_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local epoch = redis.call('GET', KEYS[1])
+if not epoch then
+    epoch = now
+    redis.call('SET', KEYS[1], tostring(now))
+end
+local increment = tonumber(ARGV[1]) * math.exp((now - tonumber(epoch)) * tonumber(ARGV[2]))
+for i = 2, #KEYS do
+    redis.call('ZINCRBY', KEYS[i], increment, ARGV[3])
+end
+return tostring(increment)
+"""
+
+REBASE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local epoch = tonumber(redis.call('GET', KEYS[1]) or now)
+local factor = math.exp((epoch - now) * tonumber(ARGV[1]))
+local pruned = 0
+for i = 2, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('ZUNIONSTORE', KEYS[i], 1, KEYS[i], 'WEIGHTS', factor)
+        pruned = pruned + redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', '(' .. ARGV[2])
+    end
+end
+redis.call('SET', KEYS[1], tostring(now))
+return pruned
+"""
+
+_client = None
+
+
+def get_client():
+    """
+    Get the Redis client holding the trending sets.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.TRENDING_REDIS_URL)
+    return _client
+
+
+def _category_keys():
+    return [
+        CATEGORY_KEY.format(category=category)
+        for category, _ in ProduceListing._meta.get_field('category').choices
+    ]
+
+
+def _keys(category):
+    return [CATEGORY_KEY.format(category=category)] if category else [ALL_KEY]
+
+
+def record_listing_event(listing, event):
+    """
+    Add one view, inquiry or order to a listing's trending score.
+    """
+    # Engagement with inactive listings would put them back in the sets
+    if listing.status != ProduceListing.Status.ACTIVE:
+        return
+    keys = [EPOCH_KEY, ALL_KEY, CATEGORY_KEY.format(category=listing.category)]
+    try:
+        get_client().eval(RECORD_SCRIPT, len(keys), *keys, EVENT_WEIGHTS[event], DECAY_RATE, str(listing.pk))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to record {event} of listing {listing.pk} for trending: {e}")
+
+
+def remove_listings(entries):
+    """
+    Drop ``(listing_id, category)`` pairs from the trending sets.
+    """
+    if not entries:
+        return
+    by_category = defaultdict(list)
+    for listing_id, category in entries:
+        by_category[category].append(str(listing_id))
+    try:
+        pipe = get_client().pipeline(transaction=False)
+        pipe.zrem(ALL_KEY, *[member for members in by_category.values() for member in members])
+        for category, members in by_category.items():
+            pipe.zrem(CATEGORY_KEY.format(category=category), *members)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to remove {len(entries)} listings from trending: {e}")
+
+
+def trending_ids(category=None, offset=0, limit=20):
+    """
+    Read ``(listing_id, score)`` pairs, hottest first, with scores decayed
+    to the current time. Returns an empty list when Redis is unavailable.
+    """
+    try:
+        pipe = get_client().pipeline(transaction=True)
+        pipe.get(EPOCH_KEY)
+        pipe.zrevrange(_keys(category)[0], offset, offset + limit - 1, withscores=True)
+        epoch, members = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read trending listings: {e}")
+        return []
+    if not members or epoch is None:
+        return []
+    decay = math.exp((float(epoch) - time.time()) * DECAY_RATE)
+    return [(uuid.UUID(member.decode()), score * decay) for member, score in members]
+
+
+def order_by_trending(queryset, category=None):
+    """
+    Order listings by trending rank; listings outside the top
+    ``SEARCH_DEPTH`` follow, newest first.
+    """
+    ranked = [listing_id for listing_id, _ in trending_ids(category, 0, SEARCH_DEPTH)]
+    if not ranked:
+        return queryset.order_by('-view_count', '-created_at')
+    rank = Func(
+        Value(ranked, output_field=ArrayField(UUIDField())),
+        F('pk'),
+        function='array_position',
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(trending_rank=rank).order_by(F('trending_rank').asc(nulls_last=True), '-created_at')
+
+
+def rebase_trending():
+    """
+    Rescale the trending sets to the current time and prune faded listings.
+    """
+    keys = [EPOCH_KEY, ALL_KEY] + _category_keys()
+    pruned = get_client().eval(REBASE_SCRIPT, len(keys), *keys, DECAY_RATE, MIN_SCORE)
+    if pruned:
+        logger.info(f"Pruned {pruned} faded entries from trending listings")
+    return pruned
+
+
+def _decayed_sum(field, now):
+    age = ExpressionWrapper(
+        Value(now.timestamp()) - Extract(field, 'epoch', output_field=FloatField()), output_field=FloatField()
+    )
+    return Sum(Exp(age * Value(-DECAY_RATE)), output_field=FloatField())
+
+
+def rebuild_trending(window=REBUILD_WINDOW):
+    """
+    Recompute every trending set from logged views, inquiries and orders.
+
+    The new sets are written aside and swapped in atomically; events
+    recorded while the rebuild runs are lost, so run it when the sets are
+    missing or suspect rather than on a schedule.
+    """
+    from apps.dashboard.models import UserActivity
+    from apps.orders.models import Order
+
+    now = timezone.now()
+    since = now - window
+    scores = defaultdict(float)
+
+    views = UserActivity.objects.filter(
+        activity_type=UserActivity.ActivityType.LISTING_VIEW, timestamp__gte=since
+    ).order_by().values('metadata__listing_id').annotate(score=_decayed_sum('timestamp', now))
+    for row in views.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        try:
+            scores[uuid.UUID(str(row['metadata__listing_id']))] += EVENT_WEIGHTS['view'] * row['score']
+        except ValueError:
+            continue
+
+    for event, rows in [
+        ('inquiry', ListingInquiry.objects.filter(created_at__gte=since)),
+        ('order', Order.objects.filter(created_at__gte=since, listing__isnull=False)),
+    ]:
+        rows = rows.order_by().values('listing_id').annotate(score=_decayed_sum('created_at', now))
+        for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            scores[row['listing_id']] += EVENT_WEIGHTS[event] * row['score']
+
+    sets = defaultdict(dict)
+    listing_ids = list(scores)
+    for start in range(0, len(listing_ids), REBUILD_BATCH_SIZE):
+        batch = listing_ids[start:start + REBUILD_BATCH_SIZE]
+        active = ProduceListing.objects.active(now).filter(pk__in=batch).values_list('pk', 'category')
+        for listing_id, category in active:
+            score = scores[listing_id]
+            if score >= MIN_SCORE:
+                sets[ALL_KEY][str(listing_id)] = score
+                sets[CATEGORY_KEY.format(category=category)][str(listing_id)] = score
+
+    client = get_client()
+    pipe = client.pipeline(transaction=False)
+    for key, members in sets.items():
+        staging = f'{key}:rebuild'
+        pipe.delete(staging)
+        items = list(members.items())
+        for start in range(0, len(items), REBUILD_BATCH_SIZE):
+            pipe.zadd(staging, dict(items[start:start + REBUILD_BATCH_SIZE]))
+    pipe.execute()
+
+    pipe = client.pipeline(transaction=True)
+    for key in [ALL_KEY] + _category_keys():
+        if key in sets:
+            pipe.rename(f'{key}:rebuild', key)
+        else:
+            pipe.delete(key)
+    pipe.set(EPOCH_KEY, repr(now.timestamp()))
+    pipe.execute()
+
+    logger.info(f"Rebuilt trending listings: {len(sets[ALL_KEY])} listings")
+    return len(sets[ALL_KEY])
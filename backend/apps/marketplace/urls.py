@@ -10,9 +10,13 @@ from .views import (
     CategoryListView,
     create_listing_inquiry,
     my_listings,
+    bulk_create_listings,
     create_listing_review,
     search_listings,
     featured_listings,
+    trending_listings,
+    price_index,
+    price_suggestion,
 )
 
 urlpatterns = [
@@ -22,11 +26,17 @@ urlpatterns = [
     # Produce Listings
     path('listings/', ProduceListingListCreateView.as_view(), name='produce_listings'),
     path('listings/my/', my_listings, name='my_listings'),
+    path('listings/bulk/', bulk_create_listings, name='bulk_create_listings'),
     path('listings/search/', search_listings, name='search_listings'),
     path('listings/featured/', featured_listings, name='featured_listings'),
+    path('listings/trending/', trending_listings, name='trending_listings'),
     path('listings/<uuid:listing_id>/', ProduceListingDetailView.as_view(), name='produce_listing_detail'),
     path('listings/<uuid:listing_id>/update/', ProduceListingUpdateView.as_view(), name='produce_listing_update'),
     path('listings/<uuid:listing_id>/delete/', ProduceListingDeleteView.as_view(), name='produce_listing_delete'),
     path('listings/<uuid:listing_id>/inquire/', create_listing_inquiry, name='create_listing_inquiry'),
     path('listings/<uuid:listing_id>/review/', create_listing_review, name='create_listing_review'),
+
+    # Market price index
+    path('prices/', price_index, name='price_index'),
+    path('prices/suggest/', price_suggestion, name='price_suggestion'),
 ]
\ No newline at end of file
@@ -9,6 +9,7 @@ from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import Distance as D
 from django.contrib.auth import get_user_model
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
@@ -16,9 +17,23 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 
 from core.permissions import IsFarmer, IsBuyer, IsOwnerOrReadOnly, IsActiveUser
 from core.pagination import StandardResultsSetPagination
+from core.serializers import SparseFieldsetViewMixin, parse_list_param, project_queryset
+from core.cache import CachedListMixin, cache_response
+from core.conditional import (
+    ConditionalListMixin,
+    is_not_modified,
+    not_modified_response,
+    object_validators,
+    set_validators,
+)
 from core.exceptions import ValidationException, NotFoundException, AuthorizationException
 
-from .models import ProduceCategory, ProduceListing, ListingInquiry, ListingReview
+from apps.users.models import FarmerProfile
+from .bulk import create_listings
+from .price_index import normalize_product_name, price_series
+from .price_suggestions import suggest_price
+from .trending import order_by_trending, record_listing_event, trending_ids
+from .models import PriceBar, ProduceCategory, ProduceListing, ListingInquiry, ListingReview
 from .serializers import (
     ProduceCategorySerializer,
     ProduceListingSerializer,
@@ -26,12 +41,16 @@ from .serializers import (
     ListingInquirySerializer,
     ListingReviewSerializer,
     ListingSearchSerializer,
+    ProduceListingBatchSerializer,
+    PriceSeriesQuerySerializer,
+    PriceSuggestionQuerySerializer,
+    TrendingListingsQuerySerializer,
 )
 
 User = get_user_model()
 
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedListMixin, generics.ListAPIView):
     """
     List all produce categories.
     """
@@ -39,9 +58,12 @@ class CategoryListView(generics.ListAPIView):
     serializer_class = ProduceCategorySerializer
     queryset = ProduceCategory.objects.filter(is_active=True)
     pagination_class = None
+    cache_namespace = 'marketplace:categories'
+    cache_models = [ProduceCategory]
+    cache_options = {'timeout': 3600, 'anonymous_only': False}
 
 
-class ProduceListingListCreateView(generics.ListCreateAPIView):
+class ProduceListingListCreateView(ConditionalListMixin, SparseFieldsetViewMixin, generics.ListCreateAPIView):
     """
     List and create produce listings.
     """
@@ -61,7 +83,7 @@ class ProduceListingListCreateView(generics.ListCreateAPIView):
 
         # For buyers and public users, only show active listings
         if not self.request.user.is_authenticated or self.request.user.role != User.Role.FARMER:
-            queryset = queryset.filter(status=ProduceListing.Status.ACTIVE)
+            queryset = queryset.active()
 
         # Filter by farmer if specified
         farmer_id = self.request.query_params.get('farmer_id')
@@ -169,14 +191,17 @@ class ProduceListingDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     serializer_class = ProduceListingDetailSerializer
     lookup_field = 'id'
+    prefetch_fields = ['reviews', 'inquiries', 'orders']
 
     def get_queryset(self):
         """
         Get listing with related data.
         """
-        return ProduceListing.objects.select_related('farmer').prefetch_related(
-            'reviews', 'inquiries', 'orders'
-        )
+        queryset = ProduceListing.objects.select_related('farmer')
+        if self.request.method in permissions.SAFE_METHODS:
+            # retrieve prefetches once its 304 check has passed
+            return queryset
+        return queryset.prefetch_related(*self.prefetch_fields)
 
     def get_permissions(self):
         """
@@ -192,16 +217,26 @@ class ProduceListingDetailView(generics.RetrieveUpdateDestroyAPIView):
         """
         listing = self.get_object()
 
+        # Skip serialization and view tracking when the client's copy is current
+        etag, last_modified = object_validators(listing, request, self.get_conditional_related(listing))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        prefetch_related_objects([listing], *self.prefetch_fields)
+
         # Increment view count
         listing.increment_view_count()
 
         # Create activity log for non-owners
         if request.user != listing.farmer:
+            record_listing_event(listing, 'view')
+
             from apps.dashboard.models import UserActivity
             UserActivity.objects.create(
                 user=request.user if request.user.is_authenticated else None,
                 activity_type='LISTING_VIEW',
-                request=request,
+                request_path=request.path,
+                request_method=request.method,
                 description=f"Viewed listing: {listing.product_name}",
                 metadata={
                     'listing_id': str(listing.id),
@@ -210,11 +245,31 @@ class ProduceListingDetailView(generics.RetrieveUpdateDestroyAPIView):
             )
 
         serializer = self.get_serializer(listing)
-        return Response({
+        response = Response({
             'success': True,
             'data': serializer.data,
             'timestamp': timezone.now().isoformat(),
         }, status=status.HTTP_200_OK)
+        return set_validators(response, etag, last_modified)
+
+    def get_conditional_related(self, listing):
+        """
+        Querysets behind the requested expandable fields, which change
+        without the listing being saved.
+        """
+        from apps.orders.models import OrderReview
+
+        fields = self.get_serializer_class().get_output_field_names(
+            parse_list_param(self.request, 'fields'), parse_list_param(self.request, 'expand')
+        )
+        related = []
+        if 'reviews_summary' in fields:
+            related.append(listing.reviews.all())
+        if 'related_listings' in fields:
+            related.append(ProduceListing.objects.active().filter(farmer_id=listing.farmer_id).exclude(pk=listing.pk))
+        if 'farmer_rating' in fields:
+            related.append(OrderReview.objects.filter(order__seller_id=listing.farmer_id))
+        return related
 
     def update(self, request, *args, **kwargs):
         """
@@ -361,6 +416,63 @@ def create_listing_inquiry(request, listing_id):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, IsFarmer, IsActiveUser])
+def bulk_create_listings(request):
+    """
+    Create many produce listings at once, reporting each one's outcome.
+    """
+    batch_serializer = ProduceListingBatchSerializer(data=request.data)
+    if not batch_serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid batch request.',
+                'details': batch_serializer.errors,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    data = batch_serializer.validated_data
+    defaults = {
+        key: data[key] for key in ('latitude', 'longitude', 'location_address') if key in data
+    }
+    results = create_listings(
+        request.user,
+        data['listings'],
+        context={'request': request},
+        defaults=defaults,
+        atomic=data['atomic'],
+        request=request,
+    )
+
+    created = sum(1 for result in results if result['success'])
+    summary = {
+        'total': len(results),
+        'created': created,
+        'failed': len(results) - created,
+        'results': results,
+    }
+    if not created:
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'No listings were created.',
+                'details': summary,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+        'data': summary,
+        'message': f"Created {created} of {len(results)} listings",
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_201_CREATED)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated, IsFarmer, IsActiveUser])
 def my_listings(request):
@@ -375,12 +487,14 @@ def my_listings(request):
         if status_filter:
             listings = listings.filter(status=status_filter)
 
+        listings = project_queryset(listings, ProduceListingSerializer, request)
+
         # Pagination
         page = request.query_params.get('page', 1)
         paginator = StandardResultsSetPagination()
         result_page = paginator.paginate_queryset(listings, request)
 
-        serializer = ProduceListingSerializer(result_page, many=True)
+        serializer = ProduceListingSerializer(result_page, many=True, context={'request': request})
 
         return paginator.get_paginated_response({
             'success': True,
@@ -468,6 +582,11 @@ def create_listing_review(request, listing_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_response(
+    'marketplace:search',
+    [ProduceListing, ListingReview, User, FarmerProfile],
+    timeout=60,
+)
 def search_listings(request):
     """
     Search produce listings with advanced filtering.
@@ -481,9 +600,11 @@ def search_listings(request):
         search_params = search_serializer.validated_data
 
         # Start with base queryset
-        queryset = ProduceListing.objects.filter(
-            status=ProduceListing.Status.ACTIVE
-        ).select_related('farmer')
+        if search_params.get('available_now'):
+            queryset = ProduceListing.objects.available()
+        else:
+            queryset = ProduceListing.objects.active()
+        queryset = queryset.select_related('farmer')
 
         # Apply filters
         if search_params.get('category'):
@@ -541,12 +662,16 @@ def search_listings(request):
             queryset = queryset.annotate(
                 avg_rating=Avg('reviews__rating')
             ).order_by('-avg_rating', '-created_at')
+        elif sort_by == 'trending':
+            queryset = order_by_trending(queryset, search_params.get('category'))
+
+        queryset = project_queryset(queryset, ProduceListingSerializer, request)
 
         # Paginate results
         paginator = StandardResultsSetPagination()
         result_page = paginator.paginate_queryset(queryset, request)
 
-        serializer = ProduceListingSerializer(result_page, many=True)
+        serializer = ProduceListingSerializer(result_page, many=True, context={'request': request})
 
         return paginator.get_paginated_response({
             'success': True,
@@ -568,6 +693,12 @@ def search_listings(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_response(
+    'marketplace:featured',
+    [ProduceListing, User, FarmerProfile],
+    timeout=300,
+    anonymous_only=False,
+)
 def featured_listings(request):
     """
     Get featured produce listings.
@@ -576,12 +707,12 @@ def featured_listings(request):
         limit = int(request.query_params.get('limit', 10))
         limit = min(limit, 50)  # Cap at 50
 
-        listings = ProduceListing.objects.filter(
-            status=ProduceListing.Status.ACTIVE,
+        listings = ProduceListing.objects.active().filter(
             is_featured=True
-        ).select_related('farmer').order_by('-created_at')[:limit]
+        ).select_related('farmer').order_by('-created_at')
+        listings = project_queryset(listings, ProduceListingSerializer, request)[:limit]
 
-        serializer = ProduceListingSerializer(listings, many=True)
+        serializer = ProduceListingSerializer(listings, many=True, context={'request': request})
 
         return Response({
             'success': True,
@@ -597,4 +728,136 @@ def featured_listings(request):
                 'message': 'Failed to retrieve featured listings.',
             },
             'timestamp': timezone.now().isoformat(),
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@cache_response(
+    'marketplace:prices',
+    [PriceBar],
+    timeout=300,
+    anonymous_only=False,
+)
+def price_index(request):
+    """
+    Get a daily price series for a product or category.
+    """
+    query_serializer = PriceSeriesQuerySerializer(data=request.query_params)
+    if not query_serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid price series parameters.',
+                'details': query_serializer.errors,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    params = query_serializer.validated_data
+    if params.get('product'):
+        dimension, key = PriceBar.Dimension.PRODUCT, normalize_product_name(params['product'])
+    else:
+        dimension, key = PriceBar.Dimension.CATEGORY, params['category']
+
+    series = price_series(
+        params['source'],
+        dimension,
+        key,
+        region=params['region'],
+        start=params['start_date'],
+        end=params['end_date'],
+    )
+
+    return Response({
+        'success': True,
+        'data': {
+            'source': params['source'],
+            'dimension': dimension,
+            'key': key,
+            'region': params['region'],
+            'start_date': params['start_date'].isoformat(),
+            'end_date': params['end_date'].isoformat(),
+            'series': series,
+        },
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def price_suggestion(request):
+    """
+    Suggest a unit price from asking and transacted price quartiles.
+    """
+    query_serializer = PriceSuggestionQuerySerializer(data=request.query_params)
+    if not query_serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid price suggestion parameters.',
+                'details': query_serializer.errors,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    params = query_serializer.validated_data
+    point = None
+    if params.get('latitude') is not None:
+        point = Point(float(params['longitude']), float(params['latitude']), srid=4326)
+
+    suggestion = suggest_price(
+        params['product_name'],
+        category=params.get('category'),
+        quality_grade=params.get('quality_grade'),
+        point=point,
+    )
+
+    return Response({
+        'success': True,
+        'data': suggestion,
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def trending_listings(request):
+    """
+    Get the listings with the most recent engagement, hottest first.
+    """
+    query_serializer = TrendingListingsQuerySerializer(data=request.query_params)
+    if not query_serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid trending parameters.',
+                'details': query_serializer.errors,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    params = query_serializer.validated_data
+    ranked = trending_ids(params.get('category'), params['offset'], params['limit'])
+    scores = dict(ranked)
+    listings = ProduceListing.objects.active().filter(pk__in=scores).select_related('farmer')
+    if params.get('category'):
+        # A listing that changed category can linger in its old set
+        listings = listings.filter(category=params['category'])
+    listings = sorted(
+        project_queryset(listings, ProduceListingSerializer, request),
+        key=lambda listing: -scores[listing.pk],
+    )
+
+    data = ProduceListingSerializer(listings, many=True, context={'request': request}).data
+    for item, listing in zip(data, listings):
+        item['trending_score'] = round(scores[listing.pk], 4)
+
+    return Response({
+        'success': True,
+        'data': data,
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
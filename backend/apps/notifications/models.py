@@ -118,7 +118,7 @@ class Notification(models.Model):
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            self.save(update_fields=['is_read', 'read_at', 'updated_at'])
 
     def mark_as_unread(self):
         """
@@ -127,7 +127,7 @@ class Notification(models.Model):
         if self.is_read:
             self.is_read = False
             self.read_at = None
-            self.save(update_fields=['is_read', 'read_at'])
+            self.save(update_fields=['is_read', 'read_at', 'updated_at'])
 
     def archive(self):
         """
@@ -136,7 +136,7 @@ class Notification(models.Model):
         if not self.is_archived:
             self.is_archived = True
             self.archived_at = timezone.now()
-            self.save(update_fields=['is_archived', 'archived_at'])
+            self.save(update_fields=['is_archived', 'archived_at', 'updated_at'])
 
     def unarchive(self):
         """
@@ -145,7 +145,7 @@ class Notification(models.Model):
         if self.is_archived:
             self.is_archived = False
             self.archived_at = None
-            self.save(update_fields=['is_archived', 'archived_at'])
+            self.save(update_fields=['is_archived', 'archived_at', 'updated_at'])
 
     def is_expired(self):
         """
@@ -0,0 +1,31 @@
+"""
+Notification system serializers for AgriLink API.
+"""
+from rest_framework import serializers
+from core.utils import format_date
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for user notifications.
+    """
+    sender_name = serializers.CharField(source='sender.full_name', read_only=True, default=None)
+    formatted_date = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = [
+            'id', 'sender', 'sender_name', 'title', 'message',
+            'action_text', 'action_url', 'notification_type', 'priority',
+            'related_object_type', 'related_object_id',
+            'is_read', 'read_at', 'is_archived', 'metadata', 'image_url',
+            'formatted_date', 'expires_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_formatted_date(self, obj):
+        """
+        Get formatted notification date.
+        """
+        return format_date(obj.created_at, '%B %d, %Y at %I:%M %p')
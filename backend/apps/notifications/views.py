@@ -0,0 +1,73 @@
+"""
+Notification system views for AgriLink API.
+"""
+from rest_framework import status, permissions, generics
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+
+from core.permissions import IsActiveUser
+from core.pagination import StandardResultsSetPagination
+from core.conditional import ConditionalListMixin
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+class NotificationListView(ConditionalListMixin, generics.ListAPIView):
+    """
+    List notifications for the current user.
+    """
+    serializer_class = NotificationSerializer
+    pagination_class = StandardResultsSetPagination
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['notification_type', 'priority', 'is_read', 'is_archived']
+
+    def get_queryset(self):
+        """
+        Get the current user's notifications.
+        """
+        return Notification.objects.filter(
+            recipient=self.request.user
+        ).select_related('sender').order_by('-created_at')
+
+
+class MarkNotificationReadView(APIView):
+    """
+    Mark a single notification as read.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def post(self, request, notification_id):
+        notification = get_object_or_404(Notification, id=notification_id, recipient=request.user)
+        notification.mark_as_read()
+
+        return Response({
+            'success': True,
+            'data': NotificationSerializer(notification).data,
+            'message': 'Notification marked as read',
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_200_OK)
+
+
+class MarkAllNotificationsReadView(APIView):
+    """
+    Mark all of the current user's notifications as read.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def post(self, request):
+        now = timezone.now()
+        updated = Notification.objects.filter(
+            recipient=request.user,
+            is_read=False
+        ).update(is_read=True, read_at=now, updated_at=now)
+
+        return Response({
+            'success': True,
+            'data': {'updated_count': updated},
+            'message': 'All notifications marked as read',
+            'timestamp': now.isoformat(),
+        }, status=status.HTTP_200_OK)
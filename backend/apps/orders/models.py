@@ -7,12 +7,13 @@ from django.contrib.gis.geos import Point
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from core.models import VersionedModel
 from core.utils import generate_order_number, create_point_from_coordinates
 
 User = get_user_model()
 
 
-class Order(models.Model):
+class Order(VersionedModel):
     """
     Order model for transactions between buyers and farmers.
     """
@@ -112,6 +113,9 @@ class Order(models.Model):
     shipped_at = models.DateTimeField(blank=True, null=True)
     delivered_at = models.DateTimeField(blank=True, null=True)
     cancelled_at = models.DateTimeField(blank=True, null=True)
+    price_recorded_at = models.DateTimeField(
+        blank=True, null=True, help_text="When the price was added to the price suggestion sketches"
+    )
 
     class Meta:
         db_table = 'orders'
@@ -1,6 +1,7 @@
 """
 Order signals for AgriLink API.
 """
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
@@ -13,6 +14,10 @@ def order_post_save(sender, instance, created, **kwargs):
     Handle order creation and updates.
     """
     if created:
+        if instance.listing_id:
+            from apps.marketplace.trending import record_listing_event
+            transaction.on_commit(lambda: record_listing_event(instance.listing, 'order'))
+
         # Log order creation
         from apps.dashboard.models import UserActivity
         UserActivity.objects.create(
@@ -39,6 +44,16 @@ def order_post_save(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=Order)
+def order_confirmed_price(sender, instance, created, **kwargs):
+    """
+    Feed confirmed order prices into the price suggestion sketches.
+    """
+    if instance.status == Order.Status.CONFIRMED and instance.confirmed_at and not instance.price_recorded_at:
+        from apps.marketplace.price_suggestions import record_order_price
+        transaction.on_commit(lambda: record_order_price(instance))
+
+
 @receiver(post_save, sender=OrderReview)
 def order_review_post_save(sender, instance, created, **kwargs):
     """
@@ -14,6 +14,7 @@ from django.db.models import Q, Sum, Avg, Count
 
 from core.permissions import IsBuyer, IsFarmer, IsParticipantOrReadOnly, IsActiveUser
 from core.pagination import StandardResultsSetPagination
+from core.conditional import ConditionalListMixin, ConditionalRetrieveMixin
 from core.exceptions import ValidationException, NotFoundException, AuthorizationException
 from .models import Order, OrderItem, OrderTracking, OrderReview, Payment
 from .serializers import (
@@ -155,7 +156,7 @@ class OrderListCreateView(generics.ListCreateAPIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class OrderDetailView(generics.RetrieveAPIView):
+class OrderDetailView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
     """
     Retrieve order details.
     """
@@ -181,6 +182,17 @@ class OrderDetailView(generics.RetrieveAPIView):
         else:
             return queryset.none()
 
+    def get_conditional_related(self, order):
+        """
+        Child rows in the response that are written without saving the order.
+        """
+        return [
+            order.items.all(),
+            order.tracking_updates.all(),
+            order.payments.all(),
+            OrderReview.objects.filter(order=order),
+        ]
+
 
 class OrderStatusUpdateView(generics.UpdateAPIView):
     """
@@ -419,7 +431,7 @@ class OrderPaymentView(generics.CreateAPIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class OrderListView(generics.ListAPIView):
+class OrderListView(ConditionalListMixin, generics.ListAPIView):
     """
     List orders with advanced filtering (for both buyers and sellers).
     """
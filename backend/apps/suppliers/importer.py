@@ -0,0 +1,433 @@
+"""
+Streaming bulk catalog import for AgriLink suppliers.
+
+Uploads are read one record at a time (CSV, JSON Lines or a JSON array),
+validated against in-memory parsers and a category name map, and
+upserted in chunks with ``INSERT ... ON CONFLICT (supplier_id, sku) DO
+UPDATE``. Invalid rows are reported with their row number and skipped;
+they never abort the rest of the import. Stock given for a product goes
+through the stock ledger as an opening balance or a stock count.
+"""
+import csv
+import io
+import json
+from collections import defaultdict, namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+import logging
+
+from core.cache import bump_generation
+from .models import StockMovement, SupplierCategory, SupplierProduct
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+LIST_SEPARATOR = '|'
+FORMATS = ('csv', 'json', 'jsonl')
+
+REQUIRED_FIELDS = ['sku', 'name', 'unit_price']
+
+Existing = namedtuple('Existing', [
+    'id', 'version', 'stock_quantity', 'stock_version', 'reorder_level', 'reorder_alerted_at',
+])
+
+
+def _text(max_length=None):
+    def parse(value):
+        value = str(value).strip()
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(f"Must be at most {max_length} characters")
+        return value
+    return parse
+
+
+def _decimal(min_value=None, max_value=None):
+    def parse(value):
+        try:
+            value = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError("Must be a number")
+        if not value.is_finite():
+            raise ValueError("Must be a number")
+        if min_value is not None and value < min_value:
+            raise ValueError(f"Must be at least {min_value}")
+        if max_value is not None and value > max_value:
+            raise ValueError(f"Must be at most {max_value}")
+        return value.quantize(Decimal('0.01'))
+    return parse
+
+
+def _integer(min_value=None):
+    def parse(value):
+        try:
+            number = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError("Must be a whole number")
+        if not number.is_finite() or number != number.to_integral_value():
+            raise ValueError("Must be a whole number")
+        if min_value is not None and number < min_value:
+            raise ValueError(f"Must be at least {min_value}")
+        return int(number)
+    return parse
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in ('1', 'true', 'yes', 'y'):
+        return True
+    if normalized in ('0', 'false', 'no', 'n'):
+        return False
+    raise ValueError("Must be true or false")
+
+
+def _string_list(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            value = json.loads(value)
+        else:
+            value = value.split(LIST_SEPARATOR)
+    if not isinstance(value, list):
+        raise ValueError(f"Must be a list or {LIST_SEPARATOR}-separated text")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _json_object(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, (dict, list)):
+        raise ValueError("Must be a JSON object")
+    return json.loads(json.dumps(value, default=str))
+
+
+def _choice(choices):
+    def parse(value):
+        value = str(value).strip().upper()
+        if value not in choices:
+            raise ValueError(f"Must be one of {', '.join(choices)}")
+        return value
+    return parse
+
+
+def _currency(value):
+    value = str(value).strip().upper()
+    if len(value) != 3 or not value.isalpha():
+        raise ValueError("Must be a three-letter currency code")
+    return value
+
+
+FIELD_PARSERS = {
+    'sku': _text(64),
+    'name': _text(200),
+    'description': _text(),
+    'product_type': _choice(SupplierProduct.ProductType.values),
+    'subcategory': _text(100),
+    'tags': _string_list,
+    'unit_price': _decimal(0, Decimal('9999999999.99')),
+    'currency': _currency,
+    'discount_percentage': _decimal(0, 100),
+    'bulk_pricing': _json_object,
+    'stock_quantity': _integer(0),
+    'min_order_quantity': _integer(1),
+    'max_order_quantity': _integer(1),
+    'reorder_level': _integer(0),
+    'is_unlimited': _boolean,
+    'brand': _text(100),
+    'model': _text(100),
+    'specifications': _json_object,
+    'features': _string_list,
+    'weight': _decimal(0, Decimal('99999999.99')),
+    'delivery_time_days': _integer(0),
+    'shipping_regions': _string_list,
+    'status': _choice(SupplierProduct.Status.values),
+}
+
+# Blank cells, and absent columns of new products, fall back to these instead of the model default
+BLANK_VALUES = {'max_order_quantity': None, 'weight': None, 'product_type': SupplierProduct.ProductType.PHYSICAL}
+
+
+class ImportReport:
+    """
+    Counts and per-row errors of one catalog import.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.ignored_columns = set()
+        self.file_error = None
+
+    def add_error(self, row_number, sku, messages):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'sku': sku, 'errors': messages})
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'ignored_columns': sorted(self.ignored_columns),
+            'file_error': self.file_error,
+        }
+
+
+def detect_format(filename, content_type=''):
+    """
+    Guess the upload format from its file name or content type.
+    """
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')) or 'ndjson' in content_type:
+        return 'jsonl'
+    if name.endswith('.json') or content_type == 'application/json':
+        return 'json'
+    return 'csv'
+
+
+def iter_records(stream, file_format):
+    """
+    Yield raw records from a binary stream without loading it whole.
+
+    Lines that cannot be decoded are yielded as ``ValueError`` instances
+    so they surface as row errors.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    elif file_format == 'jsonl':
+        for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+    elif ijson is not None:
+        yield from ijson.items(stream, 'item')
+    else:
+        # Without ijson a JSON array has to be parsed in one go
+        records = json.load(io.TextIOWrapper(stream, encoding='utf-8-sig'))
+        if isinstance(records, dict):
+            records = records.get('products', [])
+        yield from records
+
+
+def _read_records(stream, file_format, report):
+    """
+    Yield records until the file stops being readable, noting why in
+    ``report`` instead of failing the rows already imported.
+    """
+    read_errors = (ValueError, csv.Error) + ((ijson.JSONError,) if ijson is not None else ())
+    try:
+        yield from iter_records(stream, file_format)
+    except UnicodeDecodeError as e:
+        report.file_error = f"Stopped after row {report.total}: the file is not UTF-8 encoded ({e.reason})"
+    except read_errors as e:
+        report.file_error = f"Stopped after row {report.total}: the file could not be parsed ({e})"
+
+
+def validate_record(record, categories, report):
+    """
+    Parse one raw record into model field values.
+
+    Returns ``(values, errors)``; blank cells take their default value.
+    """
+    if isinstance(record, Exception):
+        return None, {'record': str(record)}
+    if not isinstance(record, dict):
+        return None, {'record': 'Must be an object'}
+
+    values, errors = {}, {}
+    for key, raw in record.items():
+        if key is None:
+            errors['record'] = 'Row has more cells than the header'
+            continue
+        key = key.strip().lower()
+        blank = raw is None or (isinstance(raw, str) and not raw.strip())
+
+        if key == 'category':
+            if blank:
+                values['category_id'] = None
+            else:
+                category_id = categories.get(str(raw).strip().lower())
+                if category_id is None:
+                    errors[key] = f"Unknown category '{raw}'"
+                else:
+                    values['category_id'] = category_id
+        elif key in FIELD_PARSERS:
+            if blank:
+                if key in REQUIRED_FIELDS:
+                    errors[key] = 'This field is required'
+                elif key in BLANK_VALUES:
+                    values[key] = BLANK_VALUES[key]
+                else:
+                    values[key] = SupplierProduct._meta.get_field(key).get_default()
+                continue
+            try:
+                values[key] = FIELD_PARSERS[key](raw)
+            except (ValueError, TypeError) as e:
+                errors[key] = str(e)
+        else:
+            report.ignored_columns.add(key)
+
+    for field in REQUIRED_FIELDS:
+        if field not in record and field not in errors:
+            errors[field] = 'This field is required'
+
+    max_quantity = values.get('max_order_quantity')
+    if max_quantity is not None and max_quantity < values.get('min_order_quantity', 1):
+        errors['max_order_quantity'] = 'Cannot be below the minimum order quantity'
+
+    return values, errors
+
+
+def _upsert_chunk(supplier, rows, report):
+    skus = [values['sku'] for _, values in rows]
+
+    with transaction.atomic():
+        existing = {
+            row[0]: Existing(*row[1:])
+            for row in SupplierProduct.objects.select_for_update().filter(
+                supplier=supplier, sku__in=skus
+            ).values_list(
+                'sku', 'id', 'version', 'stock_quantity', 'stock_version',
+                'reorder_level', 'reorder_alerted_at',
+            )
+        }
+
+        # Rows are upserted per column set so absent columns keep their values
+        groups = defaultdict(list)
+        for row_number, values in rows:
+            groups[frozenset(values)].append(values)
+
+        movements = []
+        for columns, group in groups.items():
+            products = []
+            for values in group:
+                current = existing.get(values['sku'])
+                if current is None:
+                    product = SupplierProduct(supplier=supplier, **{**BLANK_VALUES, **values})
+                else:
+                    product = SupplierProduct(supplier=supplier, **values)
+                stock = values.get('stock_quantity')
+
+                if current is None:
+                    if stock and not product.is_unlimited:
+                        movements.append(StockMovement(
+                            product_id=product.id,
+                            movement_type=StockMovement.MovementType.RESTOCK,
+                            quantity_change=stock,
+                            balance_after=stock,
+                            stock_version=0,
+                            note="Opening stock from catalog import",
+                            created_by=supplier,
+                        ))
+                else:
+                    product.id = current.id
+                    product.version = current.version + 1
+                    product.stock_version = current.stock_version
+                    product.reorder_alerted_at = current.reorder_alerted_at
+                    if stock is not None and stock != current.stock_quantity:
+                        product.stock_version += 1
+                        reorder_level = values.get('reorder_level', current.reorder_level)
+                        if stock > reorder_level:
+                            product.reorder_alerted_at = None
+                        movements.append(StockMovement(
+                            product_id=current.id,
+                            movement_type=StockMovement.MovementType.STOCK_COUNT,
+                            quantity_change=stock - current.stock_quantity,
+                            balance_after=stock,
+                            stock_version=product.stock_version,
+                            note="Stock count from catalog import",
+                            created_by=supplier,
+                        ))
+                products.append(product)
+
+            update_fields = [
+                'category' if column == 'category_id' else column
+                for column in columns if column != 'sku'
+            ] + ['version', 'updated_at']
+            if 'stock_quantity' in columns:
+                update_fields += ['stock_version', 'reorder_alerted_at']
+
+            SupplierProduct.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=['supplier', 'sku'],
+                update_fields=update_fields,
+            )
+
+        StockMovement.objects.bulk_create(movements, batch_size=CHUNK_SIZE)
+
+    updated = sum(1 for sku in skus if sku in existing)
+    report.updated += updated
+    report.created += len(skus) - updated
+
+
+def import_catalog(supplier, stream, file_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Import a catalog file for ``supplier`` and return an ``ImportReport``.
+    """
+    report = ImportReport()
+    categories = {
+        name.lower(): pk
+        for pk, name in SupplierCategory.objects.filter(is_active=True).values_list('pk', 'name')
+    }
+    seen = {}
+    chunk = []
+
+    def flush():
+        try:
+            _upsert_chunk(supplier, chunk, report)
+        except DatabaseError as e:
+            logger.error(f"Catalog import chunk failed for supplier {supplier.pk}: {e}")
+            for row_number, values in chunk:
+                report.add_error(row_number, values['sku'], {'record': 'Could not be saved'})
+
+    for row_number, record in enumerate(_read_records(stream, file_format, report), start=1):
+        report.total += 1
+        values, errors = validate_record(record, categories, report)
+        sku = values.get('sku') if values else None
+
+        if not errors:
+            if sku in seen:
+                errors = {'sku': f"Duplicate of row {seen[sku]}"}
+            else:
+                seen[sku] = row_number
+        if errors:
+            report.add_error(row_number, sku, errors)
+            continue
+
+        chunk.append((row_number, values))
+        if len(chunk) >= chunk_size:
+            flush()
+            chunk = []
+
+    if chunk:
+        flush()
+
+    if report.created or report.updated:
+        # Bulk upserts skip post_save, so invalidate cached catalog pages here
+        bump_generation(SupplierProduct)
+    if report.file_error:
+        logger.warning(f"Catalog import for supplier {supplier.pk} stopped early: {report.file_error}")
+    logger.info(
+        f"Imported catalog for supplier {supplier.pk}: {report.created} created, "
+        f"{report.updated} updated, {report.failed} failed"
+    )
+    return report
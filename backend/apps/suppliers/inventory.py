@@ -0,0 +1,181 @@
+"""
+Supplier stock ledger for AgriLink.
+
+Every stock change is a ``StockMovement`` row written in the same
+transaction as an atomic ``F()`` update of the product's on-hand
+quantity, so concurrent sales never lose updates. Callers acting on a
+quantity they read earlier (stock counts, manual edits) pass the
+``stock_version`` they saw and get a conflict if it has moved since.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+import logging
+
+from core.cache import bump_generation
+from core.exceptions import ConflictException, NotFoundException, ValidationException
+from .models import StockMovement, SupplierProduct
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PRODUCT_LIMIT = 10
+
+REORDER_CONDITION = Q(
+    status=SupplierProduct.Status.ACTIVE,
+    is_unlimited=False,
+    reorder_alerted_at__isnull=True,
+    stock_quantity__lte=F('reorder_level'),
+)
+
+
+def _stock_state(product_id):
+    return SupplierProduct.objects.filter(pk=product_id).values_list(
+        'stock_quantity', 'stock_version'
+    ).first()
+
+
+def record_movement(product_id, quantity_change, movement_type, reference='', note='',
+                    user=None, expected_version=None, allow_negative=False):
+    """
+    Apply a stock change and append it to the ledger.
+
+    Decrements that would take stock below zero are rejected unless
+    ``allow_negative`` is set.
+    """
+    with transaction.atomic():
+        rows = SupplierProduct.objects.filter(pk=product_id)
+        if expected_version is not None:
+            rows = rows.filter(stock_version=expected_version)
+        if quantity_change < 0 and not allow_negative:
+            rows = rows.filter(stock_quantity__gte=-quantity_change)
+
+        updated = rows.update(
+            stock_quantity=F('stock_quantity') + quantity_change,
+            stock_version=F('stock_version') + 1,
+            # Climbing back above the reorder level re-arms the reorder alert
+            reorder_alerted_at=Case(
+                When(stock_quantity__gt=F('reorder_level') - quantity_change, then=Value(None)),
+                default=F('reorder_alerted_at'),
+            ),
+        )
+
+        state = _stock_state(product_id)
+        if state is None:
+            raise NotFoundException("Product not found")
+        if not updated:
+            if expected_version is not None and state[1] != expected_version:
+                raise ConflictException("Stock changed since it was read. Reload and try again.")
+            raise ValidationException(
+                "Insufficient stock",
+                details={'available': state[0], 'requested': -quantity_change},
+            )
+
+        previous = state[0] - quantity_change
+        if (previous > 0) != (state[0] > 0):
+            # Availability changed, so cached catalog pages are stale
+            transaction.on_commit(lambda: bump_generation(SupplierProduct))
+
+        return StockMovement.objects.create(
+            product_id=product_id,
+            movement_type=movement_type,
+            quantity_change=quantity_change,
+            balance_after=state[0],
+            stock_version=state[1],
+            reference=reference,
+            note=note,
+            created_by=user,
+        )
+
+
+def set_stock_level(product_id, counted_quantity, expected_version=None, user=None, note=''):
+    """
+    Record a stock count, moving on-hand stock to ``counted_quantity``.
+    """
+    state = _stock_state(product_id)
+    if state is None:
+        raise NotFoundException("Product not found")
+    if expected_version is None:
+        expected_version = state[1]
+
+    return record_movement(
+        product_id,
+        counted_quantity - state[0],
+        StockMovement.MovementType.STOCK_COUNT,
+        note=note,
+        user=user,
+        expected_version=expected_version,
+        allow_negative=True,
+    )
+
+
+def _digest_notification(supplier_id, products, now):
+    from apps.notifications.models import Notification
+
+    names = ', '.join(
+        f"{name} ({stock} left)" for _, name, stock, _ in products[:DIGEST_PRODUCT_LIMIT]
+    )
+    more = len(products) - DIGEST_PRODUCT_LIMIT
+    if more > 0:
+        names += f" and {more} more"
+
+    return Notification(
+        recipient_id=supplier_id,
+        title=f"{len(products)} products need restocking",
+        message=f"These products are at or below their reorder level: {names}.",
+        notification_type=Notification.Type.SYSTEM,
+        priority=Notification.Priority.HIGH,
+        action_url="/suppliers/products/?stock=low",
+        metadata={
+            'products': [
+                {'id': str(product_id), 'name': name, 'stock_quantity': stock, 'reorder_level': level}
+                for product_id, name, stock, level in products
+            ],
+            'generated_at': now.isoformat(),
+        },
+    )
+
+
+def send_reorder_digests(supplier_batch_size=200):
+    """
+    Send each supplier one digest of their products that need reordering.
+
+    Products are marked as alerted in the same transaction, and stay
+    quiet until a restock takes them back above their reorder level.
+    """
+    from apps.notifications.models import Notification
+
+    now = timezone.now()
+    supplier_ids = list(
+        SupplierProduct.objects.filter(REORDER_CONDITION).order_by('supplier_id')
+        .values_list('supplier_id', flat=True).distinct()
+    )
+    notified = 0
+
+    for start in range(0, len(supplier_ids), supplier_batch_size):
+        with transaction.atomic():
+            claimed = list(
+                SupplierProduct.objects.select_for_update(skip_locked=True).filter(
+                    REORDER_CONDITION, supplier_id__in=supplier_ids[start:start + supplier_batch_size]
+                ).order_by('supplier_id', 'stock_quantity').values_list(
+                    'pk', 'supplier_id', 'name', 'stock_quantity', 'reorder_level'
+                )
+            )
+            if not claimed:
+                continue
+
+            by_supplier = defaultdict(list)
+            for product_id, supplier_id, name, stock, level in claimed:
+                by_supplier[supplier_id].append((product_id, name, stock, level))
+
+            Notification.objects.bulk_create(
+                [_digest_notification(supplier_id, products, now) for supplier_id, products in by_supplier.items()],
+                batch_size=500,
+            )
+            SupplierProduct.objects.filter(pk__in=[row[0] for row in claimed]).update(reorder_alerted_at=now)
+            notified += len(by_supplier)
+
+    if notified:
+        logger.info(f"Sent reorder digests to {notified} suppliers")
+    return notified
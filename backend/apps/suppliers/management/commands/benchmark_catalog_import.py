@@ -0,0 +1,84 @@
+"""
+Benchmark the streaming catalog import.
+"""
+import csv
+import io
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.suppliers.importer import import_catalog
+from apps.suppliers.models import SupplierCategory
+
+User = get_user_model()
+
+COLUMNS = [
+    'sku', 'name', 'description', 'category', 'brand', 'unit_price', 'currency',
+    'stock_quantity', 'reorder_level', 'min_order_quantity', 'tags', 'shipping_regions',
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate a catalog file, then time importing it and re-importing it as updates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--invalid-ratio', type=float, default=0.01)
+        parser.add_argument('--keep', action='store_true', help='Keep the imported rows')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:8]
+            supplier = User.objects.create(
+                email=f'bench-supplier-{tag}@example.com',
+                username=f'bench-supplier-{tag}',
+                first_name='Bench',
+                last_name='Supplier',
+                role=User.Role.SUPPLIER,
+            )
+            categories = [
+                SupplierCategory.objects.get_or_create(name=f'Bench category {index}')[0].name
+                for index in range(20)
+            ]
+
+            payload = self.build_csv(options['rows'], categories, options['invalid_ratio'])
+            for label in ('insert', 'update'):
+                started = time.perf_counter()
+                report = import_catalog(supplier, io.BytesIO(payload), 'csv')
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label}: {report.total} rows in {elapsed:.1f}s '
+                    f'({report.total / elapsed * 60:,.0f} rows/min), {report.created} created, '
+                    f'{report.updated} updated, {report.failed} failed'
+                )
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def build_csv(self, rows, categories, invalid_ratio):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(COLUMNS)
+        for index in range(rows):
+            price = f'{random.uniform(1, 500):.2f}'
+            if random.random() < invalid_ratio:
+                price = 'n/a'
+            writer.writerow([
+                f'SKU-{index:07d}',
+                f'Bench product {index}',
+                'Benchmark product',
+                random.choice(categories),
+                random.choice(['Acme', 'Shamba', 'AgroMax', '']),
+                price,
+                'USD',
+                random.randint(0, 1000),
+                random.randint(0, 50),
+                1,
+                'seed|organic',
+                'Nairobi|Mombasa',
+            ])
+        return output.getvalue().encode()
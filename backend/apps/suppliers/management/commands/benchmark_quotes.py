@@ -0,0 +1,142 @@
+"""
+Benchmark the bulk-pricing quote engine.
+"""
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.suppliers.models import SupplierProduct
+from apps.suppliers.pricing import QuoteEngine, parse_tiers
+
+User = get_user_model()
+
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = 'Seed tiered supplier products, then time quoting large baskets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suppliers', type=int, default=50)
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--lines', type=int, default=1000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            products = self.seed(options['suppliers'], options['products'])
+            self.run_benchmark(products, options['lines'], options['runs'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def seed(self, supplier_count, product_count):
+        started = time.perf_counter()
+        tag = uuid.uuid4().hex[:8]
+
+        suppliers = User.objects.bulk_create([
+            User(
+                email=f'bench-supplier-{tag}-{index}@example.com',
+                username=f'bench-supplier-{tag}-{index}',
+                first_name='Bench',
+                last_name=f'Supplier {index}',
+                role=User.Role.SUPPLIER,
+                password='!',
+            )
+            for index in range(supplier_count)
+        ], batch_size=1000)
+
+        products = []
+        for index in range(product_count):
+            unit_price = Decimal(random.randint(100, 50000)) / 100
+            breaks = sorted(random.sample(range(5, 500), random.randint(0, 4)))
+            tiers = [
+                {'min_quantity': quantity, 'unit_price': str((unit_price * Decimal(1 - 0.05 * (step + 1))).quantize(CENT))}
+                for step, quantity in enumerate(breaks)
+            ]
+            products.append(SupplierProduct(
+                supplier=random.choice(suppliers),
+                name=f'Bench product {index}',
+                description='Benchmark product',
+                product_type=SupplierProduct.ProductType.PHYSICAL,
+                unit_price=unit_price,
+                discount_percentage=random.choice([0, 0, 5, 10]),
+                bulk_pricing={'tiers': tiers},
+                stock_quantity=random.randint(0, 5000),
+                min_order_quantity=random.choice([1, 1, 5]),
+                max_order_quantity=random.choice([None, 2000]),
+            ))
+        SupplierProduct.objects.bulk_create(products, batch_size=2000)
+
+        self.stdout.write(
+            f'Seeded {product_count} products for {supplier_count} suppliers '
+            f'in {time.perf_counter() - started:.1f}s'
+        )
+        return products
+
+    def naive_quote(self, lines):
+        """
+        Reference implementation pricing one line at a time from the JSON.
+        """
+        products = SupplierProduct.objects.in_bulk([line['product_id'] for line in lines])
+        totals = {}
+        for line in lines:
+            totals[line['product_id']] = totals.get(line['product_id'], 0) + line['quantity']
+
+        subtotal = Decimal('0')
+        for line in lines:
+            product = products[line['product_id']]
+            quantity = totals[line['product_id']]
+            if quantity < product.min_order_quantity or (
+                product.max_order_quantity is not None and quantity > product.max_order_quantity
+            ):
+                continue
+            price = product.unit_price
+            for min_quantity, tier_price in parse_tiers(product.bulk_pricing, product.unit_price):
+                if quantity >= min_quantity:
+                    price = tier_price
+            unit = (price * (1 - product.discount_percentage / 100)).quantize(CENT, ROUND_HALF_UP)
+            subtotal += (unit * line['quantity']).quantize(CENT, ROUND_HALF_UP)
+        return subtotal
+
+    def run_benchmark(self, products, line_count, runs):
+        baskets = [
+            [
+                {'product_id': product.pk, 'quantity': random.randint(1, 300)}
+                for product in random.choices(products, k=line_count)
+            ]
+            for _ in range(runs)
+        ]
+
+        engine = QuoteEngine()
+        for name, quote in [
+            ('new engine per basket', lambda basket: QuoteEngine().quote(basket)),
+            ('warm (compiled tiers)', engine.quote),
+            ('naive per-line loop', self.naive_quote),
+        ]:
+            if name.startswith('warm'):
+                for basket in baskets:
+                    engine.quote(basket)
+
+            timings = []
+            for basket in baskets:
+                started = time.perf_counter()
+                quote(basket)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(
+                f'{name}, {line_count} lines: median {statistics.median(timings):.1f}ms, '
+                f'min {min(timings):.1f}ms, max {max(timings):.1f}ms'
+            )
+
+        drift = max(
+            abs(Decimal(engine.quote(basket)['subtotal']) - self.naive_quote(basket))
+            for basket in baskets
+        )
+        self.stdout.write(f'Largest subtotal difference against the naive loop: {drift}')
@@ -0,0 +1,38 @@
+"""
+Import a supplier product catalog from a CSV or JSON file.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.suppliers.importer import CHUNK_SIZE, FORMATS, detect_format, import_catalog
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Create or update a supplier\'s products from a CSV, JSON or JSON Lines file, keyed by SKU.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('supplier', help='Email or id of the supplier')
+        parser.add_argument('path', help='Catalog file to import')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lookup = {'email': options['supplier']} if '@' in options['supplier'] else {'pk': options['supplier']}
+        supplier = User.objects.filter(role=User.Role.SUPPLIER, **lookup).first()
+        if supplier is None:
+            raise CommandError(f"Supplier {options['supplier']} not found")
+
+        file_format = options['format'] or detect_format(options['path'])
+        with open(options['path'], 'rb') as stream:
+            report = import_catalog(supplier, stream, file_format, chunk_size=options['chunk_size'])
+
+        for error in report.errors:
+            self.stderr.write(f"Row {error['row']} ({error['sku']}): {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.total} rows: {report.created} created, '
+            f'{report.updated} updated, {report.failed} failed'
+        ))
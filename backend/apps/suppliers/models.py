@@ -4,8 +4,10 @@ Supplier management models for AgriLink.
 import uuid
 from django.contrib.gis.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from core.models import VersionedModel
 
 User = get_user_model()
 
@@ -31,7 +33,7 @@ class SupplierCategory(models.Model):
         return self.name
 
 
-class SupplierProduct(models.Model):
+class SupplierProduct(VersionedModel):
     """
     Products offered by suppliers.
     """
@@ -55,6 +57,7 @@ class SupplierProduct(models.Model):
     )
 
     # Basic information
+    sku = models.CharField(max_length=64, blank=True, null=True, help_text="Supplier's stock keeping unit")
     name = models.CharField(max_length=200, db_index=True)
     description = models.TextField()
     product_type = models.CharField(max_length=20, choices=ProductType.choices)
@@ -80,7 +83,7 @@ class SupplierProduct(models.Model):
     )
     bulk_pricing = models.JSONField(
         default=dict,
-        help_text="Bulk pricing tiers"
+        help_text='Bulk pricing tiers, e.g. {"tiers": [{"min_quantity": 10, "unit_price": "9.50"}]}'
     )
 
     # Inventory
@@ -89,6 +92,8 @@ class SupplierProduct(models.Model):
     max_order_quantity = models.IntegerField(blank=True, null=True)
     reorder_level = models.IntegerField(default=0)
     is_unlimited = models.BooleanField(default=False)
+    stock_version = models.PositiveIntegerField(default=0, help_text="Bumped by every stock movement")
+    reorder_alerted_at = models.DateTimeField(blank=True, null=True)
 
     # Specifications
     brand = models.CharField(max_length=100, blank=True)
@@ -123,6 +128,11 @@ class SupplierProduct(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    unversioned_fields = (
+        'view_count', 'order_count', 'stock_quantity', 'stock_version',
+        'reorder_alerted_at', 'rating', 'review_count',
+    )
+
     class Meta:
         db_table = 'supplier_products'
         indexes = [
@@ -132,6 +142,28 @@ class SupplierProduct(models.Model):
             models.Index(fields=['unit_price']),
             models.Index(fields=['rating']),
             models.Index(fields=['is_featured']),
+            models.Index(fields=['brand']),
+            # Reorder job scan: tracked stock at or below its reorder level, not yet alerted
+            models.Index(
+                fields=['supplier'],
+                name='supplier_products_reorder_idx',
+                condition=models.Q(
+                    status='ACTIVE',
+                    is_unlimited=False,
+                    reorder_alerted_at__isnull=True,
+                    stock_quantity__lte=models.F('reorder_level'),
+                ),
+            ),
+            GinIndex(fields=['tags'], name='supplier_products_tags_gin', opclasses=['jsonb_path_ops']),
+            GinIndex(
+                fields=['shipping_regions'],
+                name='supplier_products_regions_gin',
+                opclasses=['jsonb_path_ops'],
+            ),
+        ]
+        constraints = [
+            # Conflict target of catalog imports; products without a SKU may repeat
+            models.UniqueConstraint(fields=['supplier', 'sku'], name='supplier_products_supplier_sku_uniq'),
         ]
         ordering = ['-created_at']
 
@@ -169,16 +201,61 @@ class SupplierProduct(models.Model):
         self.view_count += 1
         self.save(update_fields=['view_count'])
 
-    def update_stock(self, quantity_change):
+    def update_stock(self, quantity_change, movement_type=None, reference='', user=None):
         """
-        Update stock quantity.
+        Update stock quantity through the stock ledger.
         """
+        from .inventory import record_movement
+
         if not self.is_unlimited:
-            self.stock_quantity += quantity_change
-            if self.stock_quantity <= self.reorder_level and self.stock_quantity > 0:
-                # TODO: Send reorder notification
-                pass
-            self.save(update_fields=['stock_quantity'])
+            movement = record_movement(
+                self.pk,
+                quantity_change,
+                movement_type or StockMovement.MovementType.ADJUSTMENT,
+                reference=reference,
+                user=user,
+            )
+            self.stock_quantity = movement.balance_after
+            self.stock_version = movement.stock_version
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of supplier product stock changes.
+    """
+    class MovementType(models.TextChoices):
+        RESTOCK = 'RESTOCK', 'Restock'
+        SALE = 'SALE', 'Sale'
+        RETURN = 'RETURN', 'Customer Return'
+        ADJUSTMENT = 'ADJUSTMENT', 'Adjustment'
+        STOCK_COUNT = 'STOCK_COUNT', 'Stock Count'
+        DAMAGE = 'DAMAGE', 'Damaged or Lost'
+
+    product = models.ForeignKey(SupplierProduct, on_delete=models.CASCADE, related_name='stock_movements')
+    movement_type = models.CharField(max_length=20, choices=MovementType.choices)
+    quantity_change = models.IntegerField()
+    balance_after = models.IntegerField()
+    stock_version = models.PositiveIntegerField(help_text="Product stock version after this movement")
+    reference = models.CharField(max_length=100, blank=True, help_text="Order number or other source")
+    note = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'supplier_stock_movements'
+        indexes = [
+            models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['movement_type', 'created_at']),
+        ]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} {self.quantity_change:+d} for {self.product_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Stock movements are append-only")
+        super().save(*args, **kwargs)
 
 
 class SupplierService(models.Model):
@@ -0,0 +1,287 @@
+"""
+Bulk-pricing quote engine for AgriLink.
+
+Each product's ``bulk_pricing`` tiers are compiled once into sorted
+arrays of minimum quantities and unit prices, cached under the product's
+row version. A basket is then priced in one vectorized pass: tier lookup
+with ``searchsorted``, order limits and line totals all run over NumPy
+arrays instead of per-line Python. Money stays exact: unit prices are
+rounded half-up to the cent in ``Decimal``, once per product, and line
+and basket totals are summed in integer cents.
+
+Tiers are matched on the basket's total quantity of a product, and the
+product's ``discount_percentage`` applies on top of the tier price.
+Accepted tier formats::
+
+    {"tiers": [{"min_quantity": 10, "unit_price": "9.50"},
+               {"min_quantity": 50, "discount_percentage": 12}]}
+    {"10": "9.50", "50": "9.00"}
+"""
+import threading
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+import logging
+
+from .models import SupplierProduct
+
+logger = logging.getLogger(__name__)
+
+TIERS_KEY = 'supplier_quote_tiers:v2:{product_id}:{version}'
+TIERS_TIMEOUT = 24 * 60 * 60
+MAX_QUOTE_LINES = 1000
+LOCAL_CACHE_SIZE = 50000
+
+# Quantities are integers, so each product's breaks get their own key range
+KEY_STRIDE = 2 ** 40
+CENT = Decimal('0.01')
+
+ERROR_CODES = [
+    None,
+    'PRODUCT_NOT_FOUND',
+    'PRODUCT_UNAVAILABLE',
+    'UNSUPPORTED_CURRENCY',
+    'BELOW_MIN_ORDER',
+    'ABOVE_MAX_ORDER',
+]
+
+CompiledTiers = namedtuple('CompiledTiers', [
+    'supplier_id', 'currency', 'discount', 'min_quantity', 'max_quantity', 'breaks', 'prices',
+])
+
+
+def _to_decimal(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def parse_tiers(bulk_pricing, unit_price):
+    """
+    Turn a ``bulk_pricing`` value into ``(min_quantity, unit_price)`` pairs.
+    """
+    if isinstance(bulk_pricing, dict) and 'tiers' in bulk_pricing:
+        entries = bulk_pricing['tiers']
+    elif isinstance(bulk_pricing, dict):
+        entries = [{'min_quantity': key, 'unit_price': value} for key, value in bulk_pricing.items()]
+    else:
+        entries = bulk_pricing
+
+    tiers = {0: unit_price}
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        min_quantity = _to_decimal(entry.get('min_quantity', entry.get('min_qty')))
+        price = _to_decimal(entry.get('unit_price', entry.get('price')))
+        if price is None and entry.get('discount_percentage') is not None:
+            discount = _to_decimal(entry['discount_percentage'])
+            if discount is not None:
+                price = unit_price * (1 - discount / 100)
+        if min_quantity is None or price is None or price < 0:
+            continue
+        # Breaks past the stride would land in the next product's key range
+        tiers[min(max(int(min_quantity), 0), KEY_STRIDE - 1)] = price
+    return sorted(tiers.items())
+
+
+def compile_tiers(supplier_id, currency, unit_price, discount_percentage,
+                  min_order_quantity, max_order_quantity, bulk_pricing):
+    """
+    Compile one product's pricing into arrays ready for basket lookups.
+    """
+    tiers = parse_tiers(bulk_pricing, unit_price)
+    return CompiledTiers(
+        supplier_id=supplier_id,
+        currency=currency.upper(),
+        discount=Decimal(discount_percentage or 0),
+        min_quantity=min_order_quantity or 1,
+        max_quantity=max_order_quantity,
+        breaks=np.array([quantity for quantity, _ in tiers], dtype=np.int64),
+        prices=np.array([price for _, price in tiers], dtype=object),
+    )
+
+
+def _money(cents):
+    return str(Decimal(int(cents)).scaleb(-2))
+
+
+class QuoteEngine:
+    """
+    Prices baskets of supplier products from compiled tier tables.
+
+    Compiled tables are kept in process and in the shared cache, keyed
+    by product id and version, so any edit to a product recompiles it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compiled = {}
+
+    def compiled_tiers(self, versions):
+        """
+        Get compiled tiers for ``{product_id: version}``, compiling stale ones.
+        """
+        result, missing = {}, {}
+        with self._lock:
+            for product_id, version in versions.items():
+                entry = self._compiled.get(product_id)
+                if entry is not None and entry[0] == version:
+                    result[product_id] = entry[1]
+                else:
+                    missing[product_id] = version
+        if not missing:
+            return result
+
+        keys = {
+            TIERS_KEY.format(product_id=product_id, version=version): product_id
+            for product_id, version in missing.items()
+        }
+        for key, compiled in cache.get_many(list(keys)).items():
+            result[keys[key]] = compiled
+
+        stale = [product_id for product_id in missing if product_id not in result]
+        if stale:
+            fresh = {}
+            rows = SupplierProduct.objects.filter(pk__in=stale).values_list(
+                'id', 'version', 'supplier_id', 'currency', 'unit_price', 'discount_percentage',
+                'min_order_quantity', 'max_order_quantity', 'bulk_pricing',
+            )
+            for product_id, version, *fields in rows:
+                compiled = compile_tiers(*fields)
+                result[product_id] = compiled
+                missing[product_id] = version
+                fresh[TIERS_KEY.format(product_id=product_id, version=version)] = compiled
+            cache.set_many(fresh, timeout=TIERS_TIMEOUT)
+            logger.info(f"Compiled pricing tiers for {len(fresh)} products")
+
+        with self._lock:
+            if len(self._compiled) + len(missing) > LOCAL_CACHE_SIZE:
+                self._compiled.clear()
+            for product_id, version in missing.items():
+                if product_id in result:
+                    self._compiled[product_id] = (version, result[product_id])
+        return result
+
+    def quote(self, lines, currency='USD'):
+        """
+        Price a basket of ``{'product_id', 'quantity'}`` lines.
+        """
+        currency = currency.upper()
+        rates = getattr(settings, 'EXCHANGE_RATES', {'USD': 1.0})
+        target_rate = _to_decimal(rates[currency]) if currency in rates else None
+
+        product_ids = [line['product_id'] for line in lines]
+        quantities = np.array([line['quantity'] for line in lines], dtype=np.int64)
+        unique_ids = list(dict.fromkeys(product_ids))
+        positions = {product_id: index for index, product_id in enumerate(unique_ids)}
+        line_positions = np.array([positions[product_id] for product_id in product_ids], dtype=np.int64)
+        count = len(unique_ids)
+
+        live = {
+            row[0]: row[1:] for row in SupplierProduct.objects.filter(pk__in=unique_ids).values_list(
+                'id', 'version', 'status', 'is_approved', 'stock_quantity', 'is_unlimited'
+            )
+        }
+        compiled = self.compiled_tiers({product_id: row[0] for product_id, row in live.items()})
+
+        found = np.zeros(count, dtype=bool)
+        available = np.zeros(count, dtype=bool)
+        stock = np.zeros(count, dtype=np.float64)
+        discount = [Decimal(0)] * count
+        rate = [None] * count
+        min_quantity = np.zeros(count, dtype=np.int64)
+        max_quantity = np.full(count, np.iinfo(np.int64).max, dtype=np.int64)
+        supplier_positions = np.zeros(count, dtype=np.int64)
+        suppliers = {}
+        break_keys, break_prices = [], []
+
+        for index, product_id in enumerate(unique_ids):
+            tiers = compiled.get(product_id)
+            if tiers is None:
+                break_keys.append(np.array([index * KEY_STRIDE], dtype=np.int64))
+                break_prices.append(np.array([Decimal(0)], dtype=object))
+                continue
+            _, status, is_approved, stock_quantity, is_unlimited = live[product_id]
+            found[index] = True
+            available[index] = status == SupplierProduct.Status.ACTIVE and is_approved
+            stock[index] = np.inf if is_unlimited else stock_quantity
+            discount[index] = tiers.discount
+            if tiers.currency in rates:
+                rate[index] = _to_decimal(rates[tiers.currency])
+            min_quantity[index] = tiers.min_quantity
+            if tiers.max_quantity is not None:
+                max_quantity[index] = tiers.max_quantity
+            supplier_positions[index] = suppliers.setdefault(tiers.supplier_id, len(suppliers))
+            break_keys.append(tiers.breaks + index * KEY_STRIDE)
+            break_prices.append(tiers.prices)
+
+        keys = np.concatenate(break_keys)
+        prices = np.concatenate(break_prices)
+
+        # Tiers apply to the basket's total quantity of each product
+        totals = np.bincount(line_positions, weights=quantities, minlength=count).astype(np.int64)
+        lookup = np.arange(count) * KEY_STRIDE + np.minimum(totals, KEY_STRIDE - 1)
+        tier_index = np.searchsorted(keys, lookup, side='right') - 1
+        tier_min = keys[tier_index] - np.arange(count) * KEY_STRIDE
+
+        # One Decimal rounding per product keeps quotes equal to discounted_price
+        tier_prices = prices[tier_index]
+        unit_cents = np.zeros(count, dtype=np.int64)
+        convertible = np.zeros(count, dtype=bool)
+        for index in np.flatnonzero(found).tolist():
+            if rate[index] is None or target_rate is None:
+                continue
+            unit_price = tier_prices[index] * (1 - discount[index] / 100) * rate[index] / target_rate
+            unit_cents[index] = int(unit_price.quantize(CENT, ROUND_HALF_UP) / CENT)
+            convertible[index] = True
+
+        errors = np.select(
+            [~found, ~available, ~convertible, totals < min_quantity, totals > max_quantity],
+            [1, 2, 3, 4, 5],
+            default=0,
+        )
+        line_errors = errors[line_positions]
+        line_unit_cents = unit_cents[line_positions]
+        line_totals = np.where(line_errors == 0, line_unit_cents * quantities, 0)
+        supplier_totals = np.zeros(len(suppliers), dtype=np.int64)
+        # Lines of unknown products have no supplier position to add to
+        priced_lines = line_errors == 0
+        np.add.at(supplier_totals, supplier_positions[line_positions][priced_lines], line_totals[priced_lines])
+
+        in_stock = (stock >= totals)[line_positions].tolist()
+        tier_min_lines = tier_min[line_positions].tolist()
+        result_lines = []
+        for index, (product_id, quantity, error, line_unit, line_total) in enumerate(zip(
+            product_ids, quantities.tolist(), line_errors.tolist(),
+            line_unit_cents.tolist(), line_totals.tolist(),
+        )):
+            priced = error == 0
+            result_lines.append({
+                'product_id': product_id,
+                'quantity': quantity,
+                'unit_price': _money(line_unit) if priced else None,
+                'line_total': _money(line_total) if priced else None,
+                'tier_min_quantity': tier_min_lines[index] if priced else None,
+                'in_stock': in_stock[index] if priced else False,
+                'error': ERROR_CODES[error],
+            })
+
+        rejected = int(np.count_nonzero(line_errors))
+        return {
+            'currency': currency,
+            'lines': result_lines,
+            'suppliers': [
+                {'supplier_id': supplier_id, 'subtotal': _money(supplier_totals[position])}
+                for supplier_id, position in suppliers.items()
+            ],
+            'subtotal': _money(line_totals.sum()),
+            'priced_lines': len(lines) - rejected,
+            'rejected_lines': rejected,
+        }
+
+
+quote_engine = QuoteEngine()
@@ -0,0 +1,218 @@
+"""
+Faceted supplier catalog search for AgriLink.
+
+Every facet (category, brand, price bucket, rating band and shipping
+region) is counted in one grouped query using ``GROUPING SETS``. Each
+candidate row carries a flag per active facet filter, so the count for a
+facet applies every filter except its own and a sidebar can still offer
+the other values of a facet that is already selected.
+"""
+from django.db import connections
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from .models import SupplierCategory, SupplierProduct
+
+FACETS = ['category', 'brand', 'price', 'rating', 'region']
+FACET_LIMIT = 50
+
+# Upper edges of the price buckets; the last bucket is open-ended
+PRICE_EDGES = [10, 50, 100, 500, 1000, 5000]
+RATING_BANDS = [4, 3, 2, 1, 0]
+
+# GROUPING() bitmask of each grouping set, first argument highest
+GROUPING_MASKS = {15: 'category', 23: 'brand', 27: 'price', 29: 'rating', 30: 'region', 31: None}
+
+SORT_ORDERS = {
+    'newest': ['-created_at'],
+    'price_low': ['unit_price', '-created_at'],
+    'price_high': ['-unit_price', '-created_at'],
+    'rating': ['-rating', '-review_count'],
+    'popular': ['-order_count', '-view_count'],
+}
+
+FACET_SQL = """
+WITH matched AS ({matched_sql}),
+bucketed AS (
+    SELECT m.*,
+           width_bucket(m.unit_price, %s::numeric[]) AS price_bucket,
+           LEAST(FLOOR(m.rating), 4)::integer AS rating_band
+    FROM matched m
+)
+SELECT GROUPING(b.category_id, b.brand, b.price_bucket, b.rating_band, r.region) AS grouping_mask,
+       b.category_id, b.brand, b.price_bucket, b.rating_band, r.region,
+       {counts}
+FROM bucketed b
+LEFT JOIN LATERAL jsonb_array_elements_text(
+    CASE WHEN jsonb_typeof(b.shipping_regions) = 'array' THEN b.shipping_regions ELSE '[]'::jsonb END
+) AS r(region) ON TRUE
+GROUP BY GROUPING SETS (
+    (b.category_id), (b.brand), (b.price_bucket), (b.rating_band), (r.region), ()
+)
+"""
+
+
+def catalog_queryset(params):
+    """
+    Get the visible products matching the non-facet search parameters.
+    """
+    queryset = SupplierProduct.objects.filter(
+        status=SupplierProduct.Status.ACTIVE, is_approved=True
+    )
+
+    query = params.get('q')
+    if query:
+        queryset = queryset.filter(
+            Q(name__icontains=query)
+            | Q(brand__icontains=query)
+            | Q(description__icontains=query)
+            | Q(tags__contains=[query])
+        )
+    if params.get('product_type'):
+        queryset = queryset.filter(product_type=params['product_type'])
+    if params.get('tags'):
+        queryset = queryset.filter(tags__contains=params['tags'])
+    if params.get('supplier_id'):
+        queryset = queryset.filter(supplier_id=params['supplier_id'])
+    if params.get('in_stock'):
+        queryset = queryset.filter(Q(is_unlimited=True) | Q(stock_quantity__gt=0))
+    return queryset
+
+
+def facet_filters(params):
+    """
+    Build one condition per facet the client filtered on.
+    """
+    filters = {}
+    if params.get('category'):
+        filters['category'] = Q(category_id__in=params['category'])
+    if params.get('brand'):
+        filters['brand'] = Q(brand__in=params['brand'])
+
+    price = Q()
+    if params.get('price_min') is not None:
+        price &= Q(unit_price__gte=params['price_min'])
+    if params.get('price_max') is not None:
+        price &= Q(unit_price__lt=params['price_max'])
+    if price:
+        filters['price'] = price
+
+    if params.get('rating_min') is not None:
+        filters['rating'] = Q(rating__gte=params['rating_min'])
+
+    if params.get('region'):
+        region = Q()
+        for value in params['region']:
+            region |= Q(shipping_regions__contains=[value])
+        filters['region'] = region
+    return filters
+
+
+def _count_column(filters, exclude=None):
+    flags = [f'b.match_{name}' for name in filters if name != exclude]
+    if not flags:
+        return 'COUNT(DISTINCT b.id)'
+    return f"COUNT(DISTINCT b.id) FILTER (WHERE {' AND '.join(flags)})"
+
+
+def _price_bucket(bucket, count):
+    low = PRICE_EDGES[bucket - 1] if bucket > 0 else None
+    high = PRICE_EDGES[bucket] if bucket < len(PRICE_EDGES) else None
+    if low is None:
+        label = f"Under {high}"
+    elif high is None:
+        label = f"{low} and above"
+    else:
+        label = f"{low} - {high}"
+    return {'value': bucket, 'label': label, 'min': low, 'max': high, 'count': count}
+
+
+def _rating_bands(bands):
+    # Each product falls in one band; "N & up" is the sum of bands N to 4
+    counts = dict(bands)
+    entries, running = [], 0
+    for band in RATING_BANDS:
+        running += counts.get(band, 0)
+        if running:
+            entries.append({'value': band, 'label': f"{band} & up", 'min': band, 'count': running})
+    return entries
+
+
+def _by_count(entry):
+    return -entry[1], str(entry[0])
+
+
+def compute_facets(queryset, filters):
+    """
+    Count every facet value over ``queryset`` in one grouped query.
+    """
+    flags = {
+        f'match_{name}': ExpressionWrapper(condition, output_field=BooleanField())
+        for name, condition in filters.items()
+    }
+    matched = queryset.order_by().annotate(**flags).values(
+        'id', 'category_id', 'brand', 'unit_price', 'rating', 'shipping_regions', *flags
+    )
+    matched_sql, params = matched.query.sql_with_params()
+
+    counts = ',\n       '.join(
+        [f"{_count_column(filters, facet)} AS count_{facet}" for facet in FACETS]
+        + [f"{_count_column(filters)} AS count_total"]
+    )
+    sql = FACET_SQL.format(matched_sql=matched_sql, counts=counts)
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, [*params, PRICE_EDGES])
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    values = {facet: [] for facet in FACETS}
+    total = 0
+    for row in rows:
+        facet = GROUPING_MASKS.get(row['grouping_mask'])
+        if facet is None:
+            total = row['count_total'] or 0
+            continue
+        count = row[f'count_{facet}']
+        value = {
+            'category': row['category_id'],
+            'brand': row['brand'],
+            'price': row['price_bucket'],
+            'rating': row['rating_band'],
+            'region': row['region'],
+        }[facet]
+        if count and value not in (None, ''):
+            values[facet].append((value, count))
+
+    names = SupplierCategory.objects.using(queryset.db).in_bulk(
+        [value for value, _ in values['category']]
+    )
+    return {
+        'total': total,
+        'category': [
+            {'value': value, 'label': names[value].name if value in names else '', 'count': count}
+            for value, count in sorted(values['category'], key=_by_count)[:FACET_LIMIT]
+        ],
+        'brand': [
+            {'value': value, 'label': value, 'count': count}
+            for value, count in sorted(values['brand'], key=_by_count)[:FACET_LIMIT]
+        ],
+        'price': [_price_bucket(value, count) for value, count in sorted(values['price'])],
+        'rating': _rating_bands(values['rating']),
+        'region': [
+            {'value': value, 'label': value, 'count': count}
+            for value, count in sorted(values['region'], key=_by_count)[:FACET_LIMIT]
+        ],
+    }
+
+
+def search_catalog(params):
+    """
+    Get the ordered result queryset and facet counts for a catalog search.
+    """
+    queryset = catalog_queryset(params)
+    filters = facet_filters(params)
+    facets = compute_facets(queryset, filters)
+
+    results = queryset.filter(*filters.values()).select_related('category', 'supplier')
+    results = results.order_by(*SORT_ORDERS[params.get('sort_by', 'newest')])
+    return results, facets
@@ -0,0 +1,230 @@
+"""
+Supplier management serializers for AgriLink API.
+"""
+from rest_framework import serializers
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from .models import SupplierCategory, SupplierProduct, SupplierInquiry, StockMovement
+from .pricing import MAX_QUOTE_LINES
+from .search import SORT_ORDERS
+
+User = get_user_model()
+
+
+class SupplierCategorySerializer(serializers.ModelSerializer):
+    """
+    Serializer for supplier categories.
+    """
+    class Meta:
+        model = SupplierCategory
+        fields = ['id', 'name', 'description', 'icon', 'is_active']
+        read_only_fields = ['id']
+
+
+class SupplierSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the supplier directory.
+    """
+    full_name = serializers.ReadOnlyField()
+    company_name = serializers.CharField(source='supplier_profile.company_name', read_only=True)
+    product_categories = serializers.JSONField(source='supplier_profile.product_categories', read_only=True)
+    is_verified_supplier = serializers.BooleanField(source='supplier_profile.is_verified_supplier', read_only=True)
+    average_rating = serializers.DecimalField(
+        source='supplier_profile.average_rating', max_digits=3, decimal_places=2, read_only=True
+    )
+    total_reviews = serializers.IntegerField(source='supplier_profile.total_reviews', read_only=True)
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'full_name', 'company_name', 'product_categories',
+            'is_verified_supplier', 'average_rating', 'total_reviews',
+        ]
+
+
+class SupplierProductSerializer(serializers.ModelSerializer):
+    """
+    Serializer for supplier products.
+    """
+    supplier_name = serializers.CharField(source='supplier.full_name', read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True, default='')
+    discounted_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    is_available = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = SupplierProduct
+        fields = [
+            'id', 'supplier', 'supplier_name', 'sku', 'name', 'description', 'product_type',
+            'category', 'category_name', 'subcategory', 'tags',
+            'unit_price', 'currency', 'discount_percentage', 'discounted_price', 'bulk_pricing',
+            'stock_quantity', 'stock_version', 'min_order_quantity', 'max_order_quantity',
+            'reorder_level', 'is_unlimited',
+            'brand', 'model', 'specifications', 'features',
+            'images', 'video_url', 'datasheet_url',
+            'weight', 'dimensions', 'shipping_required', 'delivery_time_days', 'shipping_regions',
+            'status', 'is_featured', 'is_available',
+            'view_count', 'order_count', 'rating', 'review_count',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = [
+            'id', 'supplier', 'stock_version', 'is_featured', 'view_count', 'order_count',
+            'rating', 'review_count', 'created_at', 'updated_at',
+        ]
+
+    def get_fields(self):
+        """
+        Make stock read-only after creation; changes go through the stock ledger.
+        """
+        fields = super().get_fields()
+        if self.instance is not None:
+            fields['stock_quantity'].read_only = True
+        return fields
+
+    def validate_sku(self, value):
+        """
+        Validate that the SKU is unique within the supplier's catalog.
+        """
+        if not value:
+            return None
+        request = self.context.get('request')
+        supplier = self.instance.supplier if self.instance is not None else getattr(request, 'user', None)
+        duplicates = SupplierProduct.objects.filter(supplier=supplier, sku=value)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if supplier is not None and duplicates.exists():
+            raise serializers.ValidationError("You already have a product with this SKU")
+        return value
+
+    def validate(self, attrs):
+        """
+        Validate order quantity limits.
+        """
+        min_quantity = attrs.get('min_order_quantity', getattr(self.instance, 'min_order_quantity', 1))
+        max_quantity = attrs.get('max_order_quantity', getattr(self.instance, 'max_order_quantity', None))
+        if max_quantity is not None and max_quantity < min_quantity:
+            raise serializers.ValidationError("Maximum order quantity cannot be below the minimum")
+        return attrs
+
+
+class SupplierInquirySerializer(serializers.ModelSerializer):
+    """
+    Serializer for supplier inquiries.
+    """
+    supplier_name = serializers.CharField(source='supplier.full_name', read_only=True)
+    farmer_name = serializers.CharField(source='farmer.full_name', read_only=True)
+    product_name = serializers.CharField(source='related_product.name', read_only=True, default=None)
+
+    class Meta:
+        model = SupplierInquiry
+        fields = [
+            'id', 'supplier', 'supplier_name', 'farmer', 'farmer_name',
+            'inquiry_type', 'subject', 'message',
+            'related_product', 'product_name', 'related_service',
+            'preferred_contact_method', 'contact_phone', 'farm_location',
+            'status', 'response_message', 'quoted_price', 'estimated_delivery',
+            'priority', 'required_by_date',
+            'created_at', 'updated_at', 'responded_at', 'resolved_at',
+        ]
+        read_only_fields = [
+            'id', 'farmer', 'status', 'response_message', 'quoted_price', 'estimated_delivery',
+            'created_at', 'updated_at', 'responded_at', 'resolved_at',
+        ]
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    """
+    Serializer for stock ledger entries.
+    """
+    movement_type_display = serializers.CharField(source='get_movement_type_display', read_only=True)
+    created_by_name = serializers.CharField(source='created_by.full_name', read_only=True, default=None)
+
+    class Meta:
+        model = StockMovement
+        fields = [
+            'id', 'product', 'movement_type', 'movement_type_display', 'quantity_change',
+            'balance_after', 'stock_version', 'reference', 'note',
+            'created_by', 'created_by_name', 'created_at',
+        ]
+        read_only_fields = fields
+
+
+class StockChangeSerializer(serializers.Serializer):
+    """
+    Serializer for recording a stock movement or a stock count.
+    """
+    movement_type = serializers.ChoiceField(choices=StockMovement.MovementType.choices)
+    quantity_change = serializers.IntegerField(required=False)
+    counted_quantity = serializers.IntegerField(required=False, min_value=0)
+    expected_version = serializers.IntegerField(required=False, min_value=0)
+    reference = serializers.CharField(max_length=100, required=False, default='')
+    note = serializers.CharField(required=False, default='', allow_blank=True)
+
+    def validate(self, attrs):
+        """
+        Require a counted quantity for stock counts and a change otherwise.
+        """
+        if attrs['movement_type'] == StockMovement.MovementType.STOCK_COUNT:
+            if attrs.get('counted_quantity') is None:
+                raise serializers.ValidationError("Stock counts require counted_quantity")
+        elif not attrs.get('quantity_change'):
+            raise serializers.ValidationError("A non-zero quantity_change is required")
+        return attrs
+
+
+class CatalogSearchSerializer(serializers.Serializer):
+    """
+    Serializer for catalog search parameters.
+
+    Facet parameters (category, brand, region) may be repeated.
+    """
+    q = serializers.CharField(required=False, max_length=100)
+    category = serializers.ListField(child=serializers.IntegerField(), required=False)
+    brand = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    region = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
+    product_type = serializers.ChoiceField(choices=SupplierProduct.ProductType.choices, required=False)
+    supplier_id = serializers.UUIDField(required=False)
+    price_min = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+    price_max = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+    rating_min = serializers.DecimalField(max_digits=3, decimal_places=2, min_value=0, max_value=5, required=False)
+    in_stock = serializers.BooleanField(default=False)
+    sort_by = serializers.ChoiceField(choices=list(SORT_ORDERS), default='newest')
+
+    def validate(self, attrs):
+        """
+        Validate the price range.
+        """
+        price_min = attrs.get('price_min')
+        price_max = attrs.get('price_max')
+        if price_min is not None and price_max is not None and price_min > price_max:
+            raise serializers.ValidationError("Minimum price cannot be greater than maximum price")
+        return attrs
+
+
+class QuoteLineSerializer(serializers.Serializer):
+    """
+    Serializer for one line of a quote request.
+    """
+    product_id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, max_value=10 ** 9)
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    """
+    Serializer for quote requests.
+    """
+    currency = serializers.CharField(max_length=3, default='USD')
+    lines = serializers.ListField(
+        child=QuoteLineSerializer(),
+        min_length=1,
+        max_length=MAX_QUOTE_LINES,
+    )
+
+    def validate_currency(self, value):
+        """
+        Validate that the currency has an exchange rate.
+        """
+        value = value.upper()
+        if value not in getattr(settings, 'EXCHANGE_RATES', {'USD': 1.0}):
+            raise serializers.ValidationError(f"Quotes are not available in {value}")
+        return value
@@ -0,0 +1,44 @@
+"""
+Supplier management signals for AgriLink API.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from core.cache import register_cache_invalidation
+from .models import SupplierCategory, SupplierProduct, SupplierInquiry, StockMovement
+
+register_cache_invalidation(SupplierCategory, SupplierProduct)
+
+
+@receiver(post_save, sender=SupplierProduct)
+def supplier_product_post_save(sender, instance, created, **kwargs):
+    """
+    Open the stock ledger of a new product with its initial stock.
+    """
+    if created and not instance.is_unlimited and instance.stock_quantity:
+        StockMovement.objects.create(
+            product=instance,
+            movement_type=StockMovement.MovementType.RESTOCK,
+            quantity_change=instance.stock_quantity,
+            balance_after=instance.stock_quantity,
+            stock_version=instance.stock_version,
+            note="Opening stock",
+            created_by=instance.supplier,
+        )
+
+
+@receiver(post_save, sender=SupplierInquiry)
+def supplier_inquiry_post_save(sender, instance, created, **kwargs):
+    """
+    Notify the supplier of a new inquiry.
+    """
+    if created:
+        from apps.notifications.models import Notification
+        Notification.objects.create(
+            recipient=instance.supplier,
+            sender=instance.farmer,
+            title=f"New inquiry: {instance.subject}",
+            message=f"{instance.farmer.full_name} sent you an inquiry.",
+            notification_type=Notification.Type.INQUIRY_RESPONSE,
+            related_object_type=Notification.RelatedObjectType.INQUIRY,
+            related_object_id=instance.id,
+        )
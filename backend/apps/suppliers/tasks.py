@@ -0,0 +1,14 @@
+"""
+Supplier management background tasks for AgriLink.
+"""
+from celery import shared_task
+
+from .inventory import send_reorder_digests
+
+
+@shared_task
+def send_supplier_reorder_digests():
+    """
+    Send suppliers one digest of their products below reorder level.
+    """
+    return send_reorder_digests()
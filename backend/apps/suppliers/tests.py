@@ -0,0 +1,43 @@
+"""
+Tests for the suppliers app.
+"""
+import uuid
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.users.models import User
+
+
+class QuoteBasketTests(APITestCase):
+    """
+    Basket quotes through the quote endpoint.
+    """
+
+    def setUp(self):
+        self.buyer = User.objects.create_user(
+            username='quote-buyer',
+            email='quote-buyer@example.com',
+            password='test-password',
+            first_name='Quote',
+            last_name='Buyer',
+            role=User.Role.BUYER,
+        )
+        self.client.force_authenticate(self.buyer)
+
+    def test_unknown_products_are_reported_per_line(self):
+        product_ids = [str(uuid.uuid4()) for _ in range(3)]
+        response = self.client.post(
+            reverse('supplier_quote'),
+            {'lines': [{'product_id': product_id, 'quantity': 5} for product_id in product_ids]},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quote = response.data['data']
+        self.assertEqual([line['error'] for line in quote['lines']], ['PRODUCT_NOT_FOUND'] * 3)
+        self.assertTrue(all(line['unit_price'] is None for line in quote['lines']))
+        self.assertEqual(quote['suppliers'], [])
+        self.assertEqual(quote['subtotal'], '0.00')
+        self.assertEqual(quote['rejected_lines'], 3)
@@ -7,6 +7,10 @@ from .views import (
     SupplierProductDetailView,
     SupplierInquiryListView,
     SupplierListView,
+    catalog_search,
+    quote_basket,
+    product_stock,
+    import_products,
 )
 
 urlpatterns = [
@@ -14,8 +18,12 @@ urlpatterns = [
     path('', SupplierListView.as_view(), name='supplier_list'),
 
     # Products
+    path('catalog/search/', catalog_search, name='supplier_catalog_search'),
     path('products/', SupplierProductListCreateView.as_view(), name='supplier_products'),
+    path('products/import/', import_products, name='supplier_product_import'),
     path('products/<uuid:product_id>/', SupplierProductDetailView.as_view(), name='supplier_product_detail'),
+    path('products/<uuid:product_id>/stock/', product_stock, name='supplier_product_stock'),
+    path('quote/', quote_basket, name='supplier_quote'),
 
     # Inquiries
     path('inquiries/', SupplierInquiryListView.as_view(), name='supplier_inquiries'),
@@ -0,0 +1,343 @@
+"""
+Supplier management views for AgriLink API.
+"""
+from rest_framework import status, permissions, generics
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import SearchFilter, OrderingFilter
+
+from core.permissions import IsSupplier, IsFarmer, IsActiveUser
+from core.pagination import StandardResultsSetPagination
+from core.cache import cache_response
+from core.exceptions import AuthorizationException, ConflictException, NotFoundException, ValidationException
+
+from .importer import FORMATS, detect_format, import_catalog
+from .inventory import record_movement, set_stock_level
+from .models import SupplierCategory, SupplierProduct, SupplierInquiry, StockMovement
+from .pricing import quote_engine
+from .search import search_catalog
+from .serializers import (
+    SupplierSerializer,
+    SupplierProductSerializer,
+    SupplierInquirySerializer,
+    CatalogSearchSerializer,
+    QuoteRequestSerializer,
+    StockMovementSerializer,
+    StockChangeSerializer,
+)
+
+User = get_user_model()
+
+
+class SupplierListView(generics.ListAPIView):
+    """
+    List active suppliers.
+    """
+    permission_classes = [permissions.AllowAny]
+    serializer_class = SupplierSerializer
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [SearchFilter, OrderingFilter]
+    search_fields = ['first_name', 'last_name', 'supplier_profile__company_name']
+    ordering_fields = ['supplier_profile__average_rating', 'created_at']
+    ordering = ['-supplier_profile__average_rating']
+
+    def get_queryset(self):
+        return User.objects.filter(
+            role=User.Role.SUPPLIER, is_active=True, supplier_profile__isnull=False
+        ).select_related('supplier_profile')
+
+
+class SupplierProductListCreateView(generics.ListCreateAPIView):
+    """
+    List and create supplier products.
+    """
+    serializer_class = SupplierProductSerializer
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = ['category', 'product_type', 'status', 'brand']
+    search_fields = ['name', 'brand', 'description']
+    ordering_fields = ['created_at', 'unit_price', 'rating', 'order_count']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        """
+        Show suppliers their own catalog and everyone else the active one.
+        """
+        queryset = SupplierProduct.objects.select_related('supplier', 'category')
+
+        supplier_id = self.request.query_params.get('supplier_id')
+        if supplier_id:
+            queryset = queryset.filter(supplier_id=supplier_id)
+
+        user = self.request.user
+        visible = Q(status=SupplierProduct.Status.ACTIVE, is_approved=True)
+        if user.is_authenticated and user.role == User.Role.SUPPLIER:
+            visible |= Q(supplier=user)
+        return queryset.filter(visible)
+
+    def get_permissions(self):
+        """
+        Set permissions based on request method.
+        """
+        if self.request.method == 'POST':
+            return [permissions.IsAuthenticated(), IsSupplier(), IsActiveUser()]
+        return [permissions.AllowAny()]
+
+    def perform_create(self, serializer):
+        """
+        Create product with current user as supplier.
+        """
+        serializer.save(supplier=self.request.user)
+
+
+class SupplierProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    Retrieve, update, or delete a supplier product.
+    """
+    serializer_class = SupplierProductSerializer
+    lookup_field = 'id'
+    lookup_url_kwarg = 'product_id'
+
+    def get_queryset(self):
+        return SupplierProduct.objects.select_related('supplier', 'category')
+
+    def get_permissions(self):
+        """
+        Set permissions based on request method.
+        """
+        if self.request.method in ['PUT', 'PATCH', 'DELETE']:
+            return [permissions.IsAuthenticated(), IsSupplier(), IsActiveUser()]
+        return [permissions.AllowAny()]
+
+    def perform_update(self, serializer):
+        if serializer.instance.supplier != self.request.user:
+            raise AuthorizationException("You can only update your own products")
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        """
+        Soft delete product by discontinuing it.
+        """
+        if instance.supplier != self.request.user:
+            raise AuthorizationException("You can only delete your own products")
+        instance.status = SupplierProduct.Status.DISCONTINUED
+        instance.save(update_fields=['status', 'updated_at'])
+
+
+class SupplierInquiryListView(generics.ListCreateAPIView):
+    """
+    List inquiries sent or received by the current user, and send new ones.
+    """
+    serializer_class = SupplierInquirySerializer
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['status', 'inquiry_type', 'priority']
+    ordering_fields = ['created_at', 'priority']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        user = self.request.user
+        return SupplierInquiry.objects.filter(
+            Q(supplier=user) | Q(farmer=user)
+        ).select_related('supplier', 'farmer', 'related_product')
+
+    def get_permissions(self):
+        """
+        Set permissions based on request method.
+        """
+        if self.request.method == 'POST':
+            return [permissions.IsAuthenticated(), IsFarmer(), IsActiveUser()]
+        return [permissions.IsAuthenticated()]
+
+    def perform_create(self, serializer):
+        """
+        Create inquiry with current user as farmer.
+        """
+        serializer.save(farmer=self.request.user)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@cache_response(
+    'suppliers:catalog',
+    [SupplierProduct, SupplierCategory],
+    timeout=120,
+    anonymous_only=False,
+)
+def catalog_search(request):
+    """
+    Search the supplier catalog and return results with facet counts.
+    """
+    search_serializer = CatalogSearchSerializer(data=request.query_params)
+    if not search_serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid search parameters.',
+                'details': search_serializer.errors,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    search_params = search_serializer.validated_data
+    results, facets = search_catalog(search_params)
+
+    paginator = StandardResultsSetPagination()
+    result_page = paginator.paginate_queryset(results, request)
+    serializer = SupplierProductSerializer(result_page, many=True, context={'request': request})
+
+    return paginator.get_paginated_response({
+        'success': True,
+        'data': serializer.data,
+        'facets': facets,
+        'search_params': search_params,
+        'timestamp': timezone.now().isoformat(),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def quote_basket(request):
+    """
+    Price a basket of supplier products with bulk tiers and discounts.
+    """
+    serializer = QuoteRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid quote request.',
+                'details': serializer.errors,
+            },
+            'timestamp': timezone.now().isoformat(),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    quote = quote_engine.quote(
+        serializer.validated_data['lines'],
+        currency=serializer.validated_data['currency'],
+    )
+
+    return Response({
+        'success': True,
+        'data': quote,
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
+
+
+def _error_response(code, message, status_code, details=None):
+    error = {'code': code, 'message': message}
+    if details:
+        error['details'] = details
+    return Response({
+        'success': False,
+        'error': error,
+        'timestamp': timezone.now().isoformat(),
+    }, status=status_code)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated, IsSupplier, IsActiveUser])
+def product_stock(request, product_id):
+    """
+    List a product's stock movements or record a new one.
+    """
+    product = SupplierProduct.objects.filter(pk=product_id, supplier=request.user).only(
+        'id', 'stock_quantity', 'stock_version', 'is_unlimited'
+    ).first()
+    if product is None:
+        return _error_response('NOT_FOUND', 'Product not found.', status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        movements = StockMovement.objects.filter(product=product).select_related('created_by')
+        paginator = StandardResultsSetPagination()
+        result_page = paginator.paginate_queryset(movements, request)
+        serializer = StockMovementSerializer(result_page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    serializer = StockChangeSerializer(data=request.data)
+    if not serializer.is_valid():
+        return _error_response(
+            'VALIDATION_ERROR', 'Invalid stock change.', status.HTTP_400_BAD_REQUEST, serializer.errors
+        )
+    data = serializer.validated_data
+
+    try:
+        if data['movement_type'] == StockMovement.MovementType.STOCK_COUNT:
+            movement = set_stock_level(
+                product.pk,
+                data['counted_quantity'],
+                expected_version=data.get('expected_version'),
+                user=request.user,
+                note=data['note'],
+            )
+        else:
+            movement = record_movement(
+                product.pk,
+                data['quantity_change'],
+                data['movement_type'],
+                reference=data['reference'],
+                note=data['note'],
+                user=request.user,
+                expected_version=data.get('expected_version'),
+            )
+    except ConflictException as e:
+        return _error_response('STOCK_CONFLICT', str(e), status.HTTP_409_CONFLICT)
+    except ValidationException as e:
+        return _error_response('INSUFFICIENT_STOCK', str(e), status.HTTP_400_BAD_REQUEST, e.details)
+    except NotFoundException as e:
+        return _error_response('NOT_FOUND', str(e), status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'data': StockMovementSerializer(movement).data,
+        'message': 'Stock updated successfully',
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, IsSupplier, IsActiveUser])
+def import_products(request):
+    """
+    Create or update products in bulk from a CSV or JSON upload, keyed by SKU.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return _error_response('VALIDATION_ERROR', 'Upload a catalog file as "file".', status.HTTP_400_BAD_REQUEST)
+
+    file_format = request.data.get('format') or detect_format(upload.name, upload.content_type or '')
+    if file_format not in FORMATS:
+        return _error_response(
+            'VALIDATION_ERROR',
+            f"Unsupported format. Use one of: {', '.join(FORMATS)}.",
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    report = import_catalog(request.user, upload.open('rb'), file_format)
+
+    from apps.dashboard.models import UserActivity
+    UserActivity.objects.create(
+        user=request.user,
+        activity_type=UserActivity.ActivityType.PROFILE_UPDATE,
+        request_path=request.path,
+        request_method=request.method,
+        description=f"Imported product catalog: {upload.name}",
+        metadata={
+            'created': report.created,
+            'updated': report.updated,
+            'failed': report.failed,
+        }
+    )
+
+    return Response({
+        'success': True,
+        'data': report.to_dict(),
+        'message': f"Imported {report.created + report.updated} of {report.total} products",
+        'timestamp': timezone.now().isoformat(),
+    }, status=status.HTTP_200_OK)
@@ -6,9 +6,13 @@ from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from apps.dashboard.models import UserActivity
 from apps.notifications.models import NotificationPreference
+from core.cache import register_cache_invalidation
+from .models import FarmerProfile, ExpertProfile
 
 User = get_user_model()
 
+register_cache_invalidation(User, FarmerProfile, ExpertProfile)
+
 
 @receiver(post_save, sender=User)
 def user_post_save(sender, instance, created, **kwargs):
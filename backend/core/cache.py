@@ -0,0 +1,203 @@
+"""
+Versioned response caching for AgriLink API.
+
+Cached responses are keyed by a namespace and the normalized query
+parameters, and stamped with the generation counters of the models they
+were built from. Saving or deleting one of those models bumps its counter,
+so every dependent entry goes stale at once without scanning keys.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from rest_framework import status
+from rest_framework.response import Response
+import logging
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'cache_generation:{label}'
+ENTRY_KEY = 'response_cache:{namespace}:{digest}'
+LOCK_KEY = 'response_cache_lock:{namespace}:{digest}'
+
+
+def _model_label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def get_generations(models):
+    """
+    Get the current generation counter for each model.
+    """
+    labels = [_model_label(model) for model in models]
+    keys = [GENERATION_KEY.format(label=label) for label in labels]
+    stored = cache.get_many(keys)
+    return tuple(stored.get(key, 0) for key in keys)
+
+
+def bump_generation(model):
+    """
+    Invalidate all cached responses built from ``model``.
+    """
+    key = GENERATION_KEY.format(label=_model_label(model))
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter missing or evicted; any non-zero start invalidates old entries
+        cache.add(key, int(time.time()), timeout=None)
+        cache.incr(key)
+
+
+def _bump_on_change(sender, update_fields=None, **kwargs):
+    # Counter-only saves, like view counts, don't change cached responses
+    unversioned_fields = getattr(sender, 'unversioned_fields', ())
+    if update_fields and unversioned_fields and set(update_fields) <= set(unversioned_fields):
+        return
+    bump_generation(sender)
+
+
+def register_cache_invalidation(*models):
+    """
+    Bump the generation of each model whenever one of its rows changes.
+    """
+    for model in models:
+        uid = f'response_cache:{_model_label(model)}'
+        post_save.connect(_bump_on_change, sender=model, dispatch_uid=f'{uid}:save')
+        post_delete.connect(_bump_on_change, sender=model, dispatch_uid=f'{uid}:delete')
+
+
+def normalize_query_params(query_params, ignore=()):
+    """
+    Build a stable digest of the query parameters.
+    """
+    items = []
+    for key in sorted(query_params.keys()):
+        if key in ignore:
+            continue
+        values = sorted(value for value in query_params.getlist(key) if value != '')
+        if values:
+            items.append(f"{key}={','.join(values)}")
+    return hashlib.sha1('&'.join(items).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Response cache with stale-while-revalidate and single-flight refresh.
+
+    Fresh entries are served directly. Stale entries (expired or built from
+    an older generation) are still served for ``stale_timeout`` seconds
+    while exactly one request recomputes them. On a cold miss, concurrent
+    requests wait briefly for the request holding the lock instead of all
+    running the same queries.
+    """
+
+    def __init__(self, namespace, models, timeout=60, stale_timeout=30,
+                 lock_timeout=10, wait_timeout=2.0, anonymous_only=True):
+        self.namespace = namespace
+        self.models = models
+        self.timeout = timeout
+        self.stale_timeout = stale_timeout
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.anonymous_only = anonymous_only
+
+    def is_cacheable(self, request):
+        if request.method != 'GET':
+            return False
+        if self.anonymous_only and request.user and request.user.is_authenticated:
+            return False
+        return True
+
+    def fetch(self, request, compute):
+        """
+        Return a cached response for ``request`` or build one with ``compute``.
+        """
+        if not self.is_cacheable(request):
+            return compute()
+
+        digest = normalize_query_params(request.query_params)
+        entry_key = ENTRY_KEY.format(namespace=self.namespace, digest=digest)
+        lock_key = LOCK_KEY.format(namespace=self.namespace, digest=digest)
+        generations = get_generations(self.models)
+
+        entry = cache.get(entry_key)
+        if entry is not None and self._is_fresh(entry, generations):
+            return self._to_response(entry, 'HIT')
+
+        if cache.add(lock_key, 1, timeout=self.lock_timeout):
+            try:
+                return self._refresh(entry_key, generations, compute)
+            finally:
+                cache.delete(lock_key)
+
+        if entry is not None:
+            # Another request is recomputing; serve the stale copy meanwhile
+            return self._to_response(entry, 'STALE')
+
+        entry = self._wait_for_entry(entry_key, generations)
+        if entry is not None:
+            return self._to_response(entry, 'HIT')
+        return self._refresh(entry_key, generations, compute)
+
+    def _is_fresh(self, entry, generations):
+        return entry['generations'] == generations and entry['fresh_until'] > time.time()
+
+    def _refresh(self, entry_key, generations, compute):
+        response = compute()
+        if response.status_code == status.HTTP_200_OK:
+            entry = {
+                'data': response.data,
+                'generations': generations,
+                'fresh_until': time.time() + self.timeout,
+            }
+            cache.set(entry_key, entry, timeout=self.timeout + self.stale_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def _wait_for_entry(self, entry_key, generations):
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(entry_key)
+            if entry is not None and entry['generations'] == generations:
+                return entry
+        logger.warning(f"Timed out waiting for cached response {entry_key}")
+        return None
+
+    def _to_response(self, entry, state):
+        response = Response(entry['data'], status=status.HTTP_200_OK)
+        response['X-Cache'] = state
+        return response
+
+
+def cache_response(namespace, models, **options):
+    """
+    Cache the response of a function-based API view.
+    """
+    response_cache = ResponseCache(namespace, models, **options)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return response_cache.fetch(request, lambda: view_func(request, *args, **kwargs))
+        return wrapper
+
+    return decorator
+
+
+class CachedListMixin:
+    """
+    Cache ``list`` responses of generic views.
+
+    Views set ``cache_namespace`` and ``cache_models`` and may override
+    ``cache_options``.
+    """
+    cache_namespace = None
+    cache_models = ()
+    cache_options = {}
+
+    def list(self, request, *args, **kwargs):
+        response_cache = ResponseCache(self.cache_namespace, self.cache_models, **self.cache_options)
+        return response_cache.fetch(request, lambda: super(CachedListMixin, self).list(request, *args, **kwargs))
@@ -0,0 +1,165 @@
+"""
+Conditional GET support (ETag / Last-Modified) for AgriLink API.
+
+Validators are computed from cheap columns (``updated_at``, ``version``,
+counts) before any serializer work, so unchanged resources are answered
+with ``304 Not Modified``.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.cache import normalize_query_params
+
+
+def make_etag(*parts):
+    """
+    Build a weak ETag from the given parts.
+
+    ETags are weak because response bodies carry a generation timestamp and
+    are only semantically equivalent between requests.
+    """
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/{quote_etag(digest)}'
+
+
+def _request_parts(request):
+    user = request.user
+    return (
+        user.pk if user and user.is_authenticated else 'anonymous',
+        normalize_query_params(request.query_params),
+    )
+
+
+def _modified_field(model):
+    return 'updated_at' if any(field.name == 'updated_at' for field in model._meta.concrete_fields) else 'created_at'
+
+
+def _queryset_stats(queryset):
+    return queryset.order_by().aggregate(
+        last_modified=Max(_modified_field(queryset.model)), count=Count('pk')
+    )
+
+
+def object_validators(obj, request, related=()):
+    """
+    Return ``(etag, last_modified)`` for a single model instance.
+
+    ``related`` querysets hold child rows rendered along with the object
+    but written without saving it; their ``max(updated_at)`` and count are
+    folded into the validators.
+    """
+    updated_at = getattr(obj, 'updated_at', None)
+    version = getattr(obj, 'version', '')
+    last_modified = updated_at
+    related_parts = []
+    for queryset in related:
+        stats = _queryset_stats(queryset)
+        related_parts += [stats['last_modified'], stats['count']]
+        if stats['last_modified'] and (last_modified is None or stats['last_modified'] > last_modified):
+            last_modified = stats['last_modified']
+    etag = make_etag(
+        obj._meta.label_lower, obj.pk, version, updated_at, *related_parts, *_request_parts(request)
+    )
+    return etag, last_modified
+
+
+def queryset_validators(queryset, request):
+    """
+    Return ``(etag, last_modified)`` for a list resource from
+    ``max(updated_at)`` and the row count.
+    """
+    stats = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    etag = make_etag(
+        queryset.model._meta.label_lower,
+        stats['last_modified'],
+        stats['count'],
+        *_request_parts(request)
+    )
+    return etag, stats['last_modified']
+
+
+def _etag_matches(header, etag):
+    if header.strip() == '*':
+        return True
+    weak_etag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == weak_etag:
+            return True
+    return False
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """
+    Evaluate ``If-None-Match`` and ``If-Modified-Since`` for a safe request.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and etag:
+        # If-None-Match takes precedence over If-Modified-Since
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since and last_modified:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(last_modified.timestamp()) <= since
+
+    return False
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """
+    Attach ETag and Last-Modified headers to a response.
+    """
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified_response(etag=None, last_modified=None):
+    """
+    Build an empty ``304 Not Modified`` response carrying the validators.
+    """
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+
+class ConditionalRetrieveMixin:
+    """
+    Answer ``retrieve`` with 304 when the object hasn't changed.
+
+    Views rendering child rows that are saved on their own return them
+    from ``get_conditional_related``.
+    """
+
+    def get_conditional_related(self, instance):
+        return ()
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = object_validators(instance, request, self.get_conditional_related(instance))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+
+class ConditionalListMixin:
+    """
+    Answer ``list`` with 304 when the filtered queryset hasn't changed.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = queryset_validators(self.filter_queryset(self.get_queryset()), request)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
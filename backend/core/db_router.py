@@ -0,0 +1,166 @@
+"""
+Primary/replica database routing for AgriLink.
+
+Safe-method requests read from the replicas listed in
+``settings.DATABASE_REPLICAS``. Everything else uses the primary: writes,
+reads inside transactions, reads outside a request (workers, management
+commands) and reads by a client that wrote recently, so users always see
+their own changes.
+"""
+import random
+import time
+import threading
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_DB = 'default'
+STICKY_COOKIE_NAME = 'db_primary_pin'
+STICKY_CACHE_KEY = 'db_primary_pin:user:{user_id}'
+
+_state = Local()
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+def begin_request(request, use_primary=False):
+    """
+    Start routing reads for ``request``.
+    """
+    _state.request = request
+    _state.use_primary = use_primary
+    _state.user_checked = False
+    _state.resolving_user = False
+
+
+def end_request():
+    """
+    Stop routing reads for the current request.
+    """
+    _state.request = None
+    _state.use_primary = False
+
+
+def pin_to_primary():
+    """
+    Send every remaining query of the current request to the primary.
+    """
+    _state.use_primary = True
+
+
+def remember_write(user):
+    """
+    Keep ``user`` on the primary for the sticky window after a write.
+    """
+    if user is not None and user.is_authenticated:
+        cache.set(STICKY_CACHE_KEY.format(user_id=user.pk), True, timeout=get_sticky_seconds())
+
+
+def _user_recently_wrote(request):
+    if getattr(_state, 'user_checked', False) or getattr(_state, 'resolving_user', False):
+        return False
+
+    # Resolving a lazy user runs a query that comes back through the router
+    _state.resolving_user = True
+    try:
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            # JWT users are only known once the view authenticates; retry later
+            return False
+        _state.user_checked = True
+        if cache.get(STICKY_CACHE_KEY.format(user_id=user.pk)):
+            _state.use_primary = True
+            return True
+        return False
+    finally:
+        _state.resolving_user = False
+
+
+def should_use_primary():
+    """
+    Decide whether a read in the current context must hit the primary.
+    """
+    request = getattr(_state, 'request', None)
+    if request is None or getattr(_state, 'use_primary', False):
+        return True
+    if connections[PRIMARY_DB].in_atomic_block:
+        return True
+    return _user_recently_wrote(request)
+
+
+def _check_replica(alias):
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return True
+    except DatabaseError as e:
+        logger.warning(f"Replica {alias} failed health check: {str(e)}")
+        return False
+
+
+def is_replica_healthy(alias):
+    """
+    Return the cached health of a replica, re-checking once per interval.
+    """
+    interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+
+    with _health_lock:
+        healthy, checked_at = _health.get(alias, (True, None))
+        if checked_at is not None and now - checked_at < interval:
+            return healthy
+        # Claim this check so concurrent threads keep using the old result
+        _health[alias] = (healthy, now)
+
+    healthy = _check_replica(alias)
+    with _health_lock:
+        _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+def choose_replica():
+    """
+    Pick a healthy replica at random, or None if none is available.
+    """
+    replicas = get_replicas()
+    random.shuffle(replicas)
+    for alias in replicas:
+        if is_replica_healthy(alias):
+            return alias
+    return None
+
+
+class PrimaryReplicaRouter:
+    """
+    Route reads to replicas and writes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not get_replicas() or should_use_primary():
+            return PRIMARY_DB
+        return choose_replica() or PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DB, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
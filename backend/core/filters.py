@@ -0,0 +1,47 @@
+"""
+Custom filter backends for AgriLink API.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework.filters import BaseFilterBackend
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Ranked full-text search over a precomputed ``SearchVectorField``.
+
+    Views set ``search_vector_field`` and may set ``search_config`` and
+    ``search_headline_fields`` (annotation name -> text field) for
+    highlighted snippets. Results are ordered by rank unless the client
+    asks for an explicit ``ordering``. Must run after ``OrderingFilter``.
+    """
+    search_param = 'search'
+    ordering_param = 'ordering'
+    headline_options = {
+        'start_sel': '<mark>',
+        'stop_sel': '</mark>',
+        'max_fragments': 2,
+        'max_words': 35,
+        'min_words': 15,
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        vector_field = getattr(view, 'search_vector_field', None)
+        if not terms or not vector_field:
+            return queryset
+
+        config = getattr(view, 'search_config', 'english')
+        query = SearchQuery(terms, config=config, search_type='websearch')
+
+        queryset = queryset.filter(**{vector_field: query}).annotate(
+            search_rank=SearchRank(F(vector_field), query)
+        )
+        for name, field in getattr(view, 'search_headline_fields', {}).items():
+            queryset = queryset.annotate(**{
+                name: SearchHeadline(field, query, config=config, **self.headline_options)
+            })
+
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
@@ -0,0 +1,271 @@
+"""
+In-process request metrics for AgriLink API.
+
+Request latency, SQL query counts/time and response sizes are aggregated
+per view in memory, exposed in the Prometheus text format and rolled up
+into ``SystemMetric`` rows by hour and user role.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Creates the row if missing and otherwise locks it, without racing other flushers
+UPSERT_METRIC_SQL = """
+INSERT INTO system_metrics (metric_type, value, unit, date, hour, user_role, category, region, metadata, created_at)
+VALUES (%s, 0, %s, %s, %s, %s, '', '', '{}', now())
+ON CONFLICT (metric_type, date, hour, user_role, category, region)
+DO UPDATE SET metric_type = EXCLUDED.metric_type
+RETURNING id
+"""
+
+
+class ViewStats:
+    """
+    Aggregated statistics for one (view, method) pair.
+    """
+    __slots__ = (
+        'bucket_counts', 'latency_sum', 'count', 'status_counts',
+        'query_count', 'query_time', 'response_bytes',
+    )
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.status_counts = defaultdict(int)
+        self.query_count = 0
+        self.query_time = 0.0
+        self.response_bytes = 0
+
+
+class RollupStats:
+    """
+    Per hour and user role totals waiting to be written to SystemMetric.
+    """
+    __slots__ = ('requests', 'errors', 'latency_ms', 'latency_buckets')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process metrics store.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(ViewStats)
+        self._rollup = defaultdict(RollupStats)
+
+    def observe(self, view, method, status_code, duration, query_count,
+                query_time, response_bytes, user_role=None):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, duration)
+        now = timezone.now()
+        # Anonymous traffic is stored under '' so it shares one row per hour
+        rollup_key = (now.date(), now.hour, user_role or '')
+
+        with self._lock:
+            stats = self._views[(view, method)]
+            stats.bucket_counts[bucket] += 1
+            stats.latency_sum += duration
+            stats.count += 1
+            stats.status_counts[status_code] += 1
+            stats.query_count += query_count
+            stats.query_time += query_time
+            stats.response_bytes += response_bytes
+
+            rollup = self._rollup[rollup_key]
+            rollup.requests += 1
+            rollup.errors += status_code >= 500
+            rollup.latency_ms += duration * 1000
+            rollup.latency_buckets[bucket] += 1
+
+    def snapshot(self):
+        """
+        Copy the per-view statistics for export.
+        """
+        with self._lock:
+            return {
+                key: (
+                    list(stats.bucket_counts), stats.latency_sum, stats.count,
+                    dict(stats.status_counts), stats.query_count,
+                    stats.query_time, stats.response_bytes,
+                )
+                for key, stats in self._views.items()
+            }
+
+    def drain_rollup(self):
+        """
+        Take the pending hourly rollup, leaving an empty one behind.
+        """
+        with self._lock:
+            rollup, self._rollup = self._rollup, defaultdict(RollupStats)
+        return rollup
+
+    def restore_rollup(self, rollup):
+        """
+        Merge a rollup that failed to flush back into the pending one.
+        """
+        with self._lock:
+            for key, stats in rollup.items():
+                pending = self._rollup[key]
+                pending.requests += stats.requests
+                pending.errors += stats.errors
+                pending.latency_ms += stats.latency_ms
+                pending.latency_buckets = [
+                    count + restored for count, restored in zip(pending.latency_buckets, stats.latency_buckets)
+                ]
+
+
+registry = MetricsRegistry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """
+    Render the registry in the Prometheus text exposition format.
+    """
+    snapshot = sorted(registry.snapshot().items())
+    lines = [
+        '# HELP agrilink_http_request_duration_seconds Request latency by view.',
+        '# TYPE agrilink_http_request_duration_seconds histogram',
+    ]
+    for (view, method), (buckets, latency_sum, count, *_) in snapshot:
+        labels = f'view="{_escape(view)}",method="{method}"'
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+            cumulative += bucket_count
+            lines.append(f'agrilink_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'agrilink_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f'agrilink_http_request_duration_seconds_sum{{{labels}}} {latency_sum:.6f}')
+        lines.append(f'agrilink_http_request_duration_seconds_count{{{labels}}} {count}')
+
+    lines += [
+        '# HELP agrilink_http_requests_total Requests by view and status code.',
+        '# TYPE agrilink_http_requests_total counter',
+    ]
+    for (view, method), (_, _, _, status_counts, *_) in snapshot:
+        for status_code, status_count in sorted(status_counts.items()):
+            lines.append(
+                f'agrilink_http_requests_total{{view="{_escape(view)}",method="{method}",'
+                f'status="{status_code}"}} {status_count}'
+            )
+
+    counters = [
+        ('agrilink_db_queries_total', 'SQL queries executed by view.', 4, '{}'),
+        ('agrilink_db_query_duration_seconds_total', 'Time spent in SQL by view.', 5, '{:.6f}'),
+        ('agrilink_http_response_size_bytes_total', 'Response bytes by view.', 6, '{}'),
+    ]
+    for name, help_text, index, value_format in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (view, method), values in snapshot:
+            value = value_format.format(values[index])
+            lines.append(f'{name}{{view="{_escape(view)}",method="{method}"}} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _upsert_metric(metric_type, date, hour, user_role, unit, apply):
+    from apps.dashboard.models import SystemMetric
+
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_METRIC_SQL, [metric_type, unit, date, hour, user_role])
+        metric_id = cursor.fetchone()[0]
+    metric = SystemMetric.objects.get(pk=metric_id)
+    apply(metric)
+    metric.save(update_fields=['value', 'metadata'])
+
+
+def flush_rollup():
+    """
+    Add the pending hourly rollup to the SystemMetric rows.
+
+    Several processes flush into the same rows, so counts are summed and
+    averages/rates are recomputed from totals kept in ``metadata``.
+    """
+    from apps.dashboard.models import SystemMetric
+
+    rollup = registry.drain_rollup()
+    if not rollup:
+        return 0
+
+    try:
+        with transaction.atomic():
+            for (date, hour, user_role), stats in sorted(rollup.items(), key=lambda item: str(item[0])):
+                def add_calls(metric, stats=stats):
+                    metric.value += stats.requests
+
+                def add_latency(metric, stats=stats):
+                    total_ms = metric.metadata.get('total_ms', 0) + stats.latency_ms
+                    count = metric.metadata.get('count', 0) + stats.requests
+                    # Bucket counts let percentiles be estimated across processes and hours
+                    buckets = metric.metadata.get('buckets') or [0] * len(stats.latency_buckets)
+                    buckets = [stored + new for stored, new in zip(buckets, stats.latency_buckets)]
+                    metric.metadata = {'total_ms': total_ms, 'count': count, 'buckets': buckets}
+                    metric.value = Decimal(str(round(total_ms / count, 4)))
+
+                def add_errors(metric, stats=stats):
+                    errors = metric.metadata.get('errors', 0) + stats.errors
+                    requests = metric.metadata.get('requests', 0) + stats.requests
+                    metric.metadata = {'errors': errors, 'requests': requests}
+                    metric.value = Decimal(str(round(errors / requests, 4)))
+
+                _upsert_metric(SystemMetric.MetricType.API_CALLS, date, hour, user_role, 'count', add_calls)
+                _upsert_metric(SystemMetric.MetricType.RESPONSE_TIME, date, hour, user_role, 'ms', add_latency)
+                _upsert_metric(SystemMetric.MetricType.ERROR_RATE, date, hour, user_role, 'ratio', add_errors)
+    except Exception as e:
+        registry.restore_rollup(rollup)
+        logger.error(f"Failed to flush request metrics: {str(e)}")
+        return 0
+
+    return len(rollup)
+
+
+class RollupFlusher:
+    """
+    Daemon thread that flushes the hourly rollup of this process.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            thread = threading.Thread(target=self._run, name='metrics-rollup', daemon=True)
+            thread.start()
+            self._started = True
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 60)
+        while True:
+            time.sleep(interval)
+            close_old_connections()
+            flush_rollup()
+
+
+flusher = RollupFlusher()
@@ -0,0 +1,106 @@
+"""
+Custom middleware for AgriLink API.
+"""
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from rest_framework import permissions
+
+from core import db_router
+from core.metrics import flusher, registry
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route safe-method requests to read replicas.
+
+    Unsafe requests are pinned to the primary for their whole duration.
+    After a successful write the client stays on the primary for
+    ``REPLICA_STICKY_SECONDS``, tracked per user and with a cookie for
+    clients that aren't authenticated yet.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_safe = request.method in permissions.SAFE_METHODS
+        use_primary = not is_safe or db_router.STICKY_COOKIE_NAME in request.COOKIES
+
+        db_router.begin_request(request, use_primary=use_primary)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.end_request()
+
+        if not is_safe and response.status_code < 400:
+            db_router.remember_write(getattr(request, 'user', None))
+            response.set_cookie(
+                db_router.STICKY_COOKIE_NAME,
+                '1',
+                max_age=db_router.get_sticky_seconds(),
+                httponly=True,
+                samesite='Lax',
+            )
+
+        return response
+
+
+class QueryCounter:
+    """
+    ``execute_wrapper`` hook counting SQL queries and their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, SQL usage and response size of every request.
+
+    Views are labelled by their URL route rather than the concrete path to
+    keep the number of series bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        flusher.ensure_started()
+        counter = QueryCounter()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        duration = time.perf_counter() - start
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.route if resolver_match else '<unmatched>'
+        user = getattr(request, 'user', None)
+        user_role = getattr(user, 'role', None) if user and user.is_authenticated else None
+        response_bytes = 0 if response.streaming else len(response.content)
+
+        registry.observe(
+            view,
+            request.method,
+            response.status_code,
+            duration,
+            counter.count,
+            counter.duration,
+            response_bytes,
+            user_role=user_role,
+        )
+        return response
@@ -0,0 +1,35 @@
+"""
+Shared model base classes for AgriLink.
+"""
+from django.db import models
+
+
+class VersionedModel(models.Model):
+    """
+    Abstract model with a row version that is bumped on every change.
+
+    Saves limited to ``unversioned_fields`` (view counters and similar)
+    leave the version and ``updated_at`` alone, so they don't invalidate
+    HTTP validators derived from them.
+    """
+    version = models.PositiveIntegerField(default=1)
+
+    unversioned_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+
+        if not self._state.adding:
+            if update_fields is None:
+                self.version += 1
+            elif not set(update_fields) <= set(self.unversioned_fields):
+                self.version += 1
+                extra_fields = ['version']
+                if any(field.name == 'updated_at' for field in self._meta.concrete_fields):
+                    extra_fields.append('updated_at')
+                kwargs['update_fields'] = list(set(update_fields) | set(extra_fields))
+
+        super().save(*args, **kwargs)
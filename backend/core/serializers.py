@@ -0,0 +1,152 @@
+"""
+Shared serializer helpers for AgriLink API.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions
+
+
+def parse_list_param(request, name):
+    """
+    Parse a comma separated query parameter into a list of names.
+    """
+    if request is None:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for sparse fieldsets and expandable fields.
+
+    ``?fields=id,product_name`` limits the output to the named fields and
+    ``?expand=related_listings`` opts in to the fields listed in
+    ``Meta.expandable_fields``, which are left out by default.
+
+    ``Meta.field_dependencies`` maps computed fields to the ORM paths they
+    read, so views can project their querysets to the requested fields.
+    """
+    fields_param = 'fields'
+    expand_param = 'expand'
+
+    def __init__(self, *args, **kwargs):
+        requested_fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is not None and request.method not in permissions.SAFE_METHODS:
+            return
+
+        if requested_fields is None:
+            requested_fields = parse_list_param(request, self.fields_param)
+        if expand is None:
+            expand = parse_list_param(request, self.expand_param)
+
+        keep = self.get_output_field_names(requested_fields, expand)
+        for name in list(self.fields):
+            if name not in keep and not self.fields[name].write_only:
+                self.fields.pop(name)
+
+    @classmethod
+    def get_output_field_names(cls, requested_fields=None, expand=None):
+        """
+        Resolve the readable field names for a fields/expand combination.
+        """
+        declared = list(cls.Meta.fields)
+        expandable = set(getattr(cls.Meta, 'expandable_fields', []))
+        expand = set(expand or [])
+
+        if requested_fields:
+            # Explicitly requested expandable fields are expanded implicitly
+            return {name for name in requested_fields if name in declared}
+        return {name for name in declared if name not in expandable or name in expand}
+
+    @classmethod
+    def get_field_dependencies(cls, field_names):
+        """
+        Return the ORM paths needed to render the given fields, or None if
+        any of them has unknown dependencies.
+        """
+        model = cls.Meta.model
+        dependencies = getattr(cls.Meta, 'field_dependencies', {})
+        paths = set()
+
+        for name in field_names:
+            if name in dependencies:
+                paths.update(dependencies[name])
+                continue
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+            paths.add(name)
+
+        return paths
+
+
+def _resolve_projection(model, paths):
+    """
+    Split ORM paths into ``only()`` fields and ``select_related()`` relations.
+    """
+    only_fields = {model._meta.pk.name}
+    related = set()
+
+    for path in paths:
+        parts = path.split('__')
+        current = model
+        for index, part in enumerate(parts[:-1]):
+            field = current._meta.get_field(part)
+            prefix = '__'.join(parts[:index + 1])
+            if field.concrete:
+                # Forward relations can't be deferred while traversed
+                only_fields.add(prefix)
+            related.add(prefix)
+            current = field.related_model
+        only_fields.add(path)
+
+    # Keep only the deepest relation paths
+    related = {
+        path for path in related
+        if not any(other.startswith(f'{path}__') for other in related)
+    }
+    return only_fields, related
+
+
+def project_queryset(queryset, serializer_class, request):
+    """
+    Restrict a queryset to the columns and joins needed for the requested
+    fields of ``serializer_class``.
+    """
+    requested_fields = parse_list_param(request, serializer_class.fields_param)
+    expand = parse_list_param(request, serializer_class.expand_param)
+    if not requested_fields:
+        return queryset
+
+    field_names = serializer_class.get_output_field_names(requested_fields, expand)
+    paths = serializer_class.get_field_dependencies(field_names)
+    if paths is None:
+        return queryset
+
+    only_fields, related = _resolve_projection(queryset.model, paths)
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*only_fields)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Generic view mixin that projects list querysets to the fields requested
+    with ``?fields=``.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in permissions.SAFE_METHODS:
+            queryset = project_queryset(queryset, self.get_serializer_class(), self.request)
+        return queryset
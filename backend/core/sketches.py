@@ -0,0 +1,149 @@
+"""
+Mergeable quantile sketches for AgriLink.
+
+``TDigest`` summarizes a stream of weighted values in about a hundred
+centroids, sized by the k1 scale function so the tails stay precise.
+Two digests merge by pooling their centroids, which is what lets
+per-event updates and bulk rebuilds produce the same sketch.
+"""
+import math
+
+import numpy as np
+
+DEFAULT_COMPRESSION = 100
+BUFFER_SIZE = 500
+HEADER_SIZE = 4
+
+
+class TDigest:
+    """
+    A t-digest (merging variant) over float values.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer_means = []
+        self._buffer_weights = []
+
+    @property
+    def count(self):
+        """
+        Total weight of the values seen.
+        """
+        self._flush()
+        return float(self.weights.sum())
+
+    def update(self, value, weight=1.0):
+        """
+        Add one value.
+        """
+        value = float(value)
+        self._buffer_means.append(value)
+        self._buffer_weights.append(float(weight))
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer_means) >= BUFFER_SIZE:
+            self._flush()
+
+    def update_many(self, values, weights=None):
+        """
+        Add an array of values at once.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self._pending_means(), values]),
+                       np.concatenate([self._pending_weights(), weights]))
+
+    def merge(self, other):
+        """
+        Fold another digest into this one.
+        """
+        other._flush()
+        if not len(other.means):
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self._pending_means(), other.means]),
+                       np.concatenate([self._pending_weights(), other.weights]))
+
+    def quantile(self, q):
+        """
+        Estimate the value at quantile ``q`` (0 to 1), or None when empty.
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """
+        Estimate several quantiles in one pass.
+        """
+        self._flush()
+        if not len(self.means):
+            return [None] * len(qs)
+        total = self.weights.sum()
+        # Centroids sit at the middle of their weight; the extremes anchor the ends
+        positions = np.concatenate([[0.0], np.cumsum(self.weights) - self.weights / 2, [total]])
+        means = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.clip(qs, 0, 1) * total, positions, means).tolist()
+
+    def to_bytes(self):
+        """
+        Serialize to a compact little-endian float64 buffer.
+        """
+        self._flush()
+        header = [self.compression, self.min, self.max, len(self.means)]
+        return np.concatenate([header, self.means, self.weights]).astype('<f8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Load a digest written by ``to_bytes``; empty data gives an empty digest.
+        """
+        if not data:
+            return cls()
+        values = np.frombuffer(bytes(data), dtype='<f8')
+        compression, minimum, maximum, size = values[:HEADER_SIZE]
+        size = int(size)
+        digest = cls(compression=compression)
+        digest.min, digest.max = float(minimum), float(maximum)
+        digest.means = values[HEADER_SIZE:HEADER_SIZE + size].copy()
+        digest.weights = values[HEADER_SIZE + size:HEADER_SIZE + 2 * size].copy()
+        return digest
+
+    def _pending_means(self):
+        means = np.concatenate([self.means, self._buffer_means])
+        self._buffer_means = []
+        return means
+
+    def _pending_weights(self):
+        weights = np.concatenate([self.weights, self._buffer_weights])
+        self._buffer_weights = []
+        return weights
+
+    def _flush(self):
+        if self._buffer_means:
+            self._compress(self._pending_means(), self._pending_weights())
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total <= 0:
+            self.means, self.weights = np.empty(0), np.empty(0)
+            return
+
+        # k1 scale: buckets of equal k-size are narrow near q=0 and q=1
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / math.pi + 0.5))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
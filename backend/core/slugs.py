@@ -0,0 +1,94 @@
+"""
+Unique slug allocation for AgriLink models.
+
+The next free ``<base>-<n>`` suffix is found with one query that scans
+the slug index by prefix, instead of probing candidates one by one.
+Concurrent writers that pick the same slug hit the unique constraint and
+retry with a fresh suffix.
+"""
+import re
+import uuid
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUFFIX_RESERVE = 11
+MAX_ATTEMPTS = 10
+
+
+def _base_slug(model, value, field):
+    max_length = model._meta.get_field(field).max_length or 50
+    base = slugify(value)[:max_length - SUFFIX_RESERVE].strip('-')
+    return base or uuid.uuid4().hex[:8]
+
+
+def allocate_slug(model, value, field='slug'):
+    """
+    Get the first free slug for ``value`` in one indexed query.
+    """
+    base = _base_slug(model, value, field)
+    suffixed = Q(**{f'{field}__regex': rf'^{re.escape(base)}-[0-9]{{1,18}}$'})
+
+    stats = model._default_manager.filter(**{f'{field}__startswith': base}).aggregate(
+        taken=Count('pk', filter=Q(**{field: base})),
+        max_suffix=Max(
+            Cast(Substr(field, len(base) + 2), BigIntegerField()),
+            filter=suffixed,
+        ),
+    )
+
+    if not stats['taken']:
+        return base
+    return f"{base}-{(stats['max_suffix'] or 0) + 1}"
+
+
+def save_with_unique_slug(instance, save, source_value, field='slug'):
+    """
+    Allocate a slug for ``instance`` and run ``save``, retrying on conflicts.
+    """
+    model = type(instance)
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt < MAX_ATTEMPTS - 1:
+            slug = allocate_slug(model, source_value, field)
+        else:
+            # Heavily contended title; fall back to a random suffix
+            slug = f"{_base_slug(model, source_value, field)}-{uuid.uuid4().hex[:8]}"
+        setattr(instance, field, slug)
+
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            taken = model._default_manager.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if not taken:
+                raise
+            logger.info(f"Slug {slug} taken concurrently, retrying")
+
+    raise IntegrityError(f"Could not allocate a unique {field} for {model._meta.label}")
+
+
+class UniqueSlugMixin:
+    """
+    Model mixin filling an empty slug from another field on save.
+
+    Models set ``slug_source_field`` and optionally ``slug_field``.
+    """
+    slug_source_field = 'title'
+    slug_field = 'slug'
+
+    def save(self, *args, **kwargs):
+        if getattr(self, self.slug_field):
+            return super().save(*args, **kwargs)
+
+        parent_save = super().save
+        return save_with_unique_slug(
+            self,
+            lambda: parent_save(*args, **kwargs),
+            getattr(self, self.slug_source_field),
+            field=self.slug_field,
+        )
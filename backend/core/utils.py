@@ -1,6 +1,7 @@
 """
 Utility functions for AgriLink API.
 """
+import math
 import uuid
 import random
 import string
@@ -39,6 +40,17 @@ def create_point_from_coordinates(latitude, longitude):
     return Point(longitude, latitude, srid=4326)
 
 
+def region_for_point(point, cell_degrees=1.0):
+    """
+    Get a coarse region label (grid cell of ``cell_degrees``) for a Point.
+    """
+    if point is None:
+        return ''
+    latitude = math.floor(point.y / cell_degrees) * cell_degrees
+    longitude = math.floor(point.x / cell_degrees) * cell_degrees
+    return f'{latitude:g}:{longitude:g}'
+
+
 def calculate_distance(point1, point2):
     """
     Calculate distance between two points in kilometers.
@@ -0,0 +1,25 @@
+"""
+Operational views for AgriLink API.
+"""
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from core.metrics import render_prometheus
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Expose the request metrics of this process for Prometheus.
+    """
+    # Metrics stay private until a token is configured
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not token or not constant_time_compare(header, f'Bearer {token}'):
+        return HttpResponseForbidden()
+
+    return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)